@@ -0,0 +1,27 @@
+"""Add student number sequence
+
+Revision ID: 01d34b7c1e1f
+Revises: 3b1f4a9c7d20
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '01d34b7c1e1f'
+down_revision: Union[str, None] = '3b1f4a9c7d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Each nextval() reserves a block of 50 numbers (app.models.student.STUDENT_NUMBER_BLOCK)
+    op.execute(sa.schema.CreateSequence(sa.Sequence('student_number_seq', increment=50)))
+
+
+def downgrade() -> None:
+    op.execute(sa.schema.DropSequence(sa.Sequence('student_number_seq')))
@@ -0,0 +1,68 @@
+"""Add grading schemes
+
+Revision ID: 3b1f4a9c7d20
+Revises: ec499cbfa05c
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+from datetime import datetime
+from decimal import Decimal
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b1f4a9c7d20'
+down_revision: Union[str, None] = 'ec499cbfa05c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The bands grades were typed in against until now
+DEFAULT_BANDS = [
+    ("A", 70), ("B+", 65), ("B", 60), ("C+", 55), ("C", 50),
+    ("D+", 45), ("D", 40), ("E", 35), ("F", 0),
+]
+
+
+def upgrade() -> None:
+    schemes = op.create_table(
+        'grading_schemes',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('program', sa.String(length=100), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name'),
+        sa.UniqueConstraint('program'),
+    )
+    bands = op.create_table(
+        'grade_bands',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('scheme_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('grade', sa.String(length=2), nullable=False),
+        sa.Column('min_marks', sa.Numeric(precision=5, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(['scheme_id'], ['grading_schemes.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('scheme_id', 'grade'),
+        sa.UniqueConstraint('scheme_id', 'min_marks'),
+    )
+
+    scheme_id = uuid.uuid4()
+    now = datetime.utcnow()
+    op.bulk_insert(schemes, [
+        {'id': scheme_id, 'name': 'Default', 'program': None, 'created_at': now, 'updated_at': now},
+    ])
+    op.bulk_insert(bands, [
+        {'id': uuid.uuid4(), 'scheme_id': scheme_id, 'grade': grade, 'min_marks': Decimal(min_marks)}
+        for grade, min_marks in DEFAULT_BANDS
+    ])
+
+
+def downgrade() -> None:
+    op.drop_table('grade_bands')
+    op.drop_table('grading_schemes')
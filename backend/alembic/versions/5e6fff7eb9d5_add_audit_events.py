@@ -0,0 +1,44 @@
+"""Add audit events
+
+Revision ID: 5e6fff7eb9d5
+Revises: 062043a7cd99
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e6fff7eb9d5'
+down_revision: Union[str, None] = '062043a7cd99'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'audit_events',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('actor_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('action', sa.String(length=50), nullable=False),
+        sa.Column('entity_type', sa.String(length=50), nullable=True),
+        sa.Column('entity_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('details', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['actor_id'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_audit_events_actor_id'), 'audit_events', ['actor_id'], unique=False)
+    op.create_index(op.f('ix_audit_events_action'), 'audit_events', ['action'], unique=False)
+    op.create_index(op.f('ix_audit_events_created_at'), 'audit_events', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_audit_events_created_at'), table_name='audit_events')
+    op.drop_index(op.f('ix_audit_events_action'), table_name='audit_events')
+    op.drop_index(op.f('ix_audit_events_actor_id'), table_name='audit_events')
+    op.drop_table('audit_events')
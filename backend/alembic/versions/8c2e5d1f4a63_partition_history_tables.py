@@ -0,0 +1,168 @@
+"""Partition registrations, results, payments and fees by academic year
+
+Revision ID: 8c2e5d1f4a63
+Revises: 01d34b7c1e1f
+Create Date: 2026-10-19 18:00:00.000000
+
+Each table is rebuilt as LIST (academic_year) with a hot/cold split on
+the new ``archived`` column. Results gain ``academic_year`` and
+``archived`` so their foreign key can follow a registration into the
+cold partition. Indexes, foreign keys and the finance materialized views
+are captured before the swap and recreated after it.
+"""
+from typing import Dict, List, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c2e5d1f4a63'
+down_revision: Union[str, None] = '01d34b7c1e1f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Referenced tables first; results is rebuilt after unit_registrations
+TABLES = ("unit_registrations", "payments", "fee_structures", "results")
+VIEWS = ("finance_daily_collections", "finance_period_balances")
+
+
+def _fetch(sql: str, **params) -> List[sa.Row]:
+    return op.get_bind().execute(sa.text(sql), params).fetchall()
+
+
+def _capture() -> Dict[str, List[str]]:
+    """DDL to recreate secondary indexes, foreign keys and views after the tables are swapped."""
+    ddl: Dict[str, List[str]] = {"indexes": [], "foreign_keys": [], "views": []}
+    for table in TABLES:
+        for (indexdef,) in _fetch(
+            "SELECT pg_get_indexdef(i.indexrelid) FROM pg_index i "
+            "WHERE i.indrelid = CAST(:table AS regclass) AND NOT i.indisunique AND NOT i.indisprimary",
+            table=table,
+        ):
+            # Partitioned tables don't support ONLY in index definitions
+            ddl["indexes"].append(indexdef.replace(" ON ONLY ", " ON "))
+        for name, definition in _fetch(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            # conparentid skips the copies Postgres keeps for each referenced partition
+            "WHERE conrelid = CAST(:table AS regclass) AND contype = 'f' AND conparentid = 0",
+            table=table,
+        ):
+            if name != "results_registration_id_fkey":
+                ddl["foreign_keys"].append(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+    for view in VIEWS:
+        (definition,) = _fetch("SELECT pg_get_viewdef(CAST(:view AS regclass))", view=view)[0]
+        ddl["views"].append(f"CREATE MATERIALIZED VIEW {view} AS {definition}")
+        for (indexdef,) in _fetch(
+            "SELECT pg_get_indexdef(indexrelid) FROM pg_index WHERE indrelid = CAST(:view AS regclass)", view=view
+        ):
+            ddl["views"].append(indexdef)
+    return ddl
+
+
+def _columns(table: str) -> str:
+    rows = _fetch(
+        "SELECT attname FROM pg_attribute WHERE attrelid = CAST(:table AS regclass) "
+        "AND attnum > 0 AND NOT attisdropped ORDER BY attnum",
+        table=table,
+    )
+    return ", ".join(name for (name,) in rows)
+
+
+def _swap(ddl: Dict[str, List[str]], create, copy, finish):
+    """Rename the old tables aside, create and fill the new ones, then restore dependants."""
+    for view in VIEWS:
+        op.execute(f"DROP MATERIALIZED VIEW {view}")
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table} RENAME TO {table}_old")
+    for table in TABLES:
+        create(table)
+        copy(table)
+    for table in reversed(TABLES):
+        op.execute(f"DROP TABLE {table}_old")
+    for table in TABLES:
+        finish(table)
+    for statement in ddl["indexes"] + ddl["foreign_keys"] + ddl["views"]:
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    ddl = _capture()
+    years = [year for (year,) in _fetch(
+        "SELECT academic_year FROM unit_registrations UNION SELECT academic_year FROM payments "
+        "UNION SELECT academic_year FROM fee_structures ORDER BY 1"
+    )]
+
+    def create(table):
+        extra = ", academic_year VARCHAR(9) NOT NULL" if table == "results" else ""
+        op.execute(
+            f"CREATE TABLE {table} (LIKE {table}_old INCLUDING DEFAULTS{extra}, "
+            f"archived BOOLEAN NOT NULL DEFAULT false) PARTITION BY LIST (academic_year)"
+        )
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+        for year in years:
+            name = f"{table}_y{year.replace('-', '_')}"
+            op.execute(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES IN ('{year}') PARTITION BY LIST (archived)")
+            op.execute(f"CREATE TABLE {name}_hot PARTITION OF {name} FOR VALUES IN (false)")
+            op.execute(f"CREATE TABLE {name}_cold PARTITION OF {name} FOR VALUES IN (true)")
+
+    def copy(table):
+        columns = _columns(f"{table}_old")
+        if table == "results":
+            selected = ", ".join(f"r.{name.strip()}" for name in columns.split(","))
+            op.execute(
+                f"INSERT INTO results ({columns}, academic_year) SELECT {selected}, u.academic_year "
+                f"FROM results_old r JOIN unit_registrations u ON u.id = r.registration_id"
+            )
+        else:
+            op.execute(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {table}_old")
+
+    def finish(table):
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, academic_year, archived)")
+        if table == "results":
+            op.execute(
+                "ALTER TABLE results ADD CONSTRAINT results_registration_id_key "
+                "UNIQUE (registration_id, academic_year, archived)"
+            )
+            op.execute(
+                "ALTER TABLE results ADD CONSTRAINT results_registration_id_fkey "
+                "FOREIGN KEY (registration_id, academic_year, archived) "
+                "REFERENCES unit_registrations (id, academic_year, archived) ON UPDATE CASCADE ON DELETE CASCADE"
+            )
+        if table == "payments":
+            # Was a unique index; uniqueness across years is now checked by record_payment
+            op.execute("CREATE INDEX ix_payments_reference_number ON payments (reference_number)")
+
+    _swap(ddl, create, copy, finish)
+    for table in TABLES:
+        op.execute(f"ANALYZE {table}")
+
+
+def downgrade() -> None:
+    ddl = _capture()
+    op.execute("DROP INDEX IF EXISTS ix_payments_reference_number")
+    ddl["indexes"] = [statement for statement in ddl["indexes"] if "ix_payments_reference_number" not in statement]
+
+    def create(table):
+        op.execute(f"CREATE TABLE {table} (LIKE {table}_old INCLUDING DEFAULTS)")
+        op.execute(f"ALTER TABLE {table} DROP COLUMN archived")
+        if table == "results":
+            op.execute("ALTER TABLE results DROP COLUMN academic_year")
+
+    def copy(table):
+        columns = _columns(table)
+        op.execute(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {table}_old")
+
+    def finish(table):
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id)")
+        if table == "results":
+            op.execute("ALTER TABLE results ADD CONSTRAINT results_registration_id_key UNIQUE (registration_id)")
+            op.execute(
+                "ALTER TABLE results ADD CONSTRAINT results_registration_id_fkey FOREIGN KEY (registration_id) "
+                "REFERENCES unit_registrations (id) ON DELETE CASCADE"
+            )
+        if table == "payments":
+            op.execute("CREATE UNIQUE INDEX ix_payments_reference_number ON payments (reference_number)")
+
+    # Partitions go with their parent when the old tables are dropped
+    _swap(ddl, create, copy, finish)
@@ -0,0 +1,51 @@
+"""Add program requirements and graduation eligibility
+
+Revision ID: d4a7e2b9c513
+Revises: 8c2e5d1f4a63
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a7e2b9c513'
+down_revision: Union[str, None] = '8c2e5d1f4a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'program_requirements',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('program', sa.String(length=100), nullable=False),
+        sa.Column('min_credits', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('program'),
+    )
+    op.create_table(
+        'program_required_units',
+        sa.Column('requirement_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('unit_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.ForeignKeyConstraint(['requirement_id'], ['program_requirements.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['unit_id'], ['units.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('requirement_id', 'unit_id'),
+    )
+    op.add_column('student_requests', sa.Column('eligibility', sa.String(length=20), nullable=True))
+    op.add_column('student_requests', sa.Column('eligibility_reasons', postgresql.JSONB(), nullable=True))
+    op.add_column('student_requests', sa.Column('evaluated_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('student_requests', 'evaluated_at')
+    op.drop_column('student_requests', 'eligibility_reasons')
+    op.drop_column('student_requests', 'eligibility')
+    op.drop_table('program_required_units')
+    op.drop_table('program_requirements')
@@ -0,0 +1,77 @@
+"""Add finance rollup materialized views
+
+Revision ID: ec499cbfa05c
+Revises: 5e6fff7eb9d5
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ec499cbfa05c'
+down_revision: Union[str, None] = '5e6fff7eb9d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE MATERIALIZED VIEW finance_daily_collections AS
+        SELECT p.payment_date::date AS day,
+               p.payment_method,
+               s.program,
+               p.academic_year,
+               p.semester,
+               count(*) AS payments,
+               sum(p.amount) AS amount
+        FROM payments p
+        JOIN students s ON s.id = p.student_id
+        GROUP BY 1, 2, 3, 4, 5
+    """)
+    op.execute("""
+        CREATE UNIQUE INDEX ux_finance_daily_collections
+        ON finance_daily_collections (day, payment_method, program, academic_year, semester)
+    """)
+
+    op.execute("""
+        CREATE MATERIALIZED VIEW finance_period_balances AS
+        WITH billed AS (
+            SELECT student_id, academic_year, semester, sum(amount) AS amount
+            FROM fee_structures GROUP BY 1, 2, 3
+        ), paid AS (
+            SELECT student_id, academic_year, semester, sum(amount) AS amount
+            FROM payments GROUP BY 1, 2, 3
+        ), balances AS (
+            SELECT coalesce(b.student_id, p.student_id) AS student_id,
+                   coalesce(b.academic_year, p.academic_year) AS academic_year,
+                   coalesce(b.semester, p.semester) AS semester,
+                   coalesce(b.amount, 0) AS billed,
+                   coalesce(p.amount, 0) AS paid
+            FROM billed b
+            FULL JOIN paid p
+              ON p.student_id = b.student_id AND p.academic_year = b.academic_year AND p.semester = b.semester
+        )
+        SELECT bl.academic_year,
+               bl.semester,
+               s.program,
+               count(*) AS students,
+               count(*) FILTER (WHERE bl.billed > bl.paid) AS students_owing,
+               sum(bl.billed) AS billed,
+               sum(bl.paid) AS paid,
+               sum(greatest(bl.billed - bl.paid, 0)) AS outstanding
+        FROM balances bl
+        JOIN students s ON s.id = bl.student_id
+        GROUP BY 1, 2, 3
+    """)
+    op.execute("""
+        CREATE UNIQUE INDEX ux_finance_period_balances
+        ON finance_period_balances (academic_year, semester, program)
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS finance_period_balances")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS finance_daily_collections")
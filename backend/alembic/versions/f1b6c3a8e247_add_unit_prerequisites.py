@@ -0,0 +1,39 @@
+"""Add unit prerequisites
+
+Revision ID: f1b6c3a8e247
+Revises: d4a7e2b9c513
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b6c3a8e247'
+down_revision: Union[str, None] = 'd4a7e2b9c513'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'unit_prerequisites',
+        sa.Column('unit_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('prerequisite_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.CheckConstraint('unit_id <> prerequisite_id', name='unit_prerequisites_not_self'),
+        sa.ForeignKeyConstraint(['unit_id'], ['units.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['prerequisite_id'], ['units.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('unit_id', 'prerequisite_id'),
+    )
+    op.create_index(
+        op.f('ix_unit_prerequisites_prerequisite_id'), 'unit_prerequisites', ['prerequisite_id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_unit_prerequisites_prerequisite_id'), table_name='unit_prerequisites')
+    op.drop_table('unit_prerequisites')
@@ -0,0 +1,183 @@
+"""
+Student numbers and bulk admission from CSV.
+
+Student IDs come from ``student_number_seq``, which steps by
+``STUDENT_NUMBER_BLOCK``: every ``nextval()`` reserves a block of numbers
+that this worker then hands out locally, so a signup rarely touches the
+sequence and an intake of thousands needs one round trip for all its
+blocks. Admissions validate every row first, check all emails in one
+query, hash initial passwords across a process pool (bcrypt is CPU-bound
+and would stall the event loop) and insert users and students with
+multi-row INSERTs in one transaction.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import asyncio
+import csv
+import io
+import secrets
+import uuid
+
+from pydantic import ValidationError
+from sqlalchemy import String, any_, cast, func, insert, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import User, UserRole, Student
+from app.models.student import STUDENT_NUMBER_BLOCK, student_number_seq
+from app.schemas import StudentAdmission
+from app.security import hash_passwords
+from app.utils.process_pool import WorkerProcessPool
+
+ADMISSION_COLUMNS = tuple(StudentAdmission.model_fields)
+REQUIRED_COLUMNS = tuple(name for name, field in StudentAdmission.model_fields.items() if field.is_required())
+HASH_CHUNK_SIZE = 16
+
+
+class AdmissionFileError(ValueError):
+    """The upload is not a usable admission CSV (as opposed to individual bad rows)."""
+
+
+def format_student_id(number: int, year: Optional[int] = None) -> str:
+    # Seven digits keeps these apart from the older six-hex-digit random IDs
+    return f"FT{year or datetime.now().year}{number:07d}"
+
+
+class StudentNumbers:
+    def __init__(self, block_size: int):
+        self.block_size = block_size
+        self._next = 0
+        self._end = 0
+        self._lock = asyncio.Lock()
+
+    async def allocate(self, db: AsyncSession, count: int = 1) -> List[int]:
+        """``count`` unused student numbers, from the local block first."""
+        async with self._lock:
+            numbers = list(range(self._next, min(self._end, self._next + count)))
+            self._next += len(numbers)
+            missing = count - len(numbers)
+            if missing:
+                blocks = -(-missing // self.block_size)
+                starts = (await db.execute(
+                    select(func.nextval(student_number_seq.name)).select_from(func.generate_series(1, blocks))
+                )).scalars().all()
+                for start in starts:
+                    take = min(missing, self.block_size)
+                    numbers.extend(range(start, start + take))
+                    missing -= take
+                # Keep what's left of the last block for later signups
+                self._next, self._end = starts[-1] + take, starts[-1] + self.block_size
+            return numbers
+
+
+student_numbers = StudentNumbers(STUDENT_NUMBER_BLOCK)
+
+
+def parse_admissions(content: bytes) -> List[Dict[str, Optional[str]]]:
+    """CSV rows as dicts of the known columns, blanks as ``None``."""
+    try:
+        reader = csv.DictReader(io.StringIO(content.decode("utf-8-sig")))
+        header = [name.strip().lower() for name in reader.fieldnames or []]
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise AdmissionFileError(f"Could not read CSV: {exc}")
+    missing = [name for name in REQUIRED_COLUMNS if name not in header]
+    if missing:
+        raise AdmissionFileError(f"Missing columns: {', '.join(missing)}")
+    reader.fieldnames = header
+
+    try:
+        rows = [
+            {name: (row.get(name) or "").strip() or None for name in ADMISSION_COLUMNS}
+            for row in reader
+        ]
+    except csv.Error as exc:
+        raise AdmissionFileError(f"Could not read CSV: {exc}")
+    if not rows:
+        raise AdmissionFileError("The file has no rows")
+    if len(rows) > settings.admission_max_rows:
+        raise AdmissionFileError(f"At most {settings.admission_max_rows} rows per file")
+    return rows
+
+
+def _errors(exc: ValidationError) -> List[str]:
+    return [f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()]
+
+
+class AdmissionService:
+    def __init__(self, max_workers: int):
+        self._pool = WorkerProcessPool(max_workers)
+
+    async def hash_all(self, passwords: List[str]) -> List[str]:
+        chunks = [passwords[i:i + HASH_CHUNK_SIZE] for i in range(0, len(passwords), HASH_CHUNK_SIZE)]
+        hashed = await asyncio.gather(*(self._pool.run(hash_passwords, chunk) for chunk in chunks))
+        return [value for chunk in hashed for value in chunk]
+
+    async def admit(self, db: AsyncSession, rows: List[Dict[str, Optional[str]]]) -> Dict[str, Any]:
+        """Admit every valid row; returns a report with one entry per CSV row."""
+        report: List[Dict[str, Any]] = []
+        accepted: List[tuple] = []
+        seen = set()
+        for line, row in enumerate(rows, start=2):  # line 1 is the header
+            entry = {"row": line, "email": row.get("email"), "status": "rejected"}
+            report.append(entry)
+            try:
+                admission = StudentAdmission(**{name: value for name, value in row.items() if value is not None})
+            except ValidationError as exc:
+                entry["errors"] = _errors(exc)
+                continue
+            entry["email"] = admission.email
+            if admission.email.lower() in seen:
+                entry["errors"] = ["email: Duplicate of an earlier row"]
+                continue
+            seen.add(admission.email.lower())
+            accepted.append((entry, admission))
+
+        # Every email in one query (case-insensitively, so "Jane@" and "jane@" can't both get in)
+        registered = set((await db.execute(
+            select(func.lower(User.email)).where(func.lower(User.email) == any_(cast(list(seen), ARRAY(String))))
+        )).scalars().all()) if seen else set()
+        for entry, admission in accepted:
+            if admission.email.lower() in registered:
+                entry["errors"] = ["email: Already registered"]
+        accepted = [(entry, admission) for entry, admission in accepted if "errors" not in entry]
+
+        if accepted:
+            passwords = []
+            for entry, admission in accepted:
+                if admission.password is None:
+                    entry["initial_password"] = secrets.token_urlsafe(9)
+                passwords.append(admission.password or entry["initial_password"])
+            hashes = await self.hash_all(passwords)
+            numbers = await student_numbers.allocate(db, len(accepted))
+
+            enrolled, now = datetime.now().date(), datetime.utcnow()
+            users, students = [], []
+            for (entry, admission), hashed, number in zip(accepted, hashes, numbers):
+                user_id = uuid.uuid4()
+                users.append({
+                    "id": user_id, "email": entry["email"], "hashed_password": hashed,
+                    "role": UserRole.STUDENT, "is_active": True, "is_verified": False,
+                    "created_at": now, "updated_at": now,
+                })
+                students.append({
+                    "id": uuid.uuid4(), "user_id": user_id, "student_id": format_student_id(number, enrolled.year),
+                    **admission.model_dump(exclude={"email", "password"}),
+                    "enrollment_date": enrolled, "created_at": now, "updated_at": now,
+                })
+                entry["status"] = "admitted"
+                entry["student_id"] = students[-1]["student_id"]
+
+            # executemany on a plain insert() is sent as batched multi-row VALUES
+            await db.execute(insert(User), users)
+            await db.execute(insert(Student), students)
+            await db.commit()
+
+        admitted = len(accepted)
+        return {"admitted": admitted, "rejected": len(report) - admitted, "rows": report}
+
+    def close(self):
+        self._pool.close()
+
+
+admissions = AdmissionService(settings.admission_hash_workers)
@@ -0,0 +1,178 @@
+"""
+Result statistics per unit or program.
+
+Marks come back from one query as a sorted ``float8[]`` per group (no ORM
+objects), are concatenated into a single NumPy array, and every group's
+statistics are computed together with segment reductions over it.
+Responses are cached in Redis under a version number that result entry,
+edits and publishing bump, so a cached report lives until the next
+change.
+"""
+from typing import Any, Dict, Optional, Sequence
+import hashlib
+import json
+
+from sqlalchemy import Float, cast, func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import Student, Unit, UnitRegistration, Result, Semester
+
+RESULTS_VERSION_KEY = "analytics:results:version"
+RESULTS_STATS_KEY = "analytics:results:{}:{}"
+STATS_CACHE_TTL = 86400
+
+PERCENTILES = (25, 50, 75, 90)
+
+
+async def bump_results_version(redis):
+    """Invalidate every cached report; call after results are entered, edited or published."""
+    await redis.incr(RESULTS_VERSION_KEY)
+
+
+def describe_groups(
+    marks: Sequence[Sequence[float]],
+    grades: Sequence[Sequence[Optional[str]]],
+    pass_mark: float,
+) -> Dict[str, Any]:
+    """Statistics for each group of ascending ``marks`` plus all groups combined."""
+    # Imported on first use: NumPy is the heaviest import in the app and only reports need it
+    import numpy as np
+
+    counts = np.fromiter((len(group) for group in marks), dtype=np.int64, count=len(marks))
+    if not counts.sum():
+        return {"groups": [], "overall": None}
+
+    values = np.concatenate([np.asarray(group, dtype=np.float64) for group in marks])
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    ends = starts + counts - 1
+
+    means = np.add.reduceat(values, starts) / counts
+    variances = np.add.reduceat((values - np.repeat(means, counts)) ** 2, starts) / counts
+    passes = np.add.reduceat((values >= pass_mark).astype(np.int64), starts)
+
+    # Groups arrive sorted, so percentiles are linear interpolation between neighbours
+    percentiles = {}
+    for q in PERCENTILES:
+        position = starts + (counts - 1) * (q / 100)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, ends)
+        percentiles[q] = values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+    # Grade histogram: one (group, grade) scatter-add over all rows
+    labels: Dict[str, int] = {}
+    grade_codes = np.fromiter(
+        (labels.setdefault(grade or "-", len(labels)) for group in grades for grade in group),
+        dtype=np.int64, count=values.size,
+    )
+    histogram = np.zeros((len(counts), len(labels)), dtype=np.int64)
+    np.add.at(histogram, (np.repeat(np.arange(len(counts)), counts), grade_codes), 1)
+    names = list(labels)
+
+    def grade_counts(row) -> Dict[str, int]:
+        return {names[j]: n for j, n in enumerate(row) if n}
+
+    columns = {
+        "count": counts.tolist(),
+        "mean": means.round(2).tolist(),
+        "median": percentiles[50].round(2).tolist(),
+        "std": np.sqrt(variances).round(2).tolist(),
+        "min": values[starts].tolist(),
+        "max": values[ends].tolist(),
+        **{f"p{q}": percentiles[q].round(2).tolist() for q in PERCENTILES if q != 50},
+        "pass_rate": (passes / counts).round(4).tolist(),
+    }
+    groups = [
+        {**{name: column[i] for name, column in columns.items()}, "grades": grade_counts(row)}
+        for i, row in enumerate(histogram.tolist())
+    ]
+
+    everything = np.sort(values)
+    overall = {
+        "count": int(values.size),
+        "mean": round(float(values.mean()), 2),
+        "median": round(float(np.median(everything)), 2),
+        "std": round(float(values.std()), 2),
+        "min": float(everything[0]),
+        "max": float(everything[-1]),
+        **{f"p{q}": round(float(np.percentile(everything, q)), 2) for q in PERCENTILES if q != 50},
+        "pass_rate": round(float(passes.sum() / values.size), 4),
+        "grades": grade_counts(histogram.sum(axis=0).tolist()),
+    }
+    return {"groups": groups, "overall": overall}
+
+
+async def result_statistics(
+    db: AsyncSession,
+    redis,
+    academic_year: str,
+    semester: Semester,
+    group_by: str = "unit",
+    unit_id=None,
+    program: Optional[str] = None,
+    published_only: bool = False,
+) -> Dict[str, Any]:
+    params = {
+        "academic_year": academic_year,
+        "semester": semester.value,
+        "group_by": group_by,
+        "unit_id": str(unit_id) if unit_id else None,
+        "program": program,
+        "published_only": published_only,
+    }
+    version = await redis.get(RESULTS_VERSION_KEY) or "0"
+    key = RESULTS_STATS_KEY.format(
+        version, hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:32]
+    )
+    cached = await redis.get(key)
+    if cached:
+        return json.loads(cached)
+
+    if group_by == "program":
+        keys = [Student.program]
+    else:
+        keys = [Unit.id.label("unit_id"), Unit.unit_code, Unit.unit_name]
+    marks = cast(Result.marks, Float)
+    query = (
+        select(
+            *keys,
+            func.array_agg(aggregate_order_by(marks, marks)).label("marks"),
+            func.array_agg(aggregate_order_by(Result.grade, marks)).label("grades"),
+        )
+        .select_from(Result)
+        .join(UnitRegistration, Result.registration)  # joins on the partition keys too
+        .where(UnitRegistration.academic_year == academic_year)
+        .where(UnitRegistration.semester == semester)
+        .where(Result.marks.is_not(None))
+        .group_by(*keys)
+        .order_by(keys[0] if group_by == "program" else Unit.unit_code)
+    )
+    if group_by != "program":
+        query = query.join(Unit, UnitRegistration.unit_id == Unit.id)
+    if program or group_by == "program":
+        query = query.join(Student, UnitRegistration.student_id == Student.id)
+    if program:
+        query = query.where(Student.program == program)
+    if unit_id:
+        query = query.where(UnitRegistration.unit_id == unit_id)
+    if published_only:
+        query = query.where(Result.is_published == "published")
+
+    rows = (await db.execute(query)).all()
+    stats = describe_groups([row.marks for row in rows], [row.grades for row in rows], settings.result_pass_mark)
+
+    report = {
+        **params,
+        "overall": stats["overall"],
+        "groups": [
+            {
+                **{name: (str(value) if name == "unit_id" else value) for name, value in row._asdict().items()
+                   if name not in ("marks", "grades")},
+                **summary,
+            }
+            for row, summary in zip(rows, stats["groups"])
+        ],
+    }
+    await redis.set(key, json.dumps(report, separators=(",", ":")), ex=STATS_CACHE_TTL)
+    return report
@@ -0,0 +1,230 @@
+"""
+Two-tier cache for reference data: a per-worker LRU in front of Redis.
+
+Values are validated into a declared type on the way in (so a cached
+``List[UnitResponse]`` comes back as exactly that) and stored in Redis as
+JSON. Every entry carries invalidation tags. ``invalidate()`` bumps each
+tag's epoch, deletes the tagged Redis keys and publishes the tags, and
+every worker's listener then drops its local copies. A load that started
+before an invalidation is not written back, because the epochs it read
+no longer match.
+
+Stampedes are contained twice over. Within a worker, concurrent misses
+for a key share one load (``coalesce=True`` extends that to all workers
+through ``app.coalesce``). A Redis entry is also refreshed a little
+before it expires, by one caller chosen at random (probabilistic early
+expiration, weighted by how long the value took to compute).
+"""
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+import asyncio
+import math
+import random
+import time
+
+import structlog
+
+from app.coalesce import SingleFlight, single_flight, type_adapter
+from app.config import settings
+
+logger = structlog.get_logger()
+
+VALUE_KEY = "cache:v:{}"
+TAG_KEY = "cache:tag:{}"
+EPOCH_KEY = "cache:epoch:{}"
+INVALIDATION_CHANNEL = "cache:invalidations"
+
+# How eagerly entries are recomputed before they expire (1.0 is the usual choice)
+EARLY_REFRESH_BETA = 1.0
+
+# KEYS: value key, n epoch keys, n tag sets. ARGV: payload, ttl ms, n, n expected epochs.
+# Stores nothing if any tag was invalidated while the value was being loaded.
+STORE_SCRIPT = """
+local n = tonumber(ARGV[3])
+for i = 1, n do
+    if (redis.call('GET', KEYS[1 + i]) or '0') ~= ARGV[3 + i] then
+        return 0
+    end
+end
+local ttl = tonumber(ARGV[2])
+redis.call('SET', KEYS[1], ARGV[1], 'PX', ttl)
+for i = 1, n do
+    local tag = KEYS[1 + n + i]
+    redis.call('SADD', tag, KEYS[1])
+    if redis.call('PTTL', tag) < ttl then
+        redis.call('PEXPIRE', tag, ttl)
+    end
+end
+return 1
+"""
+
+# KEYS: n epoch keys, n tag sets. ARGV: channel, message.
+INVALIDATE_SCRIPT = """
+local n = #KEYS / 2
+for i = 1, n do
+    redis.call('INCR', KEYS[i])
+    local members = redis.call('SMEMBERS', KEYS[n + i])
+    for j = 1, #members, 500 do
+        redis.call('DEL', unpack(members, j, math.min(j + 499, #members)))
+    end
+    redis.call('DEL', KEYS[n + i])
+end
+redis.call('PUBLISH', ARGV[1], ARGV[2])
+return n
+"""
+
+
+class TwoTierCache:
+    def __init__(self, local_size: int, local_ttl: float, default_ttl: float):
+        self.local_size = local_size
+        self.local_ttl = local_ttl
+        self.default_ttl = default_ttl
+        self._local: "OrderedDict[str, Tuple[Any, float, Tuple[str, ...]]]" = OrderedDict()
+        self._tagged: Dict[str, Set[str]] = {}
+        self._generations: Dict[str, int] = {}
+        self._loads = SingleFlight()
+
+    # ---- local tier ----
+    def _local_get(self, key: str) -> Tuple[bool, Any]:
+        entry = self._local.get(key)
+        if entry is None:
+            return False, None
+        value, expires_at, _ = entry
+        if expires_at <= time.monotonic():
+            self._local_drop(key)
+            return False, None
+        self._local.move_to_end(key)
+        return True, value
+
+    def _local_put(self, key: str, value: Any, ttl: float, tags: Tuple[str, ...]):
+        if self.local_size <= 0:
+            return
+        self._local_drop(key)
+        self._local[key] = (value, time.monotonic() + min(ttl, self.local_ttl), tags)
+        for tag in tags:
+            self._tagged.setdefault(tag, set()).add(key)
+        while len(self._local) > self.local_size:
+            self._local_drop(next(iter(self._local)))
+
+    def _local_drop(self, key: str):
+        entry = self._local.pop(key, None)
+        if entry is not None:
+            for tag in entry[2]:
+                self._tagged.get(tag, set()).discard(key)
+
+    def drop_tags(self, tags: Iterable[str]):
+        """Forget local entries carrying any of ``tags`` (this worker only)."""
+        for tag in tags:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+            for key in self._tagged.pop(tag, set()):
+                self._local_drop(key)
+
+    def clear(self):
+        self._local.clear()
+        self._tagged.clear()
+        # Bumping every generation also stops in-flight loads from being kept
+        for tag in self._generations:
+            self._generations[tag] += 1
+
+    # ---- both tiers ----
+    async def get_or_load(
+        self,
+        redis,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        type_: Any,
+        *,
+        ttl: Optional[float] = None,
+        tags: Iterable[str] = (),
+        coalesce: bool = False,
+    ) -> Any:
+        """The cached value for ``key``, else ``await loader()`` validated as ``type_`` and cached.
+
+        With ``coalesce`` a miss runs the loader in one worker only while
+        the others wait for its result. Cached values are shared between
+        callers; treat them as read-only. For the same reason ``loader``
+        must open its own session rather than use the caller's, which
+        closes when that caller's request ends. That session comes from
+        ``shared_session_maker``, never ``async_session_maker``: callers
+        usually hold a request connection while they wait, and a burst of
+        them can hold every one, so a load taking from the request pool
+        would stall until ``pool_timeout``.
+        """
+        found, value = self._local_get(key)
+        if found:
+            return value
+        return await self._loads.do(
+            key, lambda: self._load(redis, key, loader, type_, ttl or self.default_ttl, tuple(tags), coalesce)
+        )
+
+    async def _load(self, redis, key: str, loader, type_, ttl: float, tags: Tuple[str, ...], coalesce: bool) -> Any:
+        adapter = type_adapter(type_)
+        raw = await redis.get(VALUE_KEY.format(key))
+        if raw is not None:
+            expires_at, compute_seconds, payload = raw.split("|", 2)
+            early = -float(compute_seconds) * EARLY_REFRESH_BETA * math.log(1.0 - random.random())
+            if time.time() + early < float(expires_at):
+                value = adapter.validate_json(payload)
+                self._local_put(key, value, ttl, tags)
+                return value
+
+        generations = {tag: self._generations.get(tag, 0) for tag in tags}
+        epochs = await redis.mget([EPOCH_KEY.format(tag) for tag in tags]) if tags else []
+
+        started = time.monotonic()
+        if coalesce:
+            value = await single_flight.do(redis, f"cache:{key}", loader, type_)
+        else:
+            value = adapter.validate_python(await loader(), from_attributes=True)
+        compute_seconds = time.monotonic() - started
+
+        payload = adapter.dump_json(value).decode()
+        await redis.eval(
+            STORE_SCRIPT,
+            1 + 2 * len(tags),
+            VALUE_KEY.format(key),
+            *(EPOCH_KEY.format(tag) for tag in tags),
+            *(TAG_KEY.format(tag) for tag in tags),
+            f"{time.time() + ttl:.3f}|{compute_seconds:.4f}|{payload}",
+            int(ttl * 1000),
+            len(tags),
+            *(epoch or "0" for epoch in epochs),
+        )
+        if all(self._generations.get(tag, 0) == generation for tag, generation in generations.items()):
+            self._local_put(key, value, ttl, tags)
+        return value
+
+    async def invalidate(self, redis, *tags: str):
+        """Drop every entry carrying any of ``tags`` in Redis and in every worker."""
+        if not tags:
+            return
+        self.drop_tags(tags)
+        await redis.eval(
+            INVALIDATE_SCRIPT,
+            2 * len(tags),
+            *(EPOCH_KEY.format(tag) for tag in tags),
+            *(TAG_KEY.format(tag) for tag in tags),
+            INVALIDATION_CHANNEL,
+            " ".join(tags),
+        )
+
+
+cache = TwoTierCache(settings.cache_local_size, settings.cache_local_ttl, settings.cache_default_ttl)
+
+
+async def listen_for_invalidations(redis):
+    """Apply invalidations published by any worker to this worker's local tier."""
+    while True:
+        try:
+            async with redis.pubsub() as pubsub:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        cache.drop_tags(message["data"].split())
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            # Invalidations may have been missed while disconnected
+            logger.warning("Cache invalidation listener disconnected", error=str(exc))
+            cache.clear()
+            await asyncio.sleep(1)
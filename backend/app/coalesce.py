@@ -0,0 +1,110 @@
+"""
+Coalescing of identical concurrent reads.
+
+``SingleFlight`` runs one call per key inside a worker and hands its
+result (or exception) to every caller that arrived while it ran.
+``RedisSingleFlight`` adds a Redis lock in front so that one worker
+leads each flight: the leader runs the query and publishes the result
+under its flight id, and callers in other workers poll for it without
+touching the database. A burst of identical requests therefore costs one
+query per key, whatever the traffic. Nothing is kept once a flight
+lands; callers arriving later start a new one (use ``app.cache`` for
+that). A flight outlives the caller that started it, so the function it
+runs must open its own database session (``shared_session_maker``)
+instead of closing over a request's.
+"""
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict
+import asyncio
+import hashlib
+import time
+import uuid
+
+from pydantic import TypeAdapter
+from sqlalchemy.dialects import postgresql
+
+from app.config import settings
+
+FLIGHT_LOCK_KEY = "flight:lock:{}"
+FLIGHT_RESULT_KEY = "flight:result:{}:{}"
+RESULT_TTL_MS = 5000
+
+# Release the lock only if this flight still holds it
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+@lru_cache(maxsize=None)
+def type_adapter(type_: Any) -> TypeAdapter:
+    return TypeAdapter(type_)
+
+
+def statement_key(statement) -> str:
+    """Key for a SELECT: its SQL plus bound parameters."""
+    compiled = statement.compile(dialect=postgresql.dialect())
+    params = sorted(compiled.params.items())
+    return hashlib.sha256(f"{compiled}|{params!r}".encode()).hexdigest()[:32]
+
+
+class SingleFlight:
+    def __init__(self):
+        self._flights: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """``await fn()``, shared with every concurrent caller using the same ``key``."""
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = asyncio.ensure_future(fn())
+            self._flights[key] = flight
+            flight.add_done_callback(lambda _: self._flights.pop(key, None))
+        # Shielded so one caller going away doesn't cancel the call for the others
+        return await asyncio.shield(flight)
+
+
+class RedisSingleFlight:
+    def __init__(self, wait_seconds: float, poll_interval: float):
+        self.wait_seconds = wait_seconds
+        self.poll_interval = poll_interval
+        self.local = SingleFlight()
+
+    async def do(self, redis, key: str, fn: Callable[[], Awaitable[Any]], type_: Any) -> Any:
+        """``await fn()`` validated as ``type_``, run once per key across all workers."""
+        # One caller per worker takes part in the cross-worker flight
+        return await self.local.do(key, lambda: self._do(redis, key, fn, type_))
+
+    async def _do(self, redis, key: str, fn, type_) -> Any:
+        adapter = type_adapter(type_)
+        lock_key = FLIGHT_LOCK_KEY.format(key)
+        flight_id = uuid.uuid4().hex
+        if await redis.set(lock_key, flight_id, nx=True, px=int(self.wait_seconds * 1000)):
+            try:
+                value = adapter.validate_python(await fn(), from_attributes=True)
+                await redis.set(
+                    FLIGHT_RESULT_KEY.format(key, flight_id), adapter.dump_json(value).decode(), px=RESULT_TTL_MS
+                )
+                return value
+            finally:
+                await redis.eval(RELEASE_SCRIPT, 1, lock_key, flight_id)
+
+        leader = await redis.get(lock_key)
+        deadline = time.monotonic() + self.wait_seconds
+        while leader is not None and time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            # The leader stores its result before releasing the lock, so read the lock first
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.get(lock_key)
+                pipe.get(FLIGHT_RESULT_KEY.format(key, leader))
+                current, raw = await pipe.execute()
+            if raw is not None:
+                return adapter.validate_json(raw)
+            if current != leader:
+                break  # the leader failed; run the query here rather than queue behind a new flight
+
+        return adapter.validate_python(await fn(), from_attributes=True)
+
+
+single_flight = RedisSingleFlight(settings.coalesce_wait_seconds, settings.coalesce_poll_interval)
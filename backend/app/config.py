@@ -18,16 +18,32 @@ class Settings(BaseSettings):
     database_url: str
     database_pool_size: int = 20
     database_max_overflow: int = 10
+    database_max_connections: int = 0  # when set, split across workers instead of pool_size/max_overflow
+    database_shared_connections: int = 2  # per worker, for shared cache loads and flights only
+    database_pool_timeout: float = 30.0
+    database_pool_recycle: int = 1800
+    database_pool_pre_ping: bool = False  # ping every checkout; otherwise only long-idle connections
+    database_liveness_interval: float = 30.0  # ping connections idle this long on checkout; 0 disables
+    database_pool_wait_warn_ms: float = 250.0
+    database_pgbouncer: bool = False  # transaction pooling: no prepared statement cache
+    database_warmup_connections: int = 2
+    
+    # Gunicorn workers (set by gunicorn.conf.py), used to split database_max_connections
+    web_concurrency: int = 1
     
     # Redis
     redis_url: str
     redis_session_db: int = 1
+    redis_max_connections: int = 10
+    redis_pool_timeout: float = 5.0
     
     # Security
     secret_key: str
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     refresh_token_expire_days: int = 7
+    refresh_reuse_grace_seconds: int = 10  # a just-rotated refresh token still gets the same new pair
+    token_cache_size: int = 10000
     
     # CORS
     allowed_origins: str = "http://localhost:8000"
@@ -36,6 +52,25 @@ class Settings(BaseSettings):
     def cors_origins(self) -> List[str]:
         return [origin.strip() for origin in self.allowed_origins.split(",")]
     
+    # Reference data cache (per-worker LRU in front of Redis)
+    cache_local_size: int = 1024
+    cache_local_ttl: float = 30.0  # bounds staleness if an invalidation message is missed
+    cache_default_ttl: float = 300.0
+    
+    # Coalescing of identical concurrent reads across workers
+    coalesce_wait_seconds: float = 10.0  # longest a caller waits on another worker's query
+    coalesce_poll_interval: float = 0.01
+    
+    # Results
+    result_pass_mark: float = 40.0
+    
+    # Finance rollup views (refreshed by one app worker per interval)
+    finance_rollup_refresh_seconds: float = 300.0
+    
+    # Write-behind buffer (last_login stamps and audit events)
+    write_behind_flush_seconds: float = 2.0
+    write_behind_max_events: int = 1000
+    
     # Rate Limiting
     rate_limit_per_minute: int = 60
     
@@ -46,19 +81,65 @@ class Settings(BaseSettings):
     require_digit: bool = True
     
     # Session
+    session_enabled: bool = False  # server-side sessions in redis_session_db
     session_cookie_name: str = "fiesta_session"
-    session_max_age: int = 3600
+    session_max_age: int = 3600  # sliding: idle sessions expire after this
+    session_absolute_max_age: int = 43200  # active sessions end this long after login
     
     # File Upload
     max_upload_size: int = 5242880  # 5MB
     
+    # Bulk admissions (CSV import)
+    admission_hash_workers: int = 2  # processes per app worker
+    admission_max_rows: int = 5000
+    
+    # Printable documents (fee statements, result slips)
+    document_render_workers: int = 2  # processes per app worker
+    document_cache_ttl: int = 86400
+    
     # Email
     smtp_host: str = "smtp.gmail.com"
     smtp_port: int = 587
     smtp_user: str = ""
     smtp_password: str = ""
     smtp_from: str = "noreply@fiesta.edu"
+    smtp_starttls: bool = True
+    smtp_timeout: float = 30.0
+    
+    # Email queue (python -m app.notifications.worker)
+    mail_enabled: bool = True
+    mail_pool_size: int = 2  # SMTP connections held open by the worker
+    mail_batch_size: int = 100
+    mail_max_attempts: int = 5
+    mail_retry_base_seconds: float = 30.0
+    mail_outbox_max_length: int = 100000
     
+    # Logging (JSON lines on stdout, written by a background thread)
+    log_level: str = "info"
+    log_queue_size: int = 10000  # records beyond this are dropped and counted, never waited on
+    log_sample_rates: str = ""  # e.g. "debug=0.1,/health=0"; warnings and errors are always kept
+    log_access: bool = True  # one record per request from the app (replaces gunicorn's access log)
+
+    # Academic-year partitions (python -m app.partitions)
+    academic_year_start_month: int = 9  # an academic year runs from this month to the one before it
+    archive_batch_size: int = 5000  # rows per transaction when archiving graduated students
+
+    # Term rollover (python -m app.rollover)
+    rollover_batch_size: int = 1000  # rows per transaction
+    rollover_pause_seconds: float = 0.05  # between batches, to leave room for API traffic
+
+    # Slow-query log (GET /api/admin/reports/slow-queries)
+    slow_query_ms: float = 200.0  # 0 disables
+    slow_query_explain_after: int = 3  # slow executions before a statement is EXPLAINed; 0 disables
+    slow_query_explain_timeout_ms: int = 10000
+    slow_query_flush_seconds: float = 5.0
+    slow_query_keep: int = 500  # statements ranked in the report
+
+    # Request profiling (admins send X-Profile: 1; see /api/admin/profiles)
+    profile_sample_every: int = 0  # also profile 1 request in N per worker; 0 disables
+    profile_keep: int = 100
+    profile_ttl_seconds: int = 86400
+
     # Sentry
     sentry_dsn: str = ""
     
@@ -1,20 +1,113 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy import event, exc, text
 from app.config import settings
 import redis.asyncio as aioredis
-from typing import AsyncGenerator
+from bisect import bisect_left
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, AsyncGenerator, Dict, FrozenSet, List, Tuple
+from urllib.parse import urlsplit, urlunsplit
+import asyncio
+import os
+import time
+import uuid
+import structlog
+
+logger = structlog.get_logger()
 
 # SQLAlchemy Base
 Base = declarative_base()
 
+
+class PoolStats:
+    """How long checkouts from this worker's database pool waited."""
+    BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000)
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.buckets = [0] * (len(self.BUCKETS_MS) + 1)
+
+    def record(self, seconds: float, timed_out: bool = False):
+        self.checkouts += 1
+        self.timeouts += timed_out
+        self.total_wait += seconds
+        self.max_wait = max(self.max_wait, seconds)
+        self.buckets[bisect_left(self.BUCKETS_MS, seconds * 1000)] += 1
+        if seconds * 1000 >= settings.database_pool_wait_warn_ms:
+            logger.warning("Slow database pool checkout", wait_ms=round(seconds * 1000, 1), timed_out=timed_out)
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"<={limit}ms" for limit in self.BUCKETS_MS] + [f">{self.BUCKETS_MS[-1]}ms"]
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "mean_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "wait_histogram": dict(zip(labels, self.buckets)),
+        }
+
+
+pool_stats = PoolStats()
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records checkout wait times in ``pool_stats``."""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            pool_stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        pool_stats.record(time.perf_counter() - started)
+        return connection
+
+
+def pool_limits() -> Tuple[int, int]:
+    """``(pool_size, max_overflow)`` of this worker's request pool.
+
+    With ``database_max_connections`` set, that budget is split evenly
+    across the gunicorn workers so adding workers never exceeds it, and
+    each worker's ``database_shared_connections`` come out of its share.
+    """
+    if settings.database_max_connections:
+        share = max(1, settings.database_max_connections // max(1, settings.web_concurrency))
+        return max(1, share - settings.database_shared_connections), 0
+    return settings.database_pool_size, settings.database_max_overflow
+
+
+def engine_options(pool_size: int, max_overflow: int) -> Dict[str, Any]:
+    options: Dict[str, Any] = {
+        "poolclass": TimedQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.database_pool_timeout,
+        "pool_recycle": settings.database_pool_recycle,
+        # Per-checkout pings are off by default; ping_idle_connections only pings long-idle ones
+        "pool_pre_ping": settings.database_pool_pre_ping,
+        # Reuse the most recent connections so the rest can idle out at the server/PgBouncer
+        "pool_use_lifo": True,
+        # No echo: with DEBUG, app.logs routes sqlalchemy.engine through the log queue
+    }
+    if settings.database_pgbouncer:
+        # PgBouncer in transaction mode may hand each transaction a different server
+        # connection, so named prepared statements can't be cached or reused
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+    return options
+
+
 # Create async engine
-engine = create_async_engine(
-    settings.database_url,
-    pool_size=settings.database_pool_size,
-    max_overflow=settings.database_max_overflow,
-    pool_pre_ping=True,
-    echo=settings.debug,
-)
+engine = create_async_engine(settings.database_url, **engine_options(*pool_limits()))
 
 # Create async session factory
 async_session_maker = async_sessionmaker(
@@ -25,6 +118,31 @@ async_session_maker = async_sessionmaker(
     autoflush=False,
 )
 
+# Shared cache loads and flights run on a pool of their own. The requests waiting
+# on a load each hold a connection from the request pool, so a burst of them
+# could otherwise leave the load no connection to run on.
+shared_engine = create_async_engine(
+    settings.database_url, **engine_options(max(1, settings.database_shared_connections), 0)
+)
+shared_session_maker = async_sessionmaker(
+    shared_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
+def _redis_connection_pool(url: str) -> aioredis.BlockingConnectionPool:
+    # Callers wait up to redis_pool_timeout for a free connection instead of failing at the limit
+    return aioredis.BlockingConnectionPool.from_url(
+        url,
+        encoding="utf-8",
+        decode_responses=True,
+        max_connections=settings.redis_max_connections,
+        timeout=settings.redis_pool_timeout,
+    )
+
+
 # Redis connection pool
 redis_pool = None
 
@@ -32,20 +150,30 @@ redis_pool = None
 async def get_redis_pool():
     global redis_pool
     if redis_pool is None:
-        redis_pool = aioredis.from_url(
-            settings.redis_url,
-            encoding="utf-8",
-            decode_responses=True,
-            max_connections=10
-        )
+        redis_pool = aioredis.Redis.from_pool(_redis_connection_pool(settings.redis_url))
     return redis_pool
 
 
 async def close_redis_pool():
-    global redis_pool
+    global redis_pool, session_redis_pool
     if redis_pool:
         await redis_pool.close()
         redis_pool = None
+    if session_redis_pool:
+        await session_redis_pool.close()
+        session_redis_pool = None
+
+
+# Redis connection pool for server-side sessions (separate logical DB)
+session_redis_pool = None
+
+
+async def get_session_redis_pool():
+    global session_redis_pool
+    if session_redis_pool is None:
+        url = urlsplit(settings.redis_url)._replace(path=f"/{settings.redis_session_db}")
+        session_redis_pool = aioredis.Redis.from_pool(_redis_connection_pool(urlunsplit(url)))
+    return session_redis_pool
 
 
 # Dependency for getting database session
@@ -67,13 +195,144 @@ async def get_redis():
     return pool
 
 
+# Dependency for getting the session-store Redis connection
+async def get_session_redis():
+    pool = await get_session_redis_pool()
+    return pool
+
+
 # Initialize database tables
 async def init_db():
+    from app.models.finance import create_finance_views
+    from app.partitions import create_partitions, current_academic_year, next_academic_year
+
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        current = current_academic_year()
+        await conn.run_sync(create_partitions, [current, next_academic_year(current)])
+        await conn.run_sync(create_finance_views)
+
+
+class SchemaVersionError(RuntimeError):
+    """Raised when the database is not migrated to the Alembic head."""
+
+
+@lru_cache()
+def expected_schema_heads() -> FrozenSet[str]:
+    """Resolve the Alembic head revision(s) from the migration scripts.
+
+    Alembic is imported lazily so that normal requests never pay for it;
+    the production launcher calls this once in the master process before
+    forking so workers inherit the cached value.
+    """
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    backend_dir = Path(__file__).resolve().parent.parent
+    config = Config(str(backend_dir / "alembic.ini"))
+    config.set_main_option("script_location", str(backend_dir / "alembic"))
+    return frozenset(ScriptDirectory.from_config(config).get_heads())
+
+
+async def check_schema_version():
+    """Verify the database is at the Alembic head instead of running create_all."""
+    async with engine.connect() as conn:
+        result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+        current = frozenset(result.scalars().all())
+
+    expected = expected_schema_heads()
+    if current != expected:
+        raise SchemaVersionError(
+            f"Database schema is at {sorted(current) or 'no revision'}, "
+            f"expected {sorted(expected)}. Run 'alembic upgrade head'."
+        )
+
+
+async def _ping_connections(count: int) -> List[BaseException]:
+    """Check out ``count`` connections at once and run ``SELECT 1`` on each."""
+    async def _touch():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    results = await asyncio.gather(*(_touch() for _ in range(count)), return_exceptions=True)
+    return [result for result in results if isinstance(result, BaseException)]
+
+
+async def warm_up_pools():
+    """Open pooled DB connections and ping Redis before serving traffic."""
+    failures = await _ping_connections(min(settings.database_warmup_connections, pool_limits()[0]))
+    if failures:
+        raise failures[0]
+
+    redis = await get_redis_pool()
+    await redis.ping()
+
+
+def ping_idle_connections(engine, idle_seconds: float):
+    """Ping a pooled connection on checkout only if it sat idle ``idle_seconds`` or longer.
+
+    With LIFO reuse a busy worker keeps handing out connections it just
+    returned, so these pings only happen after a quiet spell, not on
+    every checkout, and no extra connections are checked out to make
+    them. A failed ping invalidates the pool, since a dead idle
+    connection usually means the server or PgBouncer restarted, and the
+    checkout is retried on a fresh connection.
+    """
+    pool = engine.sync_engine.pool
+    dialect = engine.sync_engine.dialect
+
+    @event.listens_for(pool, "connect")
+    @event.listens_for(pool, "checkin")
+    def _idle_since(dbapi_connection, connection_record):
+        connection_record.info["idle_since"] = time.monotonic()
+
+    @event.listens_for(pool, "checkout")
+    def _ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        idle = time.monotonic() - connection_record.info.get("idle_since", time.monotonic())
+        if idle < idle_seconds:
+            return
+        try:
+            dialect.do_ping(dbapi_connection)
+        except Exception as error:
+            logger.warning("Replacing dead database connections", idle_seconds=round(idle), error=str(error))
+            raise exc.InvalidatePoolError() from error
+
+
+if settings.database_liveness_interval > 0 and not settings.database_pool_pre_ping:
+    ping_idle_connections(engine, settings.database_liveness_interval)
+    ping_idle_connections(shared_engine, settings.database_liveness_interval)
+
+
+def pool_status() -> Dict[str, Any]:
+    """This worker's database and Redis pool usage plus checkout wait times."""
+    pool = engine.pool
+    pool_size, max_overflow = pool_limits()
+    status = {
+        "pid": os.getpid(),
+        "database": {
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(0, pool.overflow()),
+            "shared_checked_out": shared_engine.pool.checkedout(),
+            "pgbouncer": settings.database_pgbouncer,
+            **pool_stats.snapshot(),
+        },
+    }
+    for name, client in (("redis", redis_pool), ("session_redis", session_redis_pool)):
+        if client is not None:
+            connections = client.connection_pool
+            status[name] = {
+                "max_connections": connections.max_connections,
+                "in_use": len(connections._in_use_connections),
+                "idle": len(connections._available_connections),
+            }
+    return status
 
 
 # Close database connections
 async def close_db():
     await engine.dispose()
+    await shared_engine.dispose()
     await close_redis_pool()
\ No newline at end of file
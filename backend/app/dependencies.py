@@ -5,20 +5,47 @@ from sqlalchemy import select
 from typing import Optional
 from uuid import UUID
 
-from app.database import get_db
-from app.security import decode_token, validate_token_type
+from app.config import settings
+from app.database import get_db, get_redis, get_session_redis
+from app.security import verify_token, validate_token_type
+from app.sessions import cache_session_student, load_session, session_student, session_user
 from app.models import User, Student, UserRole
 
-security = HTTPBearer()
+security = HTTPBearer(auto_error=False)
 
 
 async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    db: AsyncSession = Depends(get_db),
+    redis=Depends(get_redis),
+    session_redis=Depends(get_session_redis)
 ) -> User:
-    """Get current authenticated user from JWT token."""
+    """Get current authenticated user from the session cookie or JWT token."""
+    # Session mode: one Redis round trip, no JWT parsing or user lookup
+    session_id = request.cookies.get(settings.session_cookie_name) if settings.session_enabled else None
+    if session_id:
+        record, student = await load_session(session_redis, session_id)
+        if record is not None:
+            request.state.session = record
+            request.state.session_student = student
+            user = session_user(record)
+            if not user.is_active:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Inactive user"
+                )
+            return user
+    
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
     token = credentials.credentials
-    payload = decode_token(token)
+    payload = await verify_token(token, redis)
     
     if payload is None:
         raise HTTPException(
@@ -73,8 +100,10 @@ async def get_current_active_user(
 
 
 async def get_current_student(
+    request: Request,
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    session_redis=Depends(get_session_redis)
 ) -> Student:
     """Get current student profile. Requires student role."""
     if current_user.role != UserRole.STUDENT:
@@ -83,10 +112,23 @@ async def get_current_student(
             detail="Not authorized. Student access required."
         )
     
-    result = await db.execute(
-        select(Student).where(Student.user_id == current_user.id)
-    )
-    student = result.scalar_one_or_none()
+    session = getattr(request.state, "session", None)
+    if session and request.state.session_student:
+        # Read with the session record; attached so handlers can update it as usual
+        student = session_student(request.state.session_student)
+        db.add(student)
+    elif session and session.get("student"):
+        # Sessions carry the student's primary key; keep the row with the session for next time
+        student = await db.get(Student, UUID(session["student"]))
+        if student is not None:
+            await cache_session_student(
+                session_redis, request.cookies[settings.session_cookie_name], student
+            )
+    else:
+        result = await db.execute(
+            select(Student).where(Student.user_id == current_user.id)
+        )
+        student = result.scalar_one_or_none()
     
     if student is None:
         raise HTTPException(
@@ -0,0 +1,4 @@
+from app.documents.render import DOCUMENTS
+from app.documents.service import documents
+
+__all__ = ["DOCUMENTS", "documents"]
@@ -0,0 +1,45 @@
+"""
+Document rendering, run inside the document process pool.
+
+Kept free of application imports beyond Jinja so spawned workers start
+quickly; contexts arrive as plain picklable dicts.
+"""
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict
+import hashlib
+
+from jinja2 import Environment, FileSystemLoader, StrictUndefined
+
+TEMPLATE_DIR = Path(__file__).resolve().parent / "templates"
+
+DOCUMENTS = {
+    "fee-statement": "fee_statement.html",
+    "result-slip": "result_slip.html",
+}
+
+
+@lru_cache(maxsize=None)
+def _environment() -> Environment:
+    environment = Environment(
+        loader=FileSystemLoader(str(TEMPLATE_DIR)),
+        autoescape=True,
+        undefined=StrictUndefined,
+        trim_blocks=True,
+        lstrip_blocks=True,
+    )
+    environment.filters["money"] = lambda value: f"{value:,.2f}"
+    return environment
+
+
+@lru_cache(maxsize=None)
+def templates_version() -> str:
+    """Digest of every template, so editing one invalidates cached output."""
+    digest = hashlib.sha256()
+    for path in sorted(TEMPLATE_DIR.glob("*.html")):
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def render_document(kind: str, context: Dict[str, Any]) -> str:
+    return _environment().get_template(DOCUMENTS[kind]).render(context)
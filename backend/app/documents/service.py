@@ -0,0 +1,144 @@
+"""
+Printable fee statements and result slips.
+
+Each document is keyed by a SHA-256 of the rows it is rendered from (plus
+the template version). A cached copy under ``doc:<kind>:<digest>`` is
+served as-is; only when the underlying fees, payments or results change
+does the digest change and the document get rendered again, in a
+process pool so templates never run on the event loop.
+"""
+from datetime import datetime
+from typing import Any, Dict, Tuple
+import hashlib
+import json
+
+from fastapi import Request
+from fastapi.responses import HTMLResponse, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import Student, Unit, UnitRegistration, Result, FeeStructure, Payment
+from app.documents.render import render_document, templates_version
+from app.utils.process_pool import WorkerProcessPool
+
+DOCUMENT_KEY = "doc:{}:{}"
+
+
+def _student_header(student: Student) -> Dict[str, Any]:
+    return {
+        "student_id": student.student_id,
+        "name": " ".join(filter(None, [student.first_name, student.middle_name, student.last_name])),
+        "program": student.program,
+        "enrollment_date": student.enrollment_date.isoformat(),
+    }
+
+
+async def fee_statement_context(db: AsyncSession, student: Student) -> Dict[str, Any]:
+    fees = (await db.execute(
+        select(
+            FeeStructure.academic_year, FeeStructure.semester, FeeStructure.fee_type,
+            FeeStructure.description, FeeStructure.amount,
+        )
+        .where(FeeStructure.student_id == student.id)
+        .order_by(FeeStructure.academic_year, FeeStructure.semester, FeeStructure.created_at)
+    )).all()
+    payments = (await db.execute(
+        select(
+            Payment.payment_date, Payment.reference_number, Payment.payment_method,
+            Payment.academic_year, Payment.semester, Payment.amount,
+        )
+        .where(Payment.student_id == student.id)
+        .order_by(Payment.payment_date)
+    )).all()
+
+    total_billed = sum(fee.amount for fee in fees)
+    total_paid = sum(payment.amount for payment in payments)
+    return {
+        "student": _student_header(student),
+        "fees": [{**fee._asdict(), "fee_type": fee.fee_type.value} for fee in fees],
+        "payments": [{
+            **payment._asdict(),
+            "payment_date": payment.payment_date.date().isoformat(),
+            "payment_method": payment.payment_method.value.replace("_", " "),
+        } for payment in payments],
+        "total_billed": total_billed,
+        "total_paid": total_paid,
+        "balance": total_billed - total_paid,
+    }
+
+
+async def result_slip_context(db: AsyncSession, student: Student) -> Dict[str, Any]:
+    rows = (await db.execute(
+        select(
+            UnitRegistration.academic_year, UnitRegistration.semester,
+            Unit.unit_code, Unit.unit_name, Unit.credits,
+            Result.marks, Result.grade, Result.remarks,
+        )
+        .join(UnitRegistration, Result.registration)
+        .join(Unit, UnitRegistration.unit_id == Unit.id)
+        .where(UnitRegistration.student_id == student.id)
+        .where(Result.is_published == "published")
+        .order_by(UnitRegistration.academic_year, UnitRegistration.semester, Unit.unit_code)
+    )).all()
+
+    periods = []
+    for row in rows:
+        period = (row.academic_year, row.semester.value.title())
+        if not periods or (periods[-1]["academic_year"], periods[-1]["semester"]) != period:
+            periods.append({"academic_year": period[0], "semester": period[1], "results": []})
+        periods[-1]["results"].append({
+            "unit_code": row.unit_code, "unit_name": row.unit_name, "credits": row.credits,
+            "marks": row.marks, "grade": row.grade, "remarks": row.remarks,
+        })
+    return {"student": _student_header(student), "periods": periods}
+
+
+CONTEXT_BUILDERS = {
+    "fee-statement": fee_statement_context,
+    "result-slip": result_slip_context,
+}
+
+
+def content_digest(kind: str, context: Dict[str, Any]) -> str:
+    payload = json.dumps(context, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(f"{kind}:{templates_version()}:{payload}".encode()).hexdigest()
+
+
+class DocumentService:
+    def __init__(self, max_workers: int, cache_ttl: int):
+        self.cache_ttl = cache_ttl
+        self._pool = WorkerProcessPool(max_workers)
+
+    async def build(self, db: AsyncSession, kind: str, student: Student) -> Tuple[str, Dict[str, Any]]:
+        """Load the rows behind a document; returns ``(digest, context)``."""
+        context = await CONTEXT_BUILDERS[kind](db, student)
+        return content_digest(kind, context), context
+
+    async def render(self, redis, kind: str, digest: str, context: Dict[str, Any]) -> str:
+        key = DOCUMENT_KEY.format(kind, digest)
+        cached = await redis.getex(key, ex=self.cache_ttl)
+        if cached is not None:
+            return cached
+
+        document = await self._pool.run(render_document, kind, {
+            **context,
+            "reference": digest[:12].upper(),
+            "generated_at": datetime.utcnow().strftime("%d %b %Y %H:%M UTC"),
+        })
+        await redis.set(key, document, ex=self.cache_ttl)
+        return document
+
+    async def respond(self, request: Request, db: AsyncSession, redis, kind: str, student: Student) -> Response:
+        """Serve a document, answering conditional requests without rendering or reading the cache."""
+        digest, context = await self.build(db, kind, student)
+        headers = {"ETag": f'"{digest}"', "Cache-Control": "private, no-cache"}
+        if request.headers.get("if-none-match") == headers["ETag"]:
+            return Response(status_code=304, headers=headers)
+        return HTMLResponse(await self.render(redis, kind, digest, context), headers=headers)
+
+    def close(self):
+        self._pool.close()
+
+
+documents = DocumentService(settings.document_render_workers, settings.document_cache_ttl)
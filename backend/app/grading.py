@@ -0,0 +1,111 @@
+"""
+Grades derived from marks using the configured grading schemes.
+
+The bands come from the two-tier cache (tag ``grading``, invalidated
+whenever a scheme changes). Each scheme is compiled into a ``GradeLookup``
+(ascending thresholds plus a bisect) once per cached copy. Re-grading a
+semester is a single set-based ``UPDATE`` joined against the bands.
+"""
+from bisect import bisect_right
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, or_, select, update
+
+from app.cache import cache
+from app.database import shared_session_maker
+from app.models import Student, UnitRegistration, Result, Semester
+from app.models.grading import GradingScheme, GradeBand
+
+GRADING_TAG = "grading"
+BandRows = List[Tuple[Optional[str], Decimal, str]]
+
+
+class GradeLookup:
+    __slots__ = ("thresholds", "grades")
+
+    def __init__(self, bands: Sequence[Tuple[Decimal, str]]):
+        ordered = sorted(bands)
+        self.thresholds = [Decimal(min_marks) for min_marks, _ in ordered]
+        self.grades = [grade for _, grade in ordered]
+
+    def __call__(self, marks: Decimal) -> Optional[str]:
+        index = bisect_right(self.thresholds, Decimal(marks)) - 1
+        return self.grades[index] if index >= 0 else None
+
+
+class GradingSchemes:
+    def __init__(self):
+        self._rows: Optional[BandRows] = None
+        self._by_program: Dict[Optional[str], GradeLookup] = {}
+
+    async def lookup_for(self, redis, program: str) -> Optional[GradeLookup]:
+        """The program's scheme, else the default scheme, else None."""
+        async def load():
+            async with shared_session_maker() as session:
+                rows = await session.execute(
+                    select(GradingScheme.program, GradeBand.min_marks, GradeBand.grade)
+                    .join(GradeBand, GradeBand.scheme_id == GradingScheme.id)
+                )
+                return [tuple(row) for row in rows]
+
+        rows = await cache.get_or_load(redis, "grading:bands", load, BandRows, tags=(GRADING_TAG,))
+        if rows is not self._rows:
+            bands: Dict[Optional[str], list] = {}
+            for scheme_program, min_marks, grade in rows:
+                bands.setdefault(scheme_program, []).append((min_marks, grade))
+            self._by_program = {key: GradeLookup(entries) for key, entries in bands.items()}
+            self._rows = rows
+        return self._by_program.get(program) or self._by_program.get(None)
+
+    async def grade_for(self, redis, program: str, marks: Optional[Decimal]) -> Optional[str]:
+        if marks is None:
+            return None
+        lookup = await self.lookup_for(redis, program)
+        return lookup(marks) if lookup else None
+
+
+grading_schemes = GradingSchemes()
+
+
+async def invalidate_grading_schemes(redis):
+    await cache.invalidate(redis, GRADING_TAG)
+
+
+def regrade_statement(academic_year: str, semester: Semester, program: Optional[str] = None):
+    """One UPDATE that sets every result's grade from its program's (or the default) bands."""
+    bands = select(
+        GradeBand.scheme_id,
+        GradeBand.grade,
+        GradeBand.min_marks,
+        func.lead(GradeBand.min_marks).over(
+            partition_by=GradeBand.scheme_id, order_by=GradeBand.min_marks
+        ).label("max_marks"),
+    ).subquery("bands")
+    program_scheme = (
+        select(GradingScheme.id)
+        .where(GradingScheme.program == Student.program)
+        .correlate(Student)
+        .scalar_subquery()
+    )
+    default_scheme = select(GradingScheme.id).where(GradingScheme.program.is_(None)).scalar_subquery()
+
+    statement = (
+        update(Result)
+        .where(Result.registration_id == UnitRegistration.id)
+        .where(UnitRegistration.student_id == Student.id)
+        # Both sides by year so only that year's partitions are read and updated
+        .where(Result.academic_year == academic_year)
+        .where(UnitRegistration.academic_year == academic_year)
+        .where(UnitRegistration.semester == semester)
+        .where(Result.marks.is_not(None))
+        .where(bands.c.scheme_id == func.coalesce(program_scheme, default_scheme))
+        .where(Result.marks >= bands.c.min_marks)
+        .where(or_(bands.c.max_marks.is_(None), Result.marks < bands.c.max_marks))
+        .where(Result.grade.is_distinct_from(bands.c.grade))
+        .values(grade=bands.c.grade)
+        .execution_options(synchronize_session=False)
+    )
+    if program:
+        statement = statement.where(Student.program == program)
+    return statement
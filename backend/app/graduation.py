@@ -0,0 +1,148 @@
+"""
+Graduation eligibility.
+
+A program's requirements are a minimum number of credits and a set of
+required units, both counted from passed (``result_pass_mark``),
+published results. ``evaluate_graduation_requests`` checks every
+pending graduation request in one query: credits and passed units are
+aggregated over results, registrations and units, and the fee balance
+over fee structures and payments, for all requesting students at once.
+Each request then gets a verdict and the reasons behind it:
+
+- ``eligible``: requirements met and fees cleared;
+- ``ineligible``: at least one reason blocks graduation;
+- ``review``: nothing blocks it, but the program has no requirements set.
+
+Admins still approve or reject; the verdict only triages the queue.
+"""
+from collections import Counter
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, exists, func, select, update
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import (
+    FeeStructure, Payment, ProgramRequirement, RequestStatus, RequestType, Result, Student, StudentRequest,
+    Unit, UnitRegistration, program_required_units,
+)
+
+ELIGIBLE, INELIGIBLE, REVIEW = "eligible", "ineligible", "review"
+
+
+def evaluation_query(request_ids: Optional[Sequence[UUID]] = None):
+    """One row per pending graduation request with everything the verdict needs."""
+    pending = (
+        select(StudentRequest.id.label("request_id"), Student.id.label("student_id"),
+               Student.program, Student.is_graduated)
+        .join(Student, Student.id == StudentRequest.student_id)
+        .where(StudentRequest.request_type == RequestType.GRADUATION)
+        .where(StudentRequest.status == RequestStatus.PENDING)
+    )
+    if request_ids is not None:
+        pending = pending.where(StudentRequest.id.in_(request_ids))
+    pending = pending.cte("pending")
+    students = select(pending.c.student_id)
+
+    # Each passed unit once, however many times it was taken
+    passed = (
+        select(UnitRegistration.student_id, UnitRegistration.unit_id, Unit.credits)
+        .join(Result, and_(Result.registration_id == UnitRegistration.id,
+                           Result.academic_year == UnitRegistration.academic_year))
+        .join(Unit, Unit.id == UnitRegistration.unit_id)
+        .where(UnitRegistration.student_id.in_(students))
+        .where(Result.is_published == "published")
+        .where(Result.marks >= settings.result_pass_mark)
+        .distinct()
+        .cte("passed")
+    )
+    earned = (
+        select(passed.c.student_id, func.sum(passed.c.credits).label("credits"))
+        .group_by(passed.c.student_id)
+        .cte("earned")
+    )
+    missing = (
+        select(pending.c.request_id,
+               func.array_agg(aggregate_order_by(Unit.unit_code, Unit.unit_code)).label("units"))
+        .select_from(pending)
+        .join(ProgramRequirement, ProgramRequirement.program == pending.c.program)
+        .join(program_required_units, program_required_units.c.requirement_id == ProgramRequirement.id)
+        .join(Unit, Unit.id == program_required_units.c.unit_id)
+        .where(~exists()
+            .where(passed.c.student_id == pending.c.student_id)
+            .where(passed.c.unit_id == Unit.id))
+        .group_by(pending.c.request_id)
+        .cte("missing")
+    )
+    billed = (
+        select(FeeStructure.student_id, func.sum(FeeStructure.amount).label("amount"))
+        .where(FeeStructure.student_id.in_(students))
+        .group_by(FeeStructure.student_id)
+        .cte("billed")
+    )
+    paid = (
+        select(Payment.student_id, func.sum(Payment.amount).label("amount"))
+        .where(Payment.student_id.in_(students))
+        .group_by(Payment.student_id)
+        .cte("paid")
+    )
+    return (
+        select(
+            pending.c.request_id,
+            pending.c.program,
+            pending.c.is_graduated,
+            ProgramRequirement.min_credits,
+            func.coalesce(earned.c.credits, 0).label("credits"),
+            missing.c.units.label("missing_units"),
+            (func.coalesce(billed.c.amount, 0) - func.coalesce(paid.c.amount, 0)).label("balance"),
+        )
+        .select_from(pending)
+        .outerjoin(ProgramRequirement, ProgramRequirement.program == pending.c.program)
+        .outerjoin(earned, earned.c.student_id == pending.c.student_id)
+        .outerjoin(missing, missing.c.request_id == pending.c.request_id)
+        .outerjoin(billed, billed.c.student_id == pending.c.student_id)
+        .outerjoin(paid, paid.c.student_id == pending.c.student_id)
+    )
+
+
+def verdict(row) -> Tuple[str, List[str]]:
+    reasons = []
+    if row.is_graduated != "active":
+        reasons.append(f"Student is {row.is_graduated}")
+    if row.min_credits is not None and row.credits < row.min_credits:
+        reasons.append(f"Has {row.credits} of {row.min_credits} credits from passed, published results")
+    if row.missing_units:
+        reasons.append(f"Required units not passed: {', '.join(row.missing_units)}")
+    if row.balance > 0:
+        reasons.append(f"Fee balance of {Decimal(row.balance):,.2f} outstanding")
+    if reasons:
+        return INELIGIBLE, reasons
+    if row.min_credits is None:
+        return REVIEW, [f"No graduation requirements set for {row.program}"]
+    return ELIGIBLE, []
+
+
+async def evaluate_graduation_requests(
+    db: AsyncSession, request_ids: Optional[Sequence[UUID]] = None
+) -> Dict[str, int]:
+    """Store a verdict on every pending graduation request (or just ``request_ids``). Returns counts per verdict."""
+    rows = (await db.execute(evaluation_query(request_ids))).all()
+    if not rows:
+        return {}
+    now = datetime.utcnow()
+    updates = []
+    for row in rows:
+        eligibility, reasons = verdict(row)
+        updates.append({
+            "id": row.request_id,
+            "eligibility": eligibility,
+            "eligibility_reasons": reasons,
+            "evaluated_at": now,
+        })
+    await db.execute(update(StudentRequest), updates)
+    await db.commit()
+    return dict(Counter(entry["eligibility"] for entry in updates))
@@ -0,0 +1,193 @@
+"""
+Non-blocking structured logging.
+
+structlog events and stdlib records (SQLAlchemy, libraries) are
+serialized with orjson and handed to ``log_writer``, a bounded queue
+drained by a background thread that writes to stdout in batches. The
+event loop never waits on the log sink: when the queue is full a record
+is dropped and counted, and the writer reports the count once it
+catches up.
+
+``LOG_SAMPLE_RATES`` keeps a fraction of high-volume records. Keys are
+levels (``debug=0.1``) or route templates for access logs
+(``/health=0,/api/student/units/available=0.05``). Warnings and errors
+are always kept.
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+import atexit
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+
+import orjson
+import structlog
+
+from app.config import settings
+
+WRITE_BATCH = 512
+ALWAYS_KEPT = {"warning", "error", "critical", "exception"}
+
+
+def _timestamp() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class LogWriter:
+    """Bounded queue of serialized records, written to stdout by a daemon thread."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._start()
+
+    def _start(self):
+        self._queue: "queue.Queue[Optional[bytes]]" = queue.Queue(self.maxsize)
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def after_fork(self):
+        # Threads don't survive fork and the queue's lock may have been held mid-put
+        self.dropped = 0
+        self._start()
+
+    def put(self, line: bytes):
+        try:
+            self._queue.put_nowait(line)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        out = sys.stdout.buffer
+        while True:
+            line = self._queue.get()
+            batch = [line]
+            while len(batch) < WRITE_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            if self.dropped:
+                dropped, self.dropped = self.dropped, 0
+                batch.append(orjson.dumps({
+                    "event": "Log records dropped", "dropped": dropped,
+                    "level": "warning", "timestamp": _timestamp(),
+                }))
+            try:
+                out.write(b"\n".join(line for line in batch if line is not None) + b"\n")
+                out.flush()
+            except (OSError, ValueError):
+                pass
+            if stop:
+                return
+
+    def close(self, timeout: float = 2.0):
+        """Flush what is queued (waiting up to ``timeout``) and stop the writer."""
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+
+log_writer = LogWriter(settings.log_queue_size)
+os.register_at_fork(after_in_child=log_writer.after_fork)
+atexit.register(log_writer.close)
+
+
+class Sampler:
+    def __init__(self, spec: str):
+        self.levels: Dict[str, float] = {}
+        self.routes: Dict[str, float] = {}
+        for item in filter(None, (part.strip() for part in spec.split(","))):
+            key, _, rate = item.partition("=")
+            target = self.routes if key.startswith("/") else self.levels
+            target[key.strip().lower() if target is self.levels else key.strip()] = float(rate)
+
+    def keep(self, level: str, route: Optional[str] = None) -> bool:
+        if level in ALWAYS_KEPT:
+            return True
+        rate = self.routes.get(route, 1.0) if route is not None else 1.0
+        rate = min(rate, self.levels.get(level, 1.0))
+        return rate >= 1.0 or random.random() < rate
+
+    def __call__(self, logger, method_name: str, event_dict):
+        """structlog processor."""
+        if not self.keep(event_dict.get("level", method_name), event_dict.get("route")):
+            raise structlog.DropEvent
+        return event_dict
+
+
+sampler = Sampler(settings.log_sample_rates)
+
+
+def route_template(scope: Dict[str, Any]) -> str:
+    """The matched route with its prefix, e.g. ``/api/admin/students/{student_id}``."""
+    route = scope.get("route")
+    if route is None:
+        return scope["path"]
+    # Routes of included routers carry their own path only; take the prefix from the URL
+    depth = route.path.count("/")
+    prefix = scope["path"].split("/")[:-depth] if depth else []
+    return "/".join(prefix) + route.path
+
+
+class QueueLogger:
+    """structlog logger that hands rendered lines to ``log_writer``."""
+
+    def msg(self, message: bytes):
+        log_writer.put(message)
+
+    debug = info = warning = warn = error = critical = exception = fatal = log = msg
+
+
+class QueueLoggerFactory:
+    def __call__(self, *args) -> QueueLogger:
+        return QueueLogger()
+
+
+class QueueHandler(logging.Handler):
+    """Routes stdlib logging (SQLAlchemy echo, libraries) through the same queue."""
+
+    def emit(self, record: logging.LogRecord):
+        level = record.levelname.lower()
+        if not sampler.keep(level):
+            return
+        try:
+            event = {
+                "event": record.getMessage(),
+                "logger": record.name,
+                "level": level,
+                "timestamp": _timestamp(),
+            }
+            if record.exc_info:
+                event["exception"] = logging.Formatter().formatException(record.exc_info)
+            log_writer.put(orjson.dumps(event, default=str))
+        except Exception:
+            self.handleError(record)
+
+
+def configure_logging():
+    level = logging.getLevelName(settings.log_level.upper())
+    structlog.configure(
+        processors=[
+            structlog.processors.add_log_level,
+            sampler,
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.format_exc_info,
+            structlog.processors.JSONRenderer(serializer=orjson.dumps),
+        ],
+        wrapper_class=structlog.make_filtering_bound_logger(level),
+        logger_factory=QueueLoggerFactory(),
+        cache_logger_on_first_use=True,
+    )
+    # Libraries stay at warnings, as before; only their output path changes
+    root = logging.getLogger()
+    root.handlers = [QueueHandler()]
+    root.setLevel(max(level, logging.WARNING))
+    if settings.debug:
+        logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
@@ -5,31 +5,62 @@ from fastapi.responses import HTMLResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
+import asyncio
 import structlog
 import os
+import time
 from pathlib import Path
 from app.config import settings
-from app.database import init_db, close_db
+from app.logs import configure_logging, route_template
+from app.profiling import request_profiler
+from app.slow_queries import RequestScopeMiddleware, slow_query_log
+from app.database import (
+    init_db, check_schema_version, warm_up_pools, get_redis_pool, close_db
+)
+from app.security import listen_for_revocations
+from app.cache import listen_for_invalidations
+from app.write_behind import write_behind
+from app.rollups import run_rollup_refresher
+from app.admissions import admissions
+from app.partitions import ensure_partitions
+from app.documents import documents
 from app.routes import auth, student, admin
 from app.dependencies import RateLimitMiddleware
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
-structlog.configure(
-    processors=[
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.JSONRenderer()
-    ]
-)
+configure_logging()
 logger = structlog.get_logger()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting Fiesta TMS", version=settings.app_version)
-    await init_db()
+    if settings.debug:
+        await init_db()
+    else:
+        await check_schema_version()
+        await ensure_partitions()
+    await warm_up_pools()
+    write_behind_task = asyncio.create_task(write_behind.run())
+    background = [
+        asyncio.create_task(listen_for_revocations(await get_redis_pool())),
+        asyncio.create_task(listen_for_invalidations(await get_redis_pool())),
+        asyncio.create_task(run_rollup_refresher(await get_redis_pool())),
+    ]
+    if settings.slow_query_ms > 0:
+        background.append(asyncio.create_task(slow_query_log.run(await get_redis_pool())))
     yield
     logger.info("Shutting down Fiesta TMS")
+    for task in background:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    # Stopped, not cancelled, so the batch being written isn't lost
+    write_behind.stop()
+    await write_behind_task
+    documents.close()
+    admissions.close()
     await close_db()
 
 app = FastAPI(
@@ -51,6 +82,9 @@ app.add_middleware(
 
 app.add_middleware(TrustedHostMiddleware, allowed_hosts=["*"])
 
+if settings.slow_query_ms > 0:
+    app.add_middleware(RequestScopeMiddleware)
+
 @app.middleware("http")
 async def add_security_headers(request: Request, call_next):
     response = await call_next(request)
@@ -60,6 +94,34 @@ async def add_security_headers(request: Request, call_next):
     response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
     return response
 
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    asked, sampled = request_profiler.wanted(request)
+    if sampled or (asked and await request_profiler.is_admin(request)):
+        return await request_profiler.run(request, call_next, sampled)
+    return await call_next(request)
+
+if settings.log_access:
+    access_logger = structlog.get_logger("access")
+
+    @app.middleware("http")
+    async def log_requests(request: Request, call_next):
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            # The route template (not the raw path) so sampling rates and log volumes group by endpoint
+            access_logger.info(
+                "request",
+                method=request.method,
+                route=route_template(request.scope),
+                status=status,
+                duration_ms=round((time.perf_counter() - started) * 1000, 2),
+            )
+
 app.mount("/static", StaticFiles(directory=str(BASE_DIR / "frontend" / "static")), name="static")
 templates = Jinja2Templates(directory=str(BASE_DIR / "frontend" / "templates"))
 
@@ -1,8 +1,12 @@
 from app.models.user import User, UserRole
 from app.models.student import Student, Gender
-from app.models.unit import Unit, UnitRegistration, Result, Semester, RegistrationStatus
+from app.models.unit import Unit, UnitRegistration, Result, Semester, RegistrationStatus, unit_prerequisites
 from app.models.fee import FeeStructure, Payment, FeeType, PaymentMethod
 from app.models.request import StudentRequest, RequestType, RequestStatus
+from app.models.audit import AuditEvent
+from app.models.grading import GradingScheme, GradeBand
+from app.models.program import ProgramRequirement, program_required_units
+from app.models.finance import finance_daily_collections, finance_period_balances
 
 __all__ = [
     "User",
@@ -14,6 +18,7 @@ __all__ = [
     "Result",
     "Semester",
     "RegistrationStatus",
+    "unit_prerequisites",
     "FeeStructure",
     "Payment",
     "FeeType",
@@ -21,4 +26,11 @@ __all__ = [
     "StudentRequest",
     "RequestType",
     "RequestStatus",
+    "AuditEvent",
+    "GradingScheme",
+    "GradeBand",
+    "ProgramRequirement",
+    "program_required_units",
+    "finance_daily_collections",
+    "finance_period_balances",
 ]
\ No newline at end of file
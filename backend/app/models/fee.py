@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Numeric, Enum as SQLEnum
+from sqlalchemy import Boolean, Column, String, DateTime, ForeignKey, Numeric, PrimaryKeyConstraint, Enum as SQLEnum, false
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -24,8 +24,13 @@ class PaymentMethod(str, enum.Enum):
 
 class FeeStructure(Base):
     __tablename__ = "fee_structures"
+    # Partitioned by academic year, then hot/cold on archived (see app.partitions)
+    __table_args__ = (
+        PrimaryKeyConstraint("id", "academic_year", "archived"),
+        {"postgresql_partition_by": "LIST (academic_year)"},
+    )
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), default=uuid.uuid4, nullable=False, index=True)
     student_id = Column(UUID(as_uuid=True), ForeignKey("students.id", ondelete="CASCADE"), nullable=False, index=True)
     
     fee_type = Column(SQLEnum(FeeType), nullable=False)
@@ -34,6 +39,7 @@ class FeeStructure(Base):
     semester = Column(String(20), nullable=False)
     
     description = Column(String(200), nullable=True)
+    archived = Column(Boolean, default=False, server_default=false(), nullable=False)
     
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
@@ -41,25 +47,34 @@ class FeeStructure(Base):
     # Relationships
     student = relationship("Student", backref="fee_structures", lazy="joined")
     
+    __mapper_args__ = {"primary_key": [id]}
+    
     def __repr__(self):
         return f"<FeeStructure {self.fee_type} - {self.amount}>"
 
 
 class Payment(Base):
     __tablename__ = "payments"
+    # Partitioned by academic year, then hot/cold on archived (see app.partitions)
+    __table_args__ = (
+        PrimaryKeyConstraint("id", "academic_year", "archived"),
+        {"postgresql_partition_by": "LIST (academic_year)"},
+    )
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), default=uuid.uuid4, nullable=False, index=True)
     student_id = Column(UUID(as_uuid=True), ForeignKey("students.id", ondelete="CASCADE"), nullable=False, index=True)
     
     amount = Column(Numeric(10, 2), nullable=False)
     payment_method = Column(SQLEnum(PaymentMethod), nullable=False)
-    reference_number = Column(String(100), unique=True, nullable=False, index=True)
+    # Unique per partition only; record_payment checks across years under an advisory lock
+    reference_number = Column(String(100), nullable=False, index=True)
     
     payment_date = Column(DateTime, default=datetime.utcnow, nullable=False)
     academic_year = Column(String(9), nullable=False)
     semester = Column(String(20), nullable=False)
     
     remarks = Column(String(200), nullable=True)
+    archived = Column(Boolean, default=False, server_default=false(), nullable=False)
     
     recorded_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
     recorded_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -67,5 +82,7 @@ class Payment(Base):
     # Relationships
     student = relationship("Student", backref="payments", lazy="joined")
     
+    __mapper_args__ = {"primary_key": [id]}
+    
     def __repr__(self):
         return f"<Payment {self.reference_number} - {self.amount}>"
\ No newline at end of file
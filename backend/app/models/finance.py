@@ -0,0 +1,89 @@
+from sqlalchemy import Column, Date, Integer, MetaData, Numeric, String, Table, Enum as SQLEnum, text
+from app.models.fee import PaymentMethod
+
+# Materialized views live outside Base.metadata so create_all and Alembic
+# autogenerate never mistake them for tables
+views = MetaData()
+
+FINANCE_VIEWS = {
+    # One row per day x method x program x billing period
+    "finance_daily_collections": (
+        """
+        SELECT p.payment_date::date AS day,
+               p.payment_method,
+               s.program,
+               p.academic_year,
+               p.semester,
+               count(*) AS payments,
+               sum(p.amount) AS amount
+        FROM payments p
+        JOIN students s ON s.id = p.student_id
+        GROUP BY 1, 2, 3, 4, 5
+        """,
+        ("day", "payment_method", "program", "academic_year", "semester"),
+    ),
+    # Billed vs paid per billing period and program, from per-student balances
+    "finance_period_balances": (
+        """
+        WITH billed AS (
+            SELECT student_id, academic_year, semester, sum(amount) AS amount
+            FROM fee_structures GROUP BY 1, 2, 3
+        ), paid AS (
+            SELECT student_id, academic_year, semester, sum(amount) AS amount
+            FROM payments GROUP BY 1, 2, 3
+        ), balances AS (
+            SELECT coalesce(b.student_id, p.student_id) AS student_id,
+                   coalesce(b.academic_year, p.academic_year) AS academic_year,
+                   coalesce(b.semester, p.semester) AS semester,
+                   coalesce(b.amount, 0) AS billed,
+                   coalesce(p.amount, 0) AS paid
+            FROM billed b
+            FULL JOIN paid p
+              ON p.student_id = b.student_id AND p.academic_year = b.academic_year AND p.semester = b.semester
+        )
+        SELECT bl.academic_year,
+               bl.semester,
+               s.program,
+               count(*) AS students,
+               count(*) FILTER (WHERE bl.billed > bl.paid) AS students_owing,
+               sum(bl.billed) AS billed,
+               sum(bl.paid) AS paid,
+               sum(greatest(bl.billed - bl.paid, 0)) AS outstanding
+        FROM balances bl
+        JOIN students s ON s.id = bl.student_id
+        GROUP BY 1, 2, 3
+        """,
+        ("academic_year", "semester", "program"),
+    ),
+}
+
+
+def create_finance_views(connection):
+    """Create the views and the unique indexes REFRESH ... CONCURRENTLY needs (used by init_db)."""
+    for name, (query, key) in FINANCE_VIEWS.items():
+        connection.execute(text(f"CREATE MATERIALIZED VIEW IF NOT EXISTS {name} AS {query}"))
+        connection.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{name} ON {name} ({', '.join(key)})"))
+
+
+finance_daily_collections = Table(
+    "finance_daily_collections", views,
+    Column("day", Date, primary_key=True),
+    Column("payment_method", SQLEnum(PaymentMethod, name="paymentmethod", create_type=False), primary_key=True),
+    Column("program", String(100), primary_key=True),
+    Column("academic_year", String(9), primary_key=True),
+    Column("semester", String(20), primary_key=True),
+    Column("payments", Integer),
+    Column("amount", Numeric(14, 2)),
+)
+
+finance_period_balances = Table(
+    "finance_period_balances", views,
+    Column("academic_year", String(9), primary_key=True),
+    Column("semester", String(20), primary_key=True),
+    Column("program", String(100), primary_key=True),
+    Column("students", Integer),
+    Column("students_owing", Integer),
+    Column("billed", Numeric(14, 2)),
+    Column("paid", Numeric(14, 2)),
+    Column("outstanding", Numeric(14, 2)),
+)
@@ -0,0 +1,46 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, Numeric, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from datetime import datetime
+import uuid
+from app.database import Base
+
+
+class GradingScheme(Base):
+    __tablename__ = "grading_schemes"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    name = Column(String(100), unique=True, nullable=False)
+    program = Column(String(100), unique=True, nullable=True)  # NULL = default for programs without their own
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    # Relationships
+    bands = relationship(
+        "GradeBand", back_populates="scheme", lazy="selectin",
+        cascade="all, delete-orphan", order_by="GradeBand.min_marks.desc()"
+    )
+
+    def __repr__(self):
+        return f"<GradingScheme {self.name}>"
+
+
+class GradeBand(Base):
+    __tablename__ = "grade_bands"
+    __table_args__ = (
+        UniqueConstraint("scheme_id", "grade"),
+        UniqueConstraint("scheme_id", "min_marks"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    scheme_id = Column(UUID(as_uuid=True), ForeignKey("grading_schemes.id", ondelete="CASCADE"), nullable=False)
+
+    grade = Column(String(2), nullable=False)
+    min_marks = Column(Numeric(5, 2), nullable=False)  # inclusive; the band ends at the next band's min_marks
+
+    # Relationships
+    scheme = relationship("GradingScheme", back_populates="bands")
+
+    def __repr__(self):
+        return f"<GradeBand {self.grade} >= {self.min_marks}>"
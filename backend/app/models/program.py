@@ -0,0 +1,34 @@
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Table
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from datetime import datetime
+import uuid
+from app.database import Base
+
+
+program_required_units = Table(
+    "program_required_units",
+    Base.metadata,
+    Column("requirement_id", UUID(as_uuid=True), ForeignKey("program_requirements.id", ondelete="CASCADE"),
+           primary_key=True),
+    Column("unit_id", UUID(as_uuid=True), ForeignKey("units.id", ondelete="CASCADE"), primary_key=True),
+)
+
+
+class ProgramRequirement(Base):
+    __tablename__ = "program_requirements"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    program = Column(String(100), unique=True, nullable=False)
+    min_credits = Column(Integer, nullable=False)  # from passed, published results
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    # Relationships
+    required_units = relationship(
+        "Unit", secondary=program_required_units, lazy="selectin", order_by="Unit.unit_code"
+    )
+
+    def __repr__(self):
+        return f"<ProgramRequirement {self.program} >= {self.min_credits} credits>"
@@ -1,5 +1,5 @@
 from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Enum as SQLEnum
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -36,6 +36,11 @@ class StudentRequest(Base):
     processed_at = Column(DateTime, nullable=True)
     admin_remarks = Column(Text, nullable=True)
     
+    # Graduation eligibility, precomputed by app.graduation for pending requests
+    eligibility = Column(String(20), nullable=True)  # eligible, ineligible, review
+    eligibility_reasons = Column(JSONB, nullable=True)
+    evaluated_at = Column(DateTime, nullable=True)
+    
     # Relationships
     student = relationship("Student", backref="requests", lazy="joined")
     processor = relationship("User", foreign_keys=[processed_by], lazy="joined")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Date, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Date, DateTime, ForeignKey, Sequence, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -7,6 +7,11 @@ import enum
 from app.database import Base
 
 
+# Student numbers are handed out in blocks: each nextval() reserves STUDENT_NUMBER_BLOCK numbers
+STUDENT_NUMBER_BLOCK = 50
+student_number_seq = Sequence("student_number_seq", increment=STUDENT_NUMBER_BLOCK, metadata=Base.metadata)
+
+
 class Gender(str, enum.Enum):
     MALE = "male"
     FEMALE = "female"
@@ -1,4 +1,7 @@
-from sqlalchemy import Boolean, Column, String, Integer, DateTime, ForeignKey, Enum as SQLEnum, Numeric
+from sqlalchemy import (
+    Boolean, CheckConstraint, Column, String, Integer, DateTime, ForeignKey, ForeignKeyConstraint,
+    PrimaryKeyConstraint, Table, UniqueConstraint, Enum as SQLEnum, Numeric, false
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -35,19 +38,39 @@ class Unit(Base):
         return f"<Unit {self.unit_code} - {self.unit_name}>"
 
 
+# unit_id can only be taken after completing prerequisite_id (see app.prerequisites)
+unit_prerequisites = Table(
+    "unit_prerequisites",
+    Base.metadata,
+    Column("unit_id", UUID(as_uuid=True), ForeignKey("units.id", ondelete="CASCADE"), primary_key=True),
+    Column("prerequisite_id", UUID(as_uuid=True), ForeignKey("units.id", ondelete="CASCADE"), primary_key=True,
+           index=True),
+    CheckConstraint("unit_id <> prerequisite_id", name="unit_prerequisites_not_self"),
+)
+
+
 class UnitRegistration(Base):
     __tablename__ = "unit_registrations"
+    # Partitioned by academic year, then hot/cold on archived (see app.partitions).
+    # The primary key has to cover both partition keys; the ORM still identifies rows by id.
+    __table_args__ = (
+        PrimaryKeyConstraint("id", "academic_year", "archived"),
+        {"postgresql_partition_by": "LIST (academic_year)"},
+    )
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), default=uuid.uuid4, nullable=False, index=True)
     student_id = Column(UUID(as_uuid=True), ForeignKey("students.id", ondelete="CASCADE"), nullable=False, index=True)
     unit_id = Column(UUID(as_uuid=True), ForeignKey("units.id", ondelete="CASCADE"), nullable=False, index=True)
     
     semester = Column(SQLEnum(Semester), nullable=False)
     academic_year = Column(String(9), nullable=False)  # e.g., "2024-2025"
     status = Column(SQLEnum(RegistrationStatus), default=RegistrationStatus.REGISTERED, nullable=False)
+    archived = Column(Boolean, default=False, server_default=false(), nullable=False)
     
     registration_date = Column(DateTime, default=datetime.utcnow, nullable=False)
     
+    __mapper_args__ = {"primary_key": [id]}
+    
     # Relationships
     student = relationship("Student", backref="unit_registrations", lazy="joined")
     unit = relationship("Unit", backref="registrations", lazy="joined")
@@ -58,9 +81,23 @@ class UnitRegistration(Base):
 
 class Result(Base):
     __tablename__ = "results"
+    # Partitioned like unit_registrations; archiving a registration moves its result along
+    __table_args__ = (
+        PrimaryKeyConstraint("id", "academic_year", "archived"),
+        UniqueConstraint("registration_id", "academic_year", "archived", name="results_registration_id_key"),
+        ForeignKeyConstraint(
+            ["registration_id", "academic_year", "archived"],
+            ["unit_registrations.id", "unit_registrations.academic_year", "unit_registrations.archived"],
+            name="results_registration_id_fkey", ondelete="CASCADE", onupdate="CASCADE",
+        ),
+        {"postgresql_partition_by": "LIST (academic_year)"},
+    )
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    registration_id = Column(UUID(as_uuid=True), ForeignKey("unit_registrations.id", ondelete="CASCADE"), unique=True, nullable=False)
+    id = Column(UUID(as_uuid=True), default=uuid.uuid4, nullable=False, index=True)
+    registration_id = Column(UUID(as_uuid=True), nullable=False)
+    # Copied from the registration (set Result.registration rather than registration_id alone)
+    academic_year = Column(String(9), nullable=False)
+    archived = Column(Boolean, default=False, server_default=false(), nullable=False)
     
     marks = Column(Numeric(5, 2), nullable=True)  # Out of 100
     grade = Column(String(2), nullable=True)  # A, B+, B, C+, C, D+, D, E, F
@@ -74,5 +111,7 @@ class Result(Base):
     # Relationships
     registration = relationship("UnitRegistration", backref="result", lazy="joined")
     
+    __mapper_args__ = {"primary_key": [id]}
+    
     def __repr__(self):
         return f"<Result {self.registration_id} - Grade: {self.grade}>"
\ No newline at end of file
@@ -0,0 +1,3 @@
+from app.notifications.queue import enqueue_email, enqueue_emails, try_enqueue_emails
+
+__all__ = ["enqueue_email", "enqueue_emails", "try_enqueue_emails"]
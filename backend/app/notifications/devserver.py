@@ -0,0 +1,63 @@
+"""
+Local SMTP stand-in built on aiosmtpd.
+
+    python -m app.notifications.devserver --port 1025
+
+Accepts every message and keeps it in memory (and prints a one-line
+summary), so the worker can be exercised without a real mail server.
+Tests can use ``running_stand_in()`` directly.
+"""
+from contextlib import contextmanager
+from email import message_from_bytes
+from email.message import Message
+from typing import List
+import argparse
+import threading
+
+from aiosmtpd.controller import Controller
+
+
+class CollectingHandler:
+    def __init__(self, echo: bool = False):
+        self.echo = echo
+        self.messages: List[Message] = []
+        self._lock = threading.Lock()
+
+    async def handle_DATA(self, server, session, envelope):
+        message = message_from_bytes(envelope.content)
+        with self._lock:
+            self.messages.append(message)
+        if self.echo:
+            print(f"{', '.join(envelope.rcpt_tos)}: {message['Subject']}", flush=True)
+        return "250 Message accepted for delivery"
+
+
+@contextmanager
+def running_stand_in(host: str = "127.0.0.1", port: int = 1025, echo: bool = False):
+    """Run the stand-in on a background thread; yields its handler."""
+    handler = CollectingHandler(echo=echo)
+    controller = Controller(handler, hostname=host, port=port)
+    controller.start()
+    try:
+        yield handler
+    finally:
+        controller.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m app.notifications.devserver")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    args = parser.parse_args()
+
+    with running_stand_in(args.host, args.port, echo=True) as handler:
+        print(f"SMTP stand-in listening on {args.host}:{args.port} (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+    print(f"{len(handler.messages)} messages received")
+
+
+if __name__ == "__main__":
+    main()
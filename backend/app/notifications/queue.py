@@ -0,0 +1,59 @@
+"""
+Producer side of the email queue.
+
+Messages are small JSON records appended to the ``mail:outbox`` Redis
+stream; rendering and SMTP happen in the worker process. Enqueueing a
+batch is one pipelined round trip, so handlers never wait on SMTP.
+"""
+from typing import Any, Dict, Iterable, Mapping
+import json
+
+import structlog
+
+from app.config import settings
+
+OUTBOX_STREAM = "mail:outbox"
+CONSUMER_GROUP = "mailers"
+RETRY_KEY = "mail:retry"  # zset of JSON messages scored by next attempt time
+DEAD_LETTER_KEY = "mail:dead"
+
+logger = structlog.get_logger()
+
+
+def _fields(template: str, to: str, context: Mapping[str, Any], attempts: int = 0) -> Dict[str, str]:
+    return {
+        "template": template,
+        "to": to,
+        "context": json.dumps(context, default=str, separators=(",", ":")),
+        "attempts": str(attempts),
+    }
+
+
+async def enqueue_emails(redis, template: str, messages: Iterable[tuple]) -> int:
+    """Queue ``(to, context)`` pairs for ``template``; returns how many were queued."""
+    if not settings.mail_enabled:
+        return 0
+    count = 0
+    async with redis.pipeline(transaction=False) as pipe:
+        for to, context in messages:
+            pipe.xadd(
+                OUTBOX_STREAM, _fields(template, to, context),
+                maxlen=settings.mail_outbox_max_length, approximate=True,
+            )
+            count += 1
+        if count:
+            await pipe.execute()
+    return count
+
+
+async def enqueue_email(redis, template: str, to: str, **context) -> int:
+    return await enqueue_emails(redis, template, [(to, context)])
+
+
+async def try_enqueue_emails(redis, template: str, messages: Iterable[tuple]) -> int:
+    """Like ``enqueue_emails`` but never fails the caller's request."""
+    try:
+        return await enqueue_emails(redis, template, messages)
+    except Exception as exc:
+        logger.warning("Email enqueue failed", template=template, error=str(exc))
+        return 0
@@ -0,0 +1,55 @@
+"""
+Plain-text email templates.
+
+Each template is compiled once per worker process; rendering a message
+only evaluates the compiled Jinja code against its context.
+"""
+from functools import lru_cache
+from typing import Any, Dict, Tuple
+
+from jinja2 import Environment, StrictUndefined, Template
+
+TEMPLATES: Dict[str, Tuple[str, str]] = {
+    "request_processed": (
+        "Your {{ request_type }} request has been {{ status }}",
+        "Dear {{ first_name }},\n\n"
+        "Your {{ request_type }} request submitted on {{ request_date }} has been {{ status }}."
+        "{% if admin_remarks %}\n\nRemarks: {{ admin_remarks }}{% endif %}\n\n"
+        "Log in to the Fiesta student portal for details.\n",
+    ),
+    "results_published": (
+        "Results published for {{ academic_year }} {{ semester }}",
+        "Dear {{ first_name }},\n\n"
+        "{% if units == 1 %}A result{% else %}{{ units }} results{% endif %} for "
+        "{{ academic_year }} {{ semester }} {% if units == 1 %}has{% else %}have{% endif %} been published.\n\n"
+        "Log in to the Fiesta student portal to view your results.\n",
+    ),
+    "payment_received": (
+        "Payment received: {{ reference_number }}",
+        "Dear {{ first_name }},\n\n"
+        "We have received your payment of KES {{ amount }} ({{ payment_method }}, "
+        "reference {{ reference_number }}) for {{ academic_year }} {{ semester }}.\n\n"
+        "Thank you.\n",
+    ),
+}
+
+_environment = Environment(undefined=StrictUndefined, keep_trailing_newline=True, autoescape=False)
+
+
+class UnknownTemplateError(KeyError):
+    pass
+
+
+@lru_cache(maxsize=None)
+def _compiled(name: str) -> Tuple[Template, Template]:
+    try:
+        subject, body = TEMPLATES[name]
+    except KeyError:
+        raise UnknownTemplateError(name) from None
+    return _environment.from_string(subject), _environment.from_string(body)
+
+
+def render(name: str, context: Dict[str, Any]) -> Tuple[str, str]:
+    """Return ``(subject, body)`` for template ``name``."""
+    subject, body = _compiled(name)
+    return subject.render(context).strip(), body.render(context)
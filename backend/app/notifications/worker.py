@@ -0,0 +1,247 @@
+"""
+Email worker: drains the outbox stream and delivers over pooled SMTP.
+
+    python -m app.notifications.worker
+
+Entries are read through a consumer group in batches of
+``mail_batch_size`` and spread across ``mail_pool_size`` SMTP
+connections that stay open between batches. Transient failures are
+retried with exponential backoff via the ``mail:retry`` zset; permanent
+ones (5xx replies, bad templates) and messages that exhaust
+``mail_max_attempts`` go to the ``mail:dead`` list. Entries left pending
+by a crashed worker are reclaimed after ``STALE_AFTER_MS``.
+"""
+from contextlib import asynccontextmanager
+from email.message import EmailMessage
+from typing import List, Optional, Tuple
+import asyncio
+import json
+import os
+import random
+import signal
+import socket
+import time
+
+import aiosmtplib
+import redis.asyncio as aioredis
+import structlog
+from redis.exceptions import ConnectionError as RedisConnectionError, ResponseError
+
+from app.config import settings
+from app.logs import configure_logging
+from app.notifications.queue import OUTBOX_STREAM, CONSUMER_GROUP, RETRY_KEY, DEAD_LETTER_KEY
+from app.notifications.templates import render
+
+logger = structlog.get_logger()
+
+STALE_AFTER_MS = 5 * 60 * 1000
+RECLAIM_INTERVAL = 60.0
+
+# Atomically move due retries back onto the stream, so two workers never
+# promote the same message
+PROMOTE_RETRIES_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+for _, raw in ipairs(due) do
+    redis.call('ZREM', KEYS[1], raw)
+    local m = cjson.decode(raw)
+    redis.call('XADD', KEYS[2], '*', 'template', m.template, 'to', m.to,
+               'context', m.context, 'attempts', m.attempts)
+end
+return #due
+"""
+
+SENT, RETRY, DEAD = "sent", "retry", "dead"
+
+
+class SMTPPool:
+    """A fixed number of SMTP sessions reused across messages and batches."""
+
+    def __init__(self, size: int):
+        self.size = max(1, size)
+        self._idle: asyncio.Queue = asyncio.Queue()
+        for _ in range(self.size):
+            self._idle.put_nowait(self._client())
+
+    @staticmethod
+    def _client() -> aiosmtplib.SMTP:
+        return aiosmtplib.SMTP(
+            hostname=settings.smtp_host,
+            port=settings.smtp_port,
+            start_tls=settings.smtp_starttls,
+            timeout=settings.smtp_timeout,
+        )
+
+    @staticmethod
+    async def _ensure_connected(client: aiosmtplib.SMTP):
+        if client.is_connected:
+            return
+        await client.connect()
+        if settings.smtp_user:
+            await client.login(settings.smtp_user, settings.smtp_password)
+
+    async def send(self, client: aiosmtplib.SMTP, message: EmailMessage):
+        await self._ensure_connected(client)
+        try:
+            await client.send_message(message)
+        except aiosmtplib.SMTPServerDisconnected:
+            # Idle sessions get dropped by servers; reconnect once
+            client.close()
+            await self._ensure_connected(client)
+            await client.send_message(message)
+
+    @asynccontextmanager
+    async def connection(self):
+        client = await self._idle.get()
+        try:
+            yield client
+        finally:
+            self._idle.put_nowait(client)
+
+    async def close(self):
+        while not self._idle.empty():
+            client = self._idle.get_nowait()
+            if client.is_connected:
+                try:
+                    await client.quit()
+                except aiosmtplib.SMTPException:
+                    client.close()
+
+
+def _is_permanent(exc: Exception) -> bool:
+    if isinstance(exc, aiosmtplib.SMTPRecipientsRefused):
+        return all(500 <= error.code < 600 for error in exc.recipients)
+    if isinstance(exc, aiosmtplib.SMTPResponseException):
+        return 500 <= exc.code < 600
+    return False
+
+
+def build_message(fields: dict) -> EmailMessage:
+    subject, body = render(fields["template"], json.loads(fields["context"]))
+    message = EmailMessage()
+    message["From"] = settings.smtp_from
+    message["To"] = fields["to"]
+    message["Subject"] = subject
+    message.set_content(body)
+    return message
+
+
+def retry_delay(attempts: int) -> float:
+    # Exponential backoff with jitter, capped at one hour
+    return min(3600.0, settings.mail_retry_base_seconds * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+
+
+class MailWorker:
+    def __init__(self, redis, pool: SMTPPool, consumer: Optional[str] = None):
+        self.redis = redis
+        self.pool = pool
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self._last_reclaim = 0.0
+        self.stats = {SENT: 0, RETRY: 0, DEAD: 0}
+
+    async def setup(self):
+        try:
+            await self.redis.xgroup_create(OUTBOX_STREAM, CONSUMER_GROUP, id="0", mkstream=True)
+        except ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+
+    async def promote_retries(self) -> int:
+        return await self.redis.eval(
+            PROMOTE_RETRIES_SCRIPT, 2, RETRY_KEY, OUTBOX_STREAM, time.time(), settings.mail_batch_size
+        )
+
+    async def reclaim_stale(self) -> List[Tuple[str, dict]]:
+        _, entries, *_ = await self.redis.xautoclaim(
+            OUTBOX_STREAM, CONSUMER_GROUP, self.consumer,
+            min_idle_time=STALE_AFTER_MS, start_id="0-0", count=settings.mail_batch_size,
+        )
+        return [(entry_id, fields) for entry_id, fields in entries if fields]
+
+    async def read_batch(self, block_ms: int = 1000) -> List[Tuple[str, dict]]:
+        response = await self.redis.xreadgroup(
+            CONSUMER_GROUP, self.consumer, {OUTBOX_STREAM: ">"},
+            count=settings.mail_batch_size, block=block_ms,
+        )
+        return response[0][1] if response else []
+
+    async def _deliver(self, client, fields: dict) -> str:
+        try:
+            message = build_message(fields)
+        except Exception as exc:
+            logger.error("Email render failed", template=fields.get("template"), error=str(exc))
+            return DEAD
+        try:
+            await self.pool.send(client, message)
+            return SENT
+        except Exception as exc:
+            permanent = _is_permanent(exc)
+            logger.warning("Email send failed", to=fields["to"], permanent=permanent, error=str(exc))
+            if not permanent:
+                # Start the next message on a fresh session
+                client.close()
+            return DEAD if permanent else RETRY
+
+    async def _deliver_chunk(self, chunk) -> List[Tuple[str, dict, str]]:
+        async with self.pool.connection() as client:
+            return [(entry_id, fields, await self._deliver(client, fields)) for entry_id, fields in chunk]
+
+    async def process(self, entries: List[Tuple[str, dict]]):
+        chunks = [entries[i::self.pool.size] for i in range(self.pool.size)]
+        results = await asyncio.gather(*(self._deliver_chunk(chunk) for chunk in chunks if chunk))
+
+        now = time.time()
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for entry_id, fields, outcome in (item for chunk in results for item in chunk):
+                attempts = int(fields.get("attempts", 0)) + 1
+                if outcome == RETRY and attempts >= settings.mail_max_attempts:
+                    outcome = DEAD
+                if outcome == RETRY:
+                    pipe.zadd(RETRY_KEY, {json.dumps({**fields, "attempts": str(attempts)}): now + retry_delay(attempts)})
+                elif outcome == DEAD:
+                    pipe.lpush(DEAD_LETTER_KEY, json.dumps({**fields, "attempts": str(attempts), "failed_at": now}))
+                pipe.xack(OUTBOX_STREAM, CONSUMER_GROUP, entry_id)
+                pipe.xdel(OUTBOX_STREAM, entry_id)
+                self.stats[outcome] += 1
+            await pipe.execute()
+
+    async def run_once(self, block_ms: int = 1000) -> int:
+        await self.promote_retries()
+        entries = []
+        if time.monotonic() - self._last_reclaim > RECLAIM_INTERVAL:
+            self._last_reclaim = time.monotonic()
+            entries = await self.reclaim_stale()
+        entries = entries or await self.read_batch(block_ms)
+        if entries:
+            await self.process(entries)
+        return len(entries)
+
+    async def run(self, stop: Optional[asyncio.Event] = None):
+        stop = stop or asyncio.Event()
+        await self.setup()
+        logger.info("Email worker started", consumer=self.consumer, pool_size=self.pool.size)
+        while not stop.is_set():
+            try:
+                await self.run_once()
+            except (OSError, RedisConnectionError) as exc:
+                logger.warning("Email worker loop error", error=str(exc))
+                await asyncio.sleep(1)
+        logger.info("Email worker stopped", **self.stats)
+
+
+async def main():
+    redis = aioredis.from_url(settings.redis_url, encoding="utf-8", decode_responses=True)
+    pool = SMTPPool(settings.mail_pool_size)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        await MailWorker(redis, pool).run(stop)
+    finally:
+        await pool.close()
+        await redis.close()
+
+
+if __name__ == "__main__":
+    configure_logging()
+    asyncio.run(main())
@@ -0,0 +1,236 @@
+"""
+Academic-year partitions and archival of graduated students' history.
+
+``unit_registrations``, ``results``, ``payments`` and ``fee_structures``
+are LIST-partitioned by ``academic_year``, and every year is split again
+on ``archived`` into a hot and a cold partition::
+
+    payments
+    ├── payments_y2024_2025          academic_year = '2024-2025'
+    │   ├── payments_y2024_2025_hot      archived = false
+    │   └── payments_y2024_2025_cold     archived = true
+    └── payments_default             years without a partition yet
+
+A query that filters on ``academic_year`` only reads that year's
+partitions, and one that also says ``archived = false`` skips the cold
+ones. ``archive_graduated`` sets ``archived`` on the closed years of
+graduated students in batches. Postgres moves those rows to the cold
+partitions, and results follow their registration through the
+``ON UPDATE CASCADE`` foreign key.
+
+Partitions for the current and next academic year are created at startup
+and by ``python -m app.partitions maintain``. Rows for a year that has
+no partition yet land in the default partition. Once it holds rows for a
+year, that year's partition is not created (Postgres would refuse) and a
+warning is logged instead.
+
+    python -m app.partitions maintain
+    python -m app.partitions archive [--batch-size N]
+    python -m app.partitions check
+"""
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import argparse
+import asyncio
+import re
+import uuid
+
+import structlog
+from sqlalchemy import func, select, text, update
+from sqlalchemy.dialects import postgresql
+
+from app.config import settings
+from app.database import engine
+from app.models import Payment, Result, Student, UnitRegistration, FeeStructure
+
+logger = structlog.get_logger()
+
+PARTITIONED_TABLES = ("unit_registrations", "results", "payments", "fee_structures")
+# Results aren't archived directly; they move with their registration
+ARCHIVED_MODELS = (UnitRegistration, Payment, FeeStructure)
+ACADEMIC_YEAR = re.compile(r"^(\d{4})-(\d{4})$")
+# Key for pg_advisory_xact_lock so only one worker creates partitions at a time
+PARTITION_LOCK_KEY = 0x7061727473
+
+
+def academic_year_of(day: date) -> str:
+    start = day.year if day.month >= settings.academic_year_start_month else day.year - 1
+    return f"{start}-{start + 1}"
+
+
+def current_academic_year() -> str:
+    return academic_year_of(date.today())
+
+
+def next_academic_year(year: str) -> str:
+    start = int(year[:4]) + 1
+    return f"{start}-{start + 1}"
+
+
+def partition_name(table: str, year: str) -> str:
+    return f"{table}_y{year.replace('-', '_')}"
+
+
+def year_partition_statements(table: str, year: str) -> List[str]:
+    if not ACADEMIC_YEAR.match(year):
+        raise ValueError(f"Not an academic year: {year!r}")
+    name = partition_name(table, year)
+    return [
+        f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES IN ('{year}') PARTITION BY LIST (archived)",
+        f"CREATE TABLE {name}_hot PARTITION OF {name} FOR VALUES IN (false)",
+        f"CREATE TABLE {name}_cold PARTITION OF {name} FOR VALUES IN (true)",
+    ]
+
+
+def create_partitions(connection, years: Iterable[str]) -> List[str]:
+    """Create missing default and year partitions (sync; use with ``run_sync``). Returns those created."""
+    created = []
+    for table in PARTITIONED_TABLES:
+        connection.execute(text(f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT"))
+        for year in years:
+            name = partition_name(table, year)
+            if connection.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+                continue
+            stranded = connection.execute(
+                text(f"SELECT EXISTS (SELECT 1 FROM {table}_default WHERE academic_year = :year)"), {"year": year}
+            ).scalar()
+            if stranded:
+                logger.warning("Rows for this year are in the default partition", table=table, academic_year=year)
+                continue
+            for statement in year_partition_statements(table, year):
+                connection.execute(text(statement))
+            created.append(name)
+    return created
+
+
+async def ensure_partitions(years: Optional[Iterable[str]] = None) -> List[str]:
+    """Create partitions for ``years`` (default: current and next academic year) unless another worker is."""
+    if years is None:
+        current = current_academic_year()
+        years = [current, next_academic_year(current)]
+    async with engine.begin() as conn:
+        if not (await conn.execute(select(func.pg_try_advisory_xact_lock(PARTITION_LOCK_KEY)))).scalar():
+            return []
+        created = await conn.run_sync(create_partitions, list(years))
+    if created:
+        logger.info("Partitions created", partitions=created)
+    return created
+
+
+async def archive_graduated(
+    batch_size: int,
+    before_year: Optional[str] = None,
+    progress: Optional[Callable[[str, int], None]] = None,
+) -> Dict[str, int]:
+    """Move graduated students' rows from years before ``before_year`` to the cold partitions.
+
+    Each batch is its own short transaction, so the job can be stopped and
+    rerun at any point; rows already archived are simply not selected again.
+    """
+    before_year = before_year or current_academic_year()
+    moved: Dict[str, int] = {}
+    for model in ARCHIVED_MODELS:
+        table = model.__table__
+        moved[table.name] = 0
+        while True:
+            batch = (
+                select(table.c.id, table.c.academic_year)
+                .join(Student, Student.id == table.c.student_id)
+                .where(Student.is_graduated == "graduated")
+                .where(table.c.academic_year < before_year)
+                .where(table.c.archived.is_(False))
+                .limit(batch_size)
+                .cte("batch")
+            )
+            async with engine.begin() as conn:
+                result = await conn.execute(
+                    update(table)
+                    .where(table.c.id == batch.c.id)
+                    .where(table.c.academic_year == batch.c.academic_year)
+                    .where(table.c.archived.is_(False))
+                    .values(archived=True)
+                )
+            if result.rowcount == 0:
+                break
+            moved[table.name] += result.rowcount
+            if progress is not None:
+                progress(table.name, moved[table.name])
+    return moved
+
+
+def _hot_queries(year: str) -> Dict[str, Any]:
+    """Representative current-term queries, as the API issues them."""
+    student_id = uuid.uuid4()
+    return {
+        "registrations this term": select(UnitRegistration.id)
+            .where(UnitRegistration.student_id == student_id)
+            .where(UnitRegistration.academic_year == year)
+            .where(UnitRegistration.archived.is_(False)),
+        "results this year": select(Result.id)
+            .join(Result.registration)
+            .where(UnitRegistration.academic_year == year)
+            .where(UnitRegistration.archived.is_(False)),
+        "payments this year": select(Payment.id)
+            .where(Payment.academic_year == year)
+            .where(Payment.archived.is_(False)),
+        "fees this year": select(FeeStructure.id)
+            .where(FeeStructure.academic_year == year)
+            .where(FeeStructure.archived.is_(False)),
+    }
+
+
+def _scanned(plan: Dict[str, Any]) -> List[str]:
+    found = [plan["Relation Name"]] if "Relation Name" in plan else []
+    for child in plan.get("Plans", ()):
+        found.extend(_scanned(child))
+    return found
+
+
+async def pruning_report(year: Optional[str] = None) -> Dict[str, List[str]]:
+    """The partitions each hot query reads, from EXPLAIN (partition pruning at plan time)."""
+    year = year or current_academic_year()
+    report = {}
+    async with engine.connect() as conn:
+        for name, query in _hot_queries(year).items():
+            sql = str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+            plan = (await conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))).scalar()
+            report[name] = sorted(set(_scanned(plan[0]["Plan"])))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m app.partitions")
+    commands = parser.add_subparsers(dest="command", required=True)
+    maintain = commands.add_parser("maintain", help="Create partitions for upcoming academic years")
+    maintain.add_argument("--years", nargs="*", help="Academic years such as 2026-2027 (default: current and next)")
+    archive = commands.add_parser("archive", help="Move graduated students' closed years to cold partitions")
+    archive.add_argument("--batch-size", type=int, default=settings.archive_batch_size)
+    archive.add_argument("--before", help="First academic year to keep hot (default: the current one)")
+    check = commands.add_parser("check", help="Show which partitions current-term queries read")
+    check.add_argument("--year", help="Academic year to check (default: the current one)")
+    args = parser.parse_args()
+
+    async def run():
+        try:
+            if args.command == "maintain":
+                created = await ensure_partitions(args.years or None)
+                print("\n".join(created) or "Nothing to create")
+            elif args.command == "archive":
+                moved = await archive_graduated(
+                    args.batch_size, args.before,
+                    progress=lambda table, rows: print(f"  {table:<20} {rows}", end="\r", flush=True),
+                )
+                print()
+                for table, rows in moved.items():
+                    print(f"  {table:<20} {rows} rows archived")
+            else:
+                for name, partitions in (await pruning_report(args.year)).items():
+                    print(f"{name}: {', '.join(partitions)}")
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
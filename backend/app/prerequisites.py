@@ -0,0 +1,100 @@
+"""
+Unit prerequisites.
+
+``unit_prerequisites`` holds the direct edges (a unit and one unit that
+must be completed first). Registering for a unit requires every unit it
+depends on, directly or through other prerequisites. The edges come from
+the two-tier cache under the ``units`` tag, which every unit change
+invalidates, and are compiled into the transitive closure once per
+cached copy. Checking a registration is then a set difference between
+the unit's closure and the student's completed units. Those are fetched
+by the query that already checks for a duplicate registration, so
+while the cache is warm enforcing prerequisites adds no queries to
+``register_unit``; after a ``units`` invalidation the first caller
+reloads the edges (one query, on the shared pool).
+"""
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import cache
+from app.database import shared_session_maker
+from app.models import Unit, unit_prerequisites
+
+EdgeRows = List[Tuple[UUID, UUID, str]]
+
+
+def transitive_closure(edges: Iterable[Tuple[UUID, UUID]]) -> Dict[UUID, FrozenSet[UUID]]:
+    """Every unit's direct and indirect prerequisites."""
+    direct: Dict[UUID, Set[UUID]] = {}
+    for unit_id, prerequisite_id in edges:
+        direct.setdefault(unit_id, set()).add(prerequisite_id)
+
+    closure: Dict[UUID, FrozenSet[UUID]] = {}
+
+    def visit(unit_id: UUID, path: Set[UUID]) -> FrozenSet[UUID]:
+        if unit_id in closure:
+            return closure[unit_id]
+        path.add(unit_id)
+        found: Set[UUID] = set()
+        for prerequisite_id in direct.get(unit_id, ()):
+            found.add(prerequisite_id)
+            # A cycle can't be saved through the API; don't recurse forever if one is in the table anyway
+            if prerequisite_id not in path:
+                found |= visit(prerequisite_id, path)
+        path.discard(unit_id)
+        closure[unit_id] = frozenset(found)
+        return closure[unit_id]
+
+    for unit_id in direct:
+        visit(unit_id, set())
+    return closure
+
+
+async def load_edges(db: AsyncSession) -> EdgeRows:
+    rows = await db.execute(
+        select(unit_prerequisites.c.unit_id, unit_prerequisites.c.prerequisite_id, Unit.unit_code)
+        .join(Unit, Unit.id == unit_prerequisites.c.prerequisite_id)
+    )
+    return [tuple(row) for row in rows]
+
+
+async def _load_cached_edges() -> EdgeRows:
+    # Cache loads are shared by concurrent callers, so they run on the shared pool, not a request's session
+    async with shared_session_maker() as session:
+        return await load_edges(session)
+
+
+class PrerequisiteGraph:
+    def __init__(self):
+        self._rows: Optional[EdgeRows] = None
+        self._closure: Dict[UUID, FrozenSet[UUID]] = {}
+        self._codes: Dict[UUID, str] = {}
+
+    async def required_for(self, redis, unit_id: UUID) -> FrozenSet[UUID]:
+        """Units that must be completed before ``unit_id``; no query while the cache is warm."""
+        rows = await cache.get_or_load(redis, "units:prerequisites", _load_cached_edges, EdgeRows, tags=("units",))
+        if rows is not self._rows:
+            self._closure = transitive_closure((unit, prerequisite) for unit, prerequisite, _ in rows)
+            self._codes = {prerequisite: code for _, prerequisite, code in rows}
+            self._rows = rows
+        return self._closure.get(unit_id, frozenset())
+
+    def codes(self, unit_ids: Iterable[UUID]) -> List[str]:
+        return sorted(self._codes.get(unit_id, str(unit_id)) for unit_id in unit_ids)
+
+
+prerequisite_graph = PrerequisiteGraph()
+
+
+def creates_cycle(edges: EdgeRows, unit_id: UUID, prerequisite_ids: Iterable[UUID]) -> bool:
+    """Whether giving ``unit_id`` these direct prerequisites would make it its own prerequisite."""
+    closure = transitive_closure(
+        [(unit, prerequisite) for unit, prerequisite, _ in edges if unit != unit_id]
+    )
+    return any(
+        prerequisite_id == unit_id or unit_id in closure.get(prerequisite_id, ())
+        for prerequisite_id in prerequisite_ids
+    )
@@ -0,0 +1,227 @@
+"""
+On-demand request profiling.
+
+An admin sends ``X-Profile: 1`` (or ``?profile=1``) and the request runs
+under pyinstrument, or cProfile when pyinstrument isn't installed. With
+``PROFILE_SAMPLE_EVERY=N`` one request in N is also profiled, whoever
+sent it. The report, the request's SQL timeline and a summary are kept
+in Redis for ``PROFILE_TTL_SECONDS`` (newest ``PROFILE_KEEP`` only) and
+served by ``/api/admin/profiles``.
+
+Requests that aren't profiled pay for one header lookup, and the SQL
+hooks aren't installed until the first profile is taken. One request per
+worker is profiled at a time; others arriving meanwhile run normally.
+"""
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import cProfile
+import io
+import json
+import pstats
+import time
+import uuid
+
+import structlog
+from fastapi import HTTPException, Request
+from sqlalchemy import event
+
+from app.config import settings
+from app.database import async_session_maker, engine, get_redis_pool, get_session_redis_pool, shared_engine
+from app.dependencies import get_current_user, require_admin, security
+
+try:
+    from pyinstrument import Profiler
+except ImportError:  # optional; fall back to cProfile
+    Profiler = None
+
+logger = structlog.get_logger()
+
+PROFILE_HEADER = "x-profile"
+PROFILE_INDEX_KEY = "profiles"
+PROFILE_META_KEY = "profile:meta:{}"
+PROFILE_REPORT_KEY = "profile:report:{}"
+MAX_TIMELINE_STATEMENTS = 500
+
+_sql_timeline: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("sql_timeline", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timeline = _sql_timeline.get()
+    if timeline is not None:
+        conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timeline = _sql_timeline.get()
+    if timeline is None or not conn.info.get("profile_started"):
+        return
+    started = conn.info["profile_started"].pop()
+    if len(timeline) < MAX_TIMELINE_STATEMENTS:
+        timeline.append({
+            "at": started,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            "statement": statement[:1000],
+            "executemany": executemany,
+        })
+
+
+class _PyinstrumentProfile:
+    name, format = "pyinstrument", "html"
+
+    def __init__(self):
+        self._profiler = Profiler(async_mode="enabled")
+
+    def start(self):
+        self._profiler.start()
+
+    def stop(self):
+        self._profiler.stop()
+
+    def report(self) -> str:
+        return self._profiler.output_html()
+
+
+class _CProfile:
+    name, format = "cProfile", "text"
+
+    def __init__(self):
+        # cProfile sees everything on this thread, so requests served meanwhile show up too
+        self._profile = cProfile.Profile()
+
+    def start(self):
+        self._profile.enable()
+
+    def stop(self):
+        self._profile.disable()
+
+    def report(self) -> str:
+        out = io.StringIO()
+        pstats.Stats(self._profile, stream=out).sort_stats("cumulative").print_stats(80)
+        return out.getvalue()
+
+
+class RequestProfiler:
+    def __init__(self, sample_every: int, keep: int, ttl: int):
+        self.sample_every = sample_every
+        self.keep = keep
+        self.ttl = ttl
+        self._seen = 0
+        self._busy = False
+        self._hooked = False
+
+    def wanted(self, request: Request) -> Tuple[bool, bool]:
+        """(asked for, sampled). Cheap enough to run on every request."""
+        asked = request.headers.get(PROFILE_HEADER) == "1" or request.query_params.get("profile") == "1"
+        sampled = False
+        if self.sample_every > 0 and not asked:
+            self._seen += 1
+            sampled = self._seen % self.sample_every == 0
+        return asked, sampled
+
+    async def is_admin(self, request: Request) -> bool:
+        """Runs the normal auth chain ending in ``require_admin``; any failure just means no."""
+        try:
+            async with async_session_maker() as db:
+                user = await get_current_user(
+                    request, await security(request), db, await get_redis_pool(), await get_session_redis_pool()
+                )
+                await require_admin(user)
+            return True
+        except HTTPException:
+            return False
+
+    def _install_hooks(self):
+        if not self._hooked:
+            for target in (engine, shared_engine):
+                event.listen(target.sync_engine, "before_cursor_execute", _before_cursor_execute)
+                event.listen(target.sync_engine, "after_cursor_execute", _after_cursor_execute)
+            self._hooked = True
+
+    async def run(self, request: Request, call_next, sampled: bool):
+        """``call_next(request)`` under a profiler, storing the profile once the response is ready."""
+        if self._busy:
+            return await call_next(request)
+        self._busy = True
+        self._install_hooks()
+        timeline: List[Dict[str, Any]] = []
+        token = _sql_timeline.set(timeline)
+        profiler = _PyinstrumentProfile() if Profiler is not None else _CProfile()
+        started = time.perf_counter()
+        status = 500
+        profiler.start()
+        try:
+            response = await call_next(request)
+            status = response.status_code
+        finally:
+            profiler.stop()
+            duration = time.perf_counter() - started
+            _sql_timeline.reset(token)
+            self._busy = False
+            try:
+                profile_id = await self._store(request, profiler, timeline, started, duration, status, sampled)
+            except Exception as exc:
+                logger.warning("Could not store request profile", error=str(exc))
+                profile_id = None
+        if profile_id is not None:
+            response.headers["X-Profile-Id"] = profile_id
+        return response
+
+    async def _store(self, request: Request, profiler, timeline, started: float, duration: float,
+                     status: int, sampled: bool) -> str:
+        report = profiler.report()
+        for entry in timeline:
+            entry["at"] = round((entry["at"] - started) * 1000, 2)
+
+        profile_id = uuid.uuid4().hex
+        meta = {
+            "id": profile_id,
+            "method": request.method,
+            "path": request.url.path,
+            "status": status,
+            "duration_ms": round(duration * 1000, 2),
+            "sql_count": len(timeline),
+            "sql_ms": round(sum(entry["duration_ms"] for entry in timeline), 2),
+            "profiler": profiler.name,
+            "format": profiler.format,
+            "sampled": sampled,
+            "created_at": datetime.utcnow().isoformat(),
+        }
+        redis = await get_redis_pool()
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.set(PROFILE_META_KEY.format(profile_id), json.dumps({**meta, "sql": timeline}), ex=self.ttl)
+            pipe.set(PROFILE_REPORT_KEY.format(profile_id), report, ex=self.ttl)
+            pipe.zadd(PROFILE_INDEX_KEY, {profile_id: time.time()})
+            pipe.zremrangebyrank(PROFILE_INDEX_KEY, 0, -self.keep - 1)
+            pipe.zremrangebyscore(PROFILE_INDEX_KEY, 0, time.time() - self.ttl)
+            await pipe.execute()
+        return profile_id
+
+
+request_profiler = RequestProfiler(
+    settings.profile_sample_every, settings.profile_keep, settings.profile_ttl_seconds
+)
+
+
+async def list_profiles(redis) -> List[Dict[str, Any]]:
+    """Summaries of stored profiles, newest first."""
+    ids = await redis.zrevrange(PROFILE_INDEX_KEY, 0, -1)
+    if not ids:
+        return []
+    found = await redis.mget([PROFILE_META_KEY.format(profile_id) for profile_id in ids])
+    profiles = []
+    for raw in found:
+        if raw is not None:
+            meta = json.loads(raw)
+            meta.pop("sql")
+            profiles.append(meta)
+    return profiles
+
+
+async def get_profile(redis, profile_id: str) -> Optional[Dict[str, Any]]:
+    raw = await redis.get(PROFILE_META_KEY.format(profile_id))
+    return json.loads(raw) if raw is not None else None
+
+
+async def get_profile_report(redis, profile_id: str) -> Optional[str]:
+    return await redis.get(PROFILE_REPORT_KEY.format(profile_id))
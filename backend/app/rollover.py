@@ -0,0 +1,220 @@
+"""
+Closing a term.
+
+Rollover runs three set-based transitions, each in batches of
+``rollover_batch_size`` rows:
+
+- registrations for the closed term still REGISTERED become COMPLETED
+  when they have a result and DROPPED when they don't;
+- active students with an approved graduation request become graduated;
+- active students whose account has been deactivated become suspended.
+
+Students who graduate or are suspended are signed out of every
+server-side session as their batch commits.
+
+Every batch is one short transaction that picks its rows with
+``FOR UPDATE SKIP LOCKED``, so rows a request is writing are left for a
+later batch instead of waited on, and the job pauses
+``rollover_pause_seconds`` between batches. Each transition only selects
+rows still in their old state, so an interrupted run is resumed by
+running it again.
+
+    python -m app.rollover status --year 2025-2026 --semester spring
+    python -m app.rollover run --year 2025-2026 --semester spring
+"""
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, Optional
+import argparse
+import asyncio
+
+import structlog
+from sqlalchemy import case, exists, func, literal, select, text, update
+
+from app.cache import cache
+from app.config import settings
+from app.database import close_redis_pool, engine, get_redis_pool, get_session_redis_pool
+from app.models import (
+    RegistrationStatus, RequestStatus, RequestType, Result, Semester, Student, StudentRequest, UnitRegistration, User
+)
+from app.partitions import ACADEMIC_YEAR
+from app.sessions import invalidate_user_sessions
+
+logger = structlog.get_logger()
+
+# Key for pg_try_advisory_lock so only one rollover runs at a time
+ROLLOVER_LOCK_KEY = 0x726f6c6c
+# A batch gives up rather than queue behind a table lock (e.g. a migration)
+LOCK_TIMEOUT_MS = 2000
+# Transitions after which the students' sessions no longer apply
+SIGNS_OUT = ("graduated", "suspended")
+
+
+class RolloverRunning(Exception):
+    pass
+
+
+def _open_registrations(year: str, semester: Semester):
+    return (
+        select(UnitRegistration.id)
+        .where(UnitRegistration.academic_year == year)
+        .where(UnitRegistration.semester == semester)
+        .where(UnitRegistration.status == RegistrationStatus.REGISTERED)
+        .where(UnitRegistration.archived.is_(False))
+    )
+
+
+def _graduating():
+    return (
+        select(Student.id)
+        .where(Student.is_graduated == "active")
+        .where(exists()
+            .where(StudentRequest.student_id == Student.id)
+            .where(StudentRequest.request_type == RequestType.GRADUATION)
+            .where(StudentRequest.status == RequestStatus.APPROVED))
+    )
+
+
+def _suspended():
+    return (
+        select(Student.id)
+        .join(User, User.id == Student.user_id)
+        .where(Student.is_graduated == "active")
+        .where(User.is_active.is_(False))
+    )
+
+
+def _close_registrations(year: str, semester: Semester, batch_size: int):
+    batch = _open_registrations(year, semester).limit(batch_size).with_for_update(skip_locked=True).cte("batch")
+    has_result = (
+        exists()
+        .where(Result.registration_id == UnitRegistration.id)
+        .where(Result.academic_year == UnitRegistration.academic_year)
+    )
+    status_type = UnitRegistration.__table__.c.status.type
+    return (
+        update(UnitRegistration)
+        .where(UnitRegistration.id == batch.c.id)
+        .where(UnitRegistration.academic_year == year)
+        .where(UnitRegistration.archived.is_(False))
+        .values(status=case(
+            (has_result, literal(RegistrationStatus.COMPLETED, status_type)),
+            else_=literal(RegistrationStatus.DROPPED, status_type),
+        ))
+        .returning(UnitRegistration.status)
+    )
+
+
+def _set_standing(candidates, standing: str, batch_size: int):
+    batch = candidates.limit(batch_size).with_for_update(of=Student, skip_locked=True).cte("batch")
+    return (
+        update(Student)
+        .where(Student.id == batch.c.id)
+        .where(Student.is_graduated == "active")
+        .values(is_graduated=standing, updated_at=datetime.utcnow())
+        .returning(Student.is_graduated, Student.user_id)
+    )
+
+
+def _steps(year: str, semester: Semester, batch_size: int):
+    """(name, statement) pairs; every statement changes at most ``batch_size`` rows."""
+    return [
+        ("registrations", lambda: _close_registrations(year, semester, batch_size)),
+        ("graduated", lambda: _set_standing(_graduating(), "graduated", batch_size)),
+        ("suspended", lambda: _set_standing(_suspended(), "suspended", batch_size)),
+    ]
+
+
+async def pending(year: str, semester: Semester) -> Dict[str, int]:
+    """Rows each transition would still change."""
+    queries = {
+        "registrations": _open_registrations(year, semester),
+        "graduated": _graduating(),
+        "suspended": _suspended(),
+    }
+    async with engine.connect() as conn:
+        return {
+            name: (await conn.execute(select(func.count()).select_from(query.subquery()))).scalar()
+            for name, query in queries.items()
+        }
+
+
+async def run_rollover(
+    year: str,
+    semester: Semester,
+    batch_size: Optional[int] = None,
+    progress: Optional[Callable[[str, Dict[str, int]], None]] = None,
+) -> Dict[str, Dict[str, int]]:
+    """Close ``semester`` of ``year``. Returns how many rows moved to each state, per transition."""
+    if not ACADEMIC_YEAR.match(year):
+        raise ValueError(f"Not an academic year: {year!r}")
+    batch_size = batch_size or settings.rollover_batch_size
+    moved: Dict[str, Dict[str, int]] = {}
+    async with engine.connect() as lock_conn:
+        if not (await lock_conn.execute(select(func.pg_try_advisory_lock(ROLLOVER_LOCK_KEY)))).scalar():
+            raise RolloverRunning("Another rollover is running")
+        try:
+            for name, statement in _steps(year, semester, batch_size):
+                tally = Counter()
+                while True:
+                    async with engine.begin() as conn:
+                        await conn.execute(text(f"SET LOCAL lock_timeout = {LOCK_TIMEOUT_MS}"))
+                        changed = (await conn.execute(statement())).all()
+                    if not changed:
+                        break
+                    tally.update(getattr(row[0], "value", row[0]) for row in changed)
+                    if name in SIGNS_OUT:
+                        await invalidate_user_sessions(await get_session_redis_pool(),
+                                                       *(row.user_id for row in changed))
+                    if progress is not None:
+                        progress(name, dict(tally))
+                    await asyncio.sleep(settings.rollover_pause_seconds)
+                moved[name] = dict(tally)
+                logger.info("Rollover step finished", step=name, academic_year=year,
+                            semester=semester.value, moved=moved[name])
+        finally:
+            await lock_conn.execute(select(func.pg_advisory_unlock(ROLLOVER_LOCK_KEY)))
+
+    if moved["graduated"] or moved["suspended"]:
+        await cache.invalidate(await get_redis_pool(), "students")
+    return moved
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m app.rollover")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, help in (("run", "Close a term"), ("status", "Show what closing a term would still change")):
+        command = commands.add_parser(name, help=help)
+        command.add_argument("--year", required=True, help="Academic year, e.g. 2025-2026")
+        command.add_argument("--semester", required=True, choices=[semester.value for semester in Semester])
+        if name == "run":
+            command.add_argument("--batch-size", type=int, default=settings.rollover_batch_size)
+    args = parser.parse_args()
+    args.semester = Semester(args.semester)
+
+    async def run():
+        try:
+            if args.command == "run":
+                moved = await run_rollover(
+                    args.year, args.semester, args.batch_size,
+                    progress=lambda step, tally: print(f"  {step:<14} {tally}", end="\r", flush=True),
+                )
+                print()
+                for step, tally in moved.items():
+                    print(f"  {step:<14} {tally or 'nothing to do'}")
+                # Rows locked by requests while the job ran are skipped, not waited for
+                left = {step: count for step, count in (await pending(args.year, args.semester)).items() if count}
+                if left:
+                    print(f"Still pending (run again to finish): {left}")
+            else:
+                for step, count in (await pending(args.year, args.semester)).items():
+                    print(f"{step}: {count}")
+        finally:
+            await close_redis_pool()
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Upkeep for the finance rollup materialized views.
+
+Writers that touch fees or payments call ``mark_finance_dirty``. Every
+``finance_rollup_refresh_seconds`` one app worker (elected with a Redis
+lock) refreshes the views with ``REFRESH MATERIALIZED VIEW CONCURRENTLY``
+if anything changed, or if the last refresh is older than an hour to
+pick up writes made outside the API (imports, seeding). Readers are
+never blocked by a refresh.
+"""
+from datetime import datetime
+from typing import Optional
+import asyncio
+import time
+
+import structlog
+from sqlalchemy import text
+
+from app.config import settings
+from app.database import engine
+from app.models.finance import FINANCE_VIEWS
+
+FINANCE_DIRTY_KEY = "rollups:finance:dirty"
+FINANCE_LOCK_KEY = "rollups:finance:lock"
+FINANCE_REFRESHED_KEY = "rollups:finance:refreshed_at"
+MAX_AGE_SECONDS = 3600
+
+logger = structlog.get_logger()
+
+
+async def mark_finance_dirty(redis):
+    await redis.set(FINANCE_DIRTY_KEY, 1)
+
+
+async def finance_refreshed_at(redis) -> Optional[datetime]:
+    value = await redis.get(FINANCE_REFRESHED_KEY)
+    return datetime.utcfromtimestamp(float(value)) if value else None
+
+
+async def refresh_finance_views(redis) -> datetime:
+    started = time.time()
+    async with engine.connect() as conn:
+        # CONCURRENTLY cannot run inside a transaction block
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for name in FINANCE_VIEWS:
+            await conn.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {name}"))
+    await redis.set(FINANCE_REFRESHED_KEY, started)
+    logger.info("Finance rollups refreshed", seconds=round(time.time() - started, 2))
+    return datetime.utcfromtimestamp(started)
+
+
+async def run_rollup_refresher(redis):
+    interval = settings.finance_rollup_refresh_seconds
+    while True:
+        await asyncio.sleep(interval)
+        dirty = None
+        try:
+            if not await redis.set(FINANCE_LOCK_KEY, 1, nx=True, ex=max(1, int(interval))):
+                continue  # another worker owns this round
+            # Cleared before refreshing so writes made meanwhile trigger the next round
+            dirty = await redis.getdel(FINANCE_DIRTY_KEY)
+            refreshed = await redis.get(FINANCE_REFRESHED_KEY)
+            if dirty or not refreshed or time.time() - float(refreshed) > MAX_AGE_SECONDS:
+                await refresh_finance_views(redis)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("Finance rollup refresh failed", error=str(exc))
+            if dirty:
+                await mark_finance_dirty(redis)
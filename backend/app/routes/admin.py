@@ -1,23 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile, status, Query
+from fastapi.responses import HTMLResponse, PlainTextResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_
-from typing import List, Optional
-from datetime import datetime
+from sqlalchemy import Date, select, update, func, or_
+from typing import Dict, List, Literal, Optional, Union
+from datetime import date, datetime, timedelta
 from uuid import UUID
 
-from app.database import get_db
+from app.database import get_db, get_redis, pool_status, shared_session_maker
 from app.models import (
-    User, Student, Unit, UnitRegistration, Result,
-    FeeStructure, Payment, StudentRequest, RequestStatus
+    User, Student, Unit, UnitRegistration, Result, unit_prerequisites,
+    FeeStructure, Payment, StudentRequest, RequestStatus, Semester,
+    GradingScheme, GradeBand, ProgramRequirement,
+    finance_daily_collections, finance_period_balances
 )
 from app.schemas import (
-    StudentResponse, UnitCreate, UnitUpdate, UnitResponse,
-    ResultCreate, ResultUpdate, ResultResponse,
+    StudentResponse, UnitCreate, UnitUpdate, UnitResponse, UnitPrerequisitesUpdate, UnitPrerequisitesResponse,
+    ResultCreate, ResultUpdate, ResultPublish, ResultResponse,
     FeeStructureCreate, FeeStructureResponse,
     PaymentCreate, PaymentResponse,
-    StudentRequestResponse, StudentRequestUpdate
+    StudentRequestResponse, StudentRequestUpdate,
+    GradingSchemeCreate, GradingSchemeUpdate, GradingSchemeResponse, RegradeRequest,
+    ProgramRequirementCreate, ProgramRequirementUpdate, ProgramRequirementResponse
 )
+from app.config import settings
 from app.dependencies import require_admin
+from app.admissions import AdmissionFileError, admissions, parse_admissions
+from app.analytics import bump_results_version, result_statistics
+from app.cache import cache
+from app.coalesce import single_flight, statement_key
+from app.documents import DOCUMENTS, documents
+from app.graduation import evaluate_graduation_requests
+from app.grading import grading_schemes, invalidate_grading_schemes, regrade_statement
+from app.notifications import try_enqueue_emails
+from app.prerequisites import creates_cycle, load_edges, transitive_closure
+from app.profiling import get_profile, get_profile_report, list_profiles
+from app.rollups import mark_finance_dirty, finance_refreshed_at, refresh_finance_views
+from app.slow_queries import get_plan, top_slow_queries
+from app.write_behind import write_behind
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
@@ -50,6 +70,46 @@ async def get_all_students(
     return students
 
 
+@router.post("/students/admissions")
+async def admit_students(
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db),
+    redis=Depends(get_redis),
+    admin: User = Depends(require_admin)
+):
+    """Admit a CSV of students (StudentCreate columns; password optional) and report on every row."""
+    content = await file.read(settings.max_upload_size + 1)
+    if len(content) > settings.max_upload_size:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="File too large"
+        )
+    try:
+        rows = parse_admissions(content)
+    except AdmissionFileError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
+    
+    try:
+        report = await admissions.admit(db, rows)
+    except IntegrityError:
+        # Lost a race with a signup for one of the same emails; nothing was admitted
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="An email in this file was registered while importing; please retry"
+        )
+    if report["admitted"]:
+        await cache.invalidate(redis, "students")
+    write_behind.record_event(
+        "students.admitted", actor_id=admin.id, entity_type="student", entity_id=None,
+        details={"file": file.filename, "admitted": report["admitted"], "rejected": report["rejected"]}
+    )
+    return report
+
+
 @router.get("/students/{student_id}", response_model=StudentResponse)
 async def get_student(
     student_id: UUID,
@@ -67,11 +127,36 @@ async def get_student(
     return student
 
 
+@router.get("/students/{student_id}/documents/{kind}", response_class=HTMLResponse)
+async def get_student_document(
+    student_id: UUID,
+    kind: str,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    redis=Depends(get_redis),
+    admin: User = Depends(require_admin)
+):
+    """Printable fee statement or result slip for a student."""
+    if kind not in DOCUMENTS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    student = await db.get(Student, student_id)
+    if not student:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Student not found"
+        )
+    return await documents.respond(request, db, redis, kind, student)
+
+
 # ============ Unit Management ============
 @router.post("/units", response_model=UnitResponse, status_code=status.HTTP_201_CREATED)
 async def create_unit(
     unit_data: UnitCreate,
     db: AsyncSession = Depends(get_db),
+    redis=Depends(get_redis),
     admin: User = Depends(require_admin)
 ):
     """Create a new unit."""
@@ -89,18 +174,22 @@ async def create_unit(
     db.add(unit)
     await db.commit()
     await db.refresh(unit)
+    await cache.invalidate(redis, "units")
     return unit
 
 
 @router.get("/units", response_model=List[UnitResponse])
 async def get_all_units(
-    db: AsyncSession = Depends(get_db),
+    redis=Depends(get_redis),
     admin: User = Depends(require_admin)
 ):
     """Get all units."""
-    result = await db.execute(select(Unit))
-    units = result.scalars().all()
-    return units
+    async def load():
+        async with shared_session_maker() as session:
+            result = await session.execute(select(Unit))
+            return result.scalars().all()
+
+    return await cache.get_or_load(redis, "units:all", load, List[UnitResponse], tags=("units",), coalesce=True)
 
 
 @router.put("/units/{unit_id}", response_model=UnitResponse)
@@ -108,6 +197,7 @@ async def update_unit(
     unit_id: UUID,
     update_data: UnitUpdate,
     db: AsyncSession = Depends(get_db),
+    redis=Depends(get_redis),
     admin: User = Depends(require_admin)
 ):
     """Update a unit."""
@@ -125,14 +215,86 @@ async def update_unit(
     
     await db.commit()
     await db.refresh(unit)
+    await cache.invalidate(redis, "units")
     return unit
 
 
+async def _prerequisites_response(db: AsyncSession, unit_id: UUID) -> dict:
+    edges = await load_edges(db)
+    direct = {prerequisite for unit, prerequisite, _ in edges if unit == unit_id}
+    required = transitive_closure((unit, prerequisite) for unit, prerequisite, _ in edges).get(unit_id, frozenset())
+    units = {}
+    if required:
+        result = await db.execute(select(Unit).where(Unit.id.in_(list(required))).order_by(Unit.unit_code))
+        units = {unit.id: unit for unit in result.scalars().all()}
+    return {
+        "unit_id": unit_id,
+        "prerequisites": [unit for unit_key, unit in units.items() if unit_key in direct],
+        "required": list(units.values()),
+    }
+
+
+@router.get("/units/{unit_id}/prerequisites", response_model=UnitPrerequisitesResponse)
+async def get_unit_prerequisites(
+    unit_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    admin: User = Depends(require_admin)
+):
+    """A unit's direct prerequisites and everything needed before registering for it."""
+    return await _prerequisites_response(db, unit_id)
+
+
+@router.put("/units/{unit_id}/prerequisites", response_model=UnitPrerequisitesResponse)
+async def set_unit_prerequisites(
+    unit_id: UUID,
+    update_data: UnitPrerequisitesUpdate,
+    db: AsyncSession = Depends(get_db),
+    redis=Depends(get_redis),
+    admin: User = Depends(require_admin)
+):
+    """Replace a unit's direct prerequisites."""
+    wanted = set(update_data.prerequisites)
+    result = await db.execute(select(Unit.id).where(Unit.id.in_(list(wanted | {unit_id}))))
+    found = set(result.scalars().all())
+    if unit_id not in found:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Unit not found"
+        )
+    if wanted - found:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unknown prerequisite units"
+        )
+    # Serialize prerequisite changes so two edits can't close a cycle between them
+    await db.execute(select(func.pg_advisory_xact_lock(func.hashtext("unit_prerequisites"))))
+    if creates_cycle(await load_edges(db), unit_id, wanted):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A unit cannot depend on itself, directly or through its prerequisites"
+        )
+    
+    await db.execute(unit_prerequisites.delete().where(unit_prerequisites.c.unit_id == unit_id))
+    if wanted:
+        await db.execute(
+            unit_prerequisites.insert(),
+            [{"unit_id": unit_id, "prerequisite_id": prerequisite_id} for prerequisite_id in wanted]
+        )
+    await db.commit()
+    await cache.invalidate(redis, "units")
+    write_behind.record_event(
+        "unit.prerequisites_set", actor_id=admin.id, entity_type="unit", entity_id=unit_id,
+        details={"prerequisites": sorted(str(prerequisite_id) for prerequisite_id in wanted)}
+    )
+    return await _prerequisites_response(db, unit_id)
+
+
 # ============ Results Management ============
 @router.post("/results", response_model=ResultResponse, status_code=status.HTTP_201_CREATED)
 async def enter_result(
     result_data: ResultCreate,
     db: AsyncSession = Depends(get_db),
+    redis=Depends(get_redis),
     admin: User = Depends(require_admin)
 ):
     """Enter or update student result."""
@@ -158,21 +320,40 @@ async def enter_result(
         for field, value in result_data.dict(exclude_unset=True).items():
             if field != "registration_id":
                 setattr(existing_result, field, value)
+        # Marks decide the grade; a typed grade only stands when no scheme applies
+        existing_result.grade = await grading_schemes.grade_for(
+            redis, registration.student.program, existing_result.marks
+        ) or existing_result.grade
         existing_result.entered_by = admin.id
         existing_result.entered_at = datetime.utcnow()
         await db.commit()
         await db.refresh(existing_result)
+        await bump_results_version(redis)
+        write_behind.record_event(
+            "result.entered", actor_id=admin.id, entity_type="result", entity_id=existing_result.id,
+            details={"marks": str(existing_result.marks), "grade": existing_result.grade}
+        )
         return existing_result
     else:
         # Create new result
+        data = result_data.dict()
+        data["grade"] = await grading_schemes.grade_for(
+            redis, registration.student.program, result_data.marks
+        ) or data["grade"]
         result = Result(
-            **result_data.dict(),
+            **data,
+            registration=registration,  # also copies the registration's partition keys
             entered_by=admin.id,
             entered_at=datetime.utcnow()
         )
         db.add(result)
         await db.commit()
         await db.refresh(result)
+        await bump_results_version(redis)
+        write_behind.record_event(
+            "result.entered", actor_id=admin.id, entity_type="result", entity_id=result.id,
+            details={"marks": str(result.marks), "grade": result.grade}
+        )
         return result
 
 
@@ -181,6 +362,7 @@ async def update_result(
     result_id: UUID,
     update_data: ResultUpdate,
     db: AsyncSession = Depends(get_db),
+    redis=Depends(get_redis),
     admin: User = Depends(require_admin)
 ):
     """Update result status (publish/unpublish)."""
@@ -193,19 +375,313 @@ async def update_result(
         )
     
     update_dict = update_data.dict(exclude_unset=True)
+    newly_published = update_dict.get("is_published") == "published" and result_obj.is_published != "published"
     for field, value in update_dict.items():
         setattr(result_obj, field, value)
+    if "marks" in update_dict:
+        result_obj.grade = await grading_schemes.grade_for(
+            redis, result_obj.registration.student.program, result_obj.marks
+        ) or result_obj.grade
     
     await db.commit()
     await db.refresh(result_obj)
+    await bump_results_version(redis)
+    write_behind.record_event(
+        "result.updated", actor_id=admin.id, entity_type="result", entity_id=result_obj.id,
+        details={field: str(value) for field, value in update_dict.items()}
+    )
+    if newly_published:
+        registration = result_obj.registration
+        await try_enqueue_emails(redis, "results_published", [(registration.student.user.email, {
+            "first_name": registration.student.first_name,
+            "academic_year": registration.academic_year,
+            "semester": registration.semester.value,
+            "units": 1,
+        })])
     return result_obj
 
 
+@router.post("/results/publish")
+async def publish_results(
+    publish_data: ResultPublish,
+    db: AsyncSession = Depends(get_db),
+    redis=Depends(get_redis),
+    admin: User = Depends(require_admin)
+):
+    """Publish all unpublished results for a semester (optionally one unit) and notify each student once."""
+    registrations = select(UnitRegistration.id).where(
+        UnitRegistration.academic_year == publish_data.academic_year,
+        UnitRegistration.semester == publish_data.semester,
+    )
+    if publish_data.unit_id:
+        registrations = registrations.where(UnitRegistration.unit_id == publish_data.unit_id)
+    
+    # Publish and collect recipients in one statement
+    published = (
+        update(Result)
+        .where(Result.registration_id.in_(registrations))
+        .where(Result.academic_year == publish_data.academic_year)
+        .where(Result.is_published.is_distinct_from("published"))
+        .values(is_published="published")
+        .returning(Result.registration_id)
+        .cte("published")
+    )
+    recipients = (await db.execute(
+        select(User.email, Student.first_name, func.count())
+        .select_from(published)
+        .join(UnitRegistration, UnitRegistration.id == published.c.registration_id)
+        .join(Student, Student.id == UnitRegistration.student_id)
+        .join(User, User.id == Student.user_id)
+        .group_by(User.email, Student.first_name)
+    )).all()
+    await db.commit()
+    if recipients:
+        await bump_results_version(redis)
+    
+    results_published = sum(count for _, _, count in recipients)
+    write_behind.record_event(
+        "results.published", actor_id=admin.id, entity_type="unit", entity_id=publish_data.unit_id,
+        details={"academic_year": publish_data.academic_year, "semester": publish_data.semester.value,
+                 "results": results_published}
+    )
+    queued = await try_enqueue_emails(redis, "results_published", (
+        (email, {
+            "first_name": first_name,
+            "academic_year": publish_data.academic_year,
+            "semester": publish_data.semester.value,
+            "units": count,
+        })
+        for email, first_name, count in recipients
+    ))
+    return {
+        "results_published": results_published,
+        "students": len(recipients),
+        "notifications_queued": queued
+    }
+
+
+@router.get("/results/statistics")
+async def get_result_statistics(
+    academic_year: str = Query(..., pattern=r"^\d{4}-\d{4}$"),
+    semester: Semester = Query(...),
+    group_by: Literal["unit", "program"] = Query("unit"),
+    unit_id: Optional[UUID] = Query(None),
+    program: Optional[str] = Query(None),
+    published_only: bool = Query(False),
+    db: AsyncSession = Depends(get_db),
+    redis=Depends(get_redis),
+    admin: User = Depends(require_admin)
+):
+    """Mark statistics, grade histograms and pass rates per unit or program for a semester."""
+    return await result_statistics(
+        db, redis, academic_year, semester,
+        group_by=group_by, unit_id=unit_id, program=program, published_only=published_only
+    )
+
+
+# ============ Grading Schemes ============
+@router.get("/grading-schemes", response_model=List[GradingSchemeResponse])
+async def get_grading_schemes(
+    db: AsyncSession = Depends(get_db),
+    admin: User = Depends(require_admin)
+):
+    """List grading schemes; the one without a program is the default."""
+    result = await db.execute(select(GradingScheme).order_by(GradingScheme.program.nulls_first()))
+    return result.scalars().all()
+
+
+@router.post("/grading-schemes", response_model=GradingSchemeResponse, status_code=status.HTTP_201_CREATED)
+async def create_grading_scheme(
+    scheme_data: GradingSchemeCreate,
+    db: AsyncSession = Depends(get_db),
+    redis=Depends(get_redis),
+    admin: User = Depends(require_admin)
+):
+    """Create a grading scheme for a program (or the default scheme)."""
+    existing = await db.execute(
+        select(GradingScheme.id).where(
+            or_(GradingScheme.name == scheme_data.name,
+                GradingScheme.program.is_not_distinct_from(scheme_data.program))
+        )
+    )
+    if existing.first():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A grading scheme with this name or program already exists"
+        )
+    
+    scheme = GradingScheme(
+        name=scheme_data.name,
+        program=scheme_data.program,
+        bands=[GradeBand(**band.dict()) for band in scheme_data.bands]
+    )
+    db.add(scheme)
+    await db.commit()
+    await db.refresh(scheme)
+    await invalidate_grading_schemes(redis)
+    write_behind.record_event(
+        "grading_scheme.created", actor_id=admin.id, entity_type="grading_scheme", entity_id=scheme.id,
+        details={"name": scheme.name, "program": scheme.program}
+    )
+    return scheme
+
+
+@router.put("/grading-schemes/{scheme_id}", response_model=GradingSchemeResponse)
+async def update_grading_scheme(
+    scheme_id: UUID,
+    update_data: GradingSchemeUpdate,
+    db: AsyncSession = Depends(get_db),
+    redis=Depends(get_redis),
+    admin: User = Depends(require_admin)
+):
+    """Rename a scheme or replace its bands. Existing grades change only on re-grade."""
+    result = await db.execute(select(GradingScheme).where(GradingScheme.id == scheme_id))
+    scheme = result.scalar_one_or_none()
+    if not scheme:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Grading scheme not found"
+        )
+    
+    if update_data.name is not None:
+        scheme.name = update_data.name
+    if update_data.bands is not None:
+        # Flush the removals first so the new bands don't trip the unique constraints
+        scheme.bands = []
+        await db.flush()
+        scheme.bands = [GradeBand(**band.dict()) for band in update_data.bands]
+    scheme.updated_at = datetime.utcnow()
+    
+    await db.commit()
+    await db.refresh(scheme)
+    await invalidate_grading_schemes(redis)
+    write_behind.record_event(
+        "grading_scheme.updated", actor_id=admin.id, entity_type="grading_scheme", entity_id=scheme.id,
+        details={"name": scheme.name, "bands": {band.grade: str(band.min_marks) for band in scheme.bands}}
+    )
+    return scheme
+
+
+@router.post("/grading-schemes/regrade")
+async def regrade_results(
+    regrade_data: RegradeRequest,
+    db: AsyncSession = Depends(get_db),
+    redis=Depends(get_redis),
+    admin: User = Depends(require_admin)
+):
+    """Recompute grades from marks for a whole semester in one set-based UPDATE."""
+    result = await db.execute(
+        regrade_statement(regrade_data.academic_year, regrade_data.semester, regrade_data.program)
+    )
+    await db.commit()
+    if result.rowcount:
+        await bump_results_version(redis)
+    
+    write_behind.record_event(
+        "results.regraded", actor_id=admin.id, entity_type="grading_scheme", entity_id=None,
+        details={"academic_year": regrade_data.academic_year, "semester": regrade_data.semester.value,
+                 "program": regrade_data.program, "results": result.rowcount}
+    )
+    return {"results_regraded": result.rowcount}
+
+
+# ============ Graduation Requirements ============
+async def _units_by_code(db: AsyncSession, codes: List[str]) -> List[Unit]:
+    if not codes:
+        return []
+    result = await db.execute(select(Unit).where(Unit.unit_code.in_(codes)))
+    units = result.scalars().all()
+    unknown = set(codes) - {unit.unit_code for unit in units}
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown unit codes: {', '.join(sorted(unknown))}"
+        )
+    return units
+
+
+@router.get("/program-requirements", response_model=List[ProgramRequirementResponse])
+async def get_program_requirements(
+    db: AsyncSession = Depends(get_db),
+    admin: User = Depends(require_admin)
+):
+    """List graduation requirements per program."""
+    result = await db.execute(select(ProgramRequirement).order_by(ProgramRequirement.program))
+    return result.scalars().all()
+
+
+@router.post("/program-requirements", response_model=ProgramRequirementResponse, status_code=status.HTTP_201_CREATED)
+async def create_program_requirement(
+    requirement_data: ProgramRequirementCreate,
+    db: AsyncSession = Depends(get_db),
+    admin: User = Depends(require_admin)
+):
+    """Set the credits and required units a program needs for graduation."""
+    existing = await db.execute(
+        select(ProgramRequirement.id).where(ProgramRequirement.program == requirement_data.program)
+    )
+    if existing.first():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Requirements for this program already exist"
+        )
+    
+    requirement = ProgramRequirement(
+        program=requirement_data.program,
+        min_credits=requirement_data.min_credits,
+        required_units=await _units_by_code(db, requirement_data.required_units)
+    )
+    db.add(requirement)
+    await db.commit()
+    await db.refresh(requirement)
+    write_behind.record_event(
+        "program_requirement.created", actor_id=admin.id, entity_type="program_requirement",
+        entity_id=requirement.id,
+        details={"program": requirement.program, "min_credits": requirement.min_credits,
+                 "required_units": requirement_data.required_units}
+    )
+    return requirement
+
+
+@router.put("/program-requirements/{requirement_id}", response_model=ProgramRequirementResponse)
+async def update_program_requirement(
+    requirement_id: UUID,
+    update_data: ProgramRequirementUpdate,
+    db: AsyncSession = Depends(get_db),
+    admin: User = Depends(require_admin)
+):
+    """Change a program's credits or replace its required units. Verdicts change on the next evaluation."""
+    result = await db.execute(select(ProgramRequirement).where(ProgramRequirement.id == requirement_id))
+    requirement = result.scalar_one_or_none()
+    if not requirement:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Program requirements not found"
+        )
+    
+    if update_data.min_credits is not None:
+        requirement.min_credits = update_data.min_credits
+    if update_data.required_units is not None:
+        requirement.required_units = await _units_by_code(db, update_data.required_units)
+    requirement.updated_at = datetime.utcnow()
+    
+    await db.commit()
+    await db.refresh(requirement)
+    write_behind.record_event(
+        "program_requirement.updated", actor_id=admin.id, entity_type="program_requirement",
+        entity_id=requirement.id,
+        details={"program": requirement.program, "min_credits": requirement.min_credits,
+                 "required_units": [unit.unit_code for unit in requirement.required_units]}
+    )
+    return requirement
+
+
 # ============ Fee Management ============
 @router.post("/fees", response_model=FeeStructureResponse, status_code=status.HTTP_201_CREATED)
 async def create_fee(
     fee_data: FeeStructureCreate,
     db: AsyncSession = Depends(get_db),
+    redis=Depends(get_redis),
     admin: User = Depends(require_admin)
 ):
     """Create fee structure for a student."""
@@ -213,6 +689,7 @@ async def create_fee(
     db.add(fee)
     await db.commit()
     await db.refresh(fee)
+    await mark_finance_dirty(redis)
     return fee
 
 
@@ -220,9 +697,13 @@ async def create_fee(
 async def record_payment(
     payment_data: PaymentCreate,
     db: AsyncSession = Depends(get_db),
+    redis=Depends(get_redis),
     admin: User = Depends(require_admin)
 ):
     """Record a payment."""
+    # Payments are partitioned, so reference numbers can't have a unique index;
+    # the lock serializes recording the same reference until this transaction ends
+    await db.execute(select(func.pg_advisory_xact_lock(func.hashtext(payment_data.reference_number))))
     # Check if reference number exists
     existing = await db.execute(
         select(Payment).where(Payment.reference_number == payment_data.reference_number)
@@ -237,6 +718,20 @@ async def record_payment(
     db.add(payment)
     await db.commit()
     await db.refresh(payment)
+    await mark_finance_dirty(redis)
+    await cache.invalidate(redis, "payments")
+    write_behind.record_event(
+        "payment.recorded", actor_id=admin.id, entity_type="payment", entity_id=payment.id,
+        details={"amount": str(payment.amount), "reference_number": payment.reference_number}
+    )
+    await try_enqueue_emails(redis, "payment_received", [(payment.student.user.email, {
+        "first_name": payment.student.first_name,
+        "amount": f"{payment.amount:,.2f}",
+        "payment_method": payment.payment_method.value.replace("_", " "),
+        "reference_number": payment.reference_number,
+        "academic_year": payment.academic_year,
+        "semester": payment.semester,
+    })])
     return payment
 
 
@@ -245,7 +740,8 @@ async def record_payment(
 async def get_all_requests(
     request_type: Optional[str] = Query(None),
     status_filter: Optional[RequestStatus] = Query(None),
-    db: AsyncSession = Depends(get_db),
+    eligibility: Optional[Literal["eligible", "ineligible", "review"]] = Query(None),
+    redis=Depends(get_redis),
     admin: User = Depends(require_admin)
 ):
     """Get all student requests."""
@@ -255,11 +751,35 @@ async def get_all_requests(
         query = query.where(StudentRequest.request_type == request_type)
     if status_filter:
         query = query.where(StudentRequest.status == status_filter)
+    if eligibility:
+        query = query.where(StudentRequest.eligibility == eligibility)
     
     query = query.order_by(StudentRequest.request_date.desc())
-    result = await db.execute(query)
-    requests = result.scalars().all()
-    return requests
+
+    async def load():
+        async with shared_session_maker() as session:
+            result = await session.execute(query)
+            return result.scalars().all()
+
+    # Identical listings requested at the same moment share one query
+    return await single_flight.do(redis, statement_key(query), load, List[StudentRequestResponse])
+
+
+@router.post("/requests/graduation/evaluate")
+async def evaluate_graduation(
+    db: AsyncSession = Depends(get_db),
+    redis=Depends(get_redis),
+    admin: User = Depends(require_admin)
+):
+    """Precompute an eligibility verdict, with reasons, for every pending graduation request."""
+    counts = await evaluate_graduation_requests(db)
+    if counts:
+        await cache.invalidate(redis, "requests")
+    write_behind.record_event(
+        "graduation.evaluated", actor_id=admin.id, entity_type="student_request", entity_id=None,
+        details=counts
+    )
+    return {"evaluated": sum(counts.values()), **counts}
 
 
 @router.put("/requests/{request_id}", response_model=StudentRequestResponse)
@@ -267,6 +787,7 @@ async def process_request(
     request_id: UUID,
     update_data: StudentRequestUpdate,
     db: AsyncSession = Depends(get_db),
+    redis=Depends(get_redis),
     admin: User = Depends(require_admin)
 ):
     """Process student request (approve/reject)."""
@@ -287,40 +808,201 @@ async def process_request(
     
     await db.commit()
     await db.refresh(request_obj)
+    await cache.invalidate(redis, "requests")
+    if request_obj.status in (RequestStatus.APPROVED, RequestStatus.REJECTED):
+        await try_enqueue_emails(redis, "request_processed", [(request_obj.student.user.email, {
+            "first_name": request_obj.student.first_name,
+            "request_type": request_obj.request_type.value,
+            "status": request_obj.status.value,
+            "request_date": request_obj.request_date.strftime("%d %b %Y"),
+            "admin_remarks": request_obj.admin_remarks,
+        })])
     return request_obj
 
 
 # ============ Reports & Analytics ============
 @router.get("/reports/summary")
 async def get_summary_report(
-    db: AsyncSession = Depends(get_db),
+    redis=Depends(get_redis),
     admin: User = Depends(require_admin)
 ):
     """Get system summary statistics."""
-    # Total students
-    total_students = await db.execute(select(func.count(Student.id)))
-    
-    # Active students
-    active_students = await db.execute(
-        select(func.count(Student.id)).where(Student.is_graduated == "active")
+    async def load():
+        async with shared_session_maker() as session:
+            # Total students
+            total_students = await session.execute(select(func.count(Student.id)))
+        
+            # Active students
+            active_students = await session.execute(
+                select(func.count(Student.id)).where(Student.is_graduated == "active")
+            )
+        
+            # Total units
+            total_units = await session.execute(select(func.count(Unit.id)))
+        
+            # Pending requests
+            pending_requests = await session.execute(
+                select(func.count(StudentRequest.id))
+                .where(StudentRequest.status == RequestStatus.PENDING)
+            )
+        
+            # Total fees collected
+            total_collected = await session.execute(select(func.sum(Payment.amount)))
+        
+            return {
+                "total_students": total_students.scalar(),
+                "active_students": active_students.scalar(),
+                "total_units": total_units.scalar(),
+                "pending_requests": pending_requests.scalar(),
+                "total_fees_collected": float(total_collected.scalar() or 0)
+            }
+
+    return await cache.get_or_load(
+        redis, "reports:summary", load, Dict[str, Union[int, float]],
+        tags=("students", "units", "requests", "payments"), coalesce=True
+    )
+
+
+@router.get("/reports/pools")
+async def get_pool_status(admin: User = Depends(require_admin)):
+    """Connection pool usage and checkout wait times for the worker serving this request."""
+    return pool_status()
+
+
+@router.get("/reports/slow-queries")
+async def get_slow_queries(
+    limit: int = Query(20, ge=1, le=100),
+    order: Literal["total", "mean", "max", "count"] = Query("total"),
+    redis=Depends(get_redis),
+    admin: User = Depends(require_admin)
+):
+    """Statements slower than SLOW_QUERY_MS across all workers, normalized and ranked."""
+    return await top_slow_queries(redis, limit, order)
+
+
+@router.get("/reports/slow-queries/{fingerprint}/plan")
+async def get_slow_query_plan(fingerprint: str, redis=Depends(get_redis), admin: User = Depends(require_admin)):
+    """EXPLAIN (ANALYZE, BUFFERS) output captured for a repeatedly slow statement."""
+    plan = await get_plan(redis, fingerprint)
+    if plan is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No plan captured for this query")
+    return plan
+
+
+# ============ Request Profiles ============
+@router.get("/profiles")
+async def get_profiles(redis=Depends(get_redis), admin: User = Depends(require_admin)):
+    """Stored request profiles, newest first (send X-Profile: 1 on any request to record one)."""
+    return await list_profiles(redis)
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile_detail(profile_id: str, redis=Depends(get_redis), admin: User = Depends(require_admin)):
+    """A profile's summary and SQL timeline."""
+    profile = await get_profile(redis, profile_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return profile
+
+
+@router.get("/profiles/{profile_id}/report")
+async def download_profile_report(profile_id: str, redis=Depends(get_redis), admin: User = Depends(require_admin)):
+    """The profiler's report: pyinstrument's HTML flame view, or cProfile stats as text."""
+    profile = await get_profile(redis, profile_id)
+    report = await get_profile_report(redis, profile_id)
+    if profile is None or report is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    response_class = HTMLResponse if profile["format"] == "html" else PlainTextResponse
+    suffix = "html" if profile["format"] == "html" else "txt"
+    return response_class(
+        report, headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.{suffix}"'}
     )
+
+
+# ============ Finance Reports (read from rollup views) ============
+@router.get("/reports/finance/collections")
+async def get_collections_report(
+    period: Literal["day", "week", "month"] = Query("day"),
+    by: Optional[Literal["payment_method", "program"]] = Query(None),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    db: AsyncSession = Depends(get_db),
+    redis=Depends(get_redis),
+    admin: User = Depends(require_admin)
+):
+    """Payments collected per day, week or month, optionally split by payment method or program."""
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=90)
     
-    # Total units
-    total_units = await db.execute(select(func.count(Unit.id)))
+    rollup = finance_daily_collections
+    bucket = func.date_trunc(period, rollup.c.day).cast(Date).label("period")
+    keys = [bucket] + ([rollup.c[by]] if by else [])
+    rows = (await db.execute(
+        select(*keys, func.sum(rollup.c.payments).label("payments"), func.sum(rollup.c.amount).label("amount"))
+        .where(rollup.c.day.between(start_date, end_date))
+        .group_by(*keys)
+        .order_by(*keys)
+    )).all()
     
-    # Pending requests
-    pending_requests = await db.execute(
-        select(func.count(StudentRequest.id))
-        .where(StudentRequest.status == RequestStatus.PENDING)
-    )
+    return {
+        "as_of": await finance_refreshed_at(redis),
+        "period": period,
+        "start_date": start_date,
+        "end_date": end_date,
+        "rows": [
+            {**row._asdict(), "payments": int(row.payments), "amount": float(row.amount)}
+            for row in rows
+        ]
+    }
+
+
+@router.get("/reports/finance/balances")
+async def get_balances_report(
+    academic_year: Optional[str] = Query(None, pattern=r"^\d{4}-\d{4}$"),
+    semester: Optional[str] = Query(None),
+    by_program: bool = Query(False),
+    db: AsyncSession = Depends(get_db),
+    redis=Depends(get_redis),
+    admin: User = Depends(require_admin)
+):
+    """Billed, paid and outstanding amounts per academic year and semester."""
+    rollup = finance_period_balances
+    keys = [rollup.c.academic_year, rollup.c.semester] + ([rollup.c.program] if by_program else [])
+    query = select(
+        *keys,
+        func.sum(rollup.c.students).label("students"),
+        func.sum(rollup.c.students_owing).label("students_owing"),
+        func.sum(rollup.c.billed).label("billed"),
+        func.sum(rollup.c.paid).label("paid"),
+        func.sum(rollup.c.outstanding).label("outstanding"),
+    ).group_by(*keys).order_by(rollup.c.academic_year.desc(), *keys[1:])
     
-    # Total fees collected
-    total_collected = await db.execute(select(func.sum(Payment.amount)))
+    if academic_year:
+        query = query.where(rollup.c.academic_year == academic_year)
+    if semester:
+        query = query.where(rollup.c.semester == semester)
     
+    rows = (await db.execute(query)).all()
     return {
-        "total_students": total_students.scalar(),
-        "active_students": active_students.scalar(),
-        "total_units": total_units.scalar(),
-        "pending_requests": pending_requests.scalar(),
-        "total_fees_collected": float(total_collected.scalar() or 0)
-    }
\ No newline at end of file
+        "as_of": await finance_refreshed_at(redis),
+        "rows": [
+            {
+                **row._asdict(),
+                "students": int(row.students),
+                "students_owing": int(row.students_owing),
+                "billed": float(row.billed),
+                "paid": float(row.paid),
+                "outstanding": float(row.outstanding),
+            }
+            for row in rows
+        ]
+    }
+
+
+@router.post("/reports/finance/refresh")
+async def refresh_finance_reports(
+    redis=Depends(get_redis),
+    admin: User = Depends(require_admin)
+):
+    """Refresh the finance rollups now instead of waiting for the next scheduled refresh."""
+    return {"as_of": await refresh_finance_views(redis)}
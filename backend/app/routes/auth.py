@@ -1,24 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from datetime import datetime
-import secrets
+from typing import Optional
 
-from app.database import get_db
+from app.config import settings
+from app.database import get_db, get_redis, get_session_redis
 from app.models import User, Student, UserRole
 from app.schemas import (
-    UserLogin, Token, StudentCreate, UserResponse, PasswordChange
+    UserLogin, Token, StudentCreate, UserResponse, PasswordChange,
+    TokenRefresh, LogoutRequest
 )
 from app.security import (
-    verify_password, get_password_hash, create_access_token, create_refresh_token
+    verify_password, get_password_hash, decode_token, validate_token_type,
+    revoke_token, issue_token_pair, rotate_refresh_token, revoke_refresh_family,
+    RefreshTokenError
 )
-from app.dependencies import get_current_user
+from app.sessions import (
+    create_session, delete_session, invalidate_user_sessions,
+    set_session_cookie, clear_session_cookie
+)
+from app.admissions import format_student_id, student_numbers
+from app.cache import cache
+from app.write_behind import write_behind
+from app.dependencies import get_current_user, security
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
+async def _start_session(db: AsyncSession, session_redis, response: Response, user: User):
+    """Create a server-side session for user and attach its cookie."""
+    student_pk = None
+    if user.role == UserRole.STUDENT:
+        student_pk = await db.scalar(select(Student.id).where(Student.user_id == user.id))
+    session_id = await create_session(session_redis, user, str(student_pk) if student_pk else None)
+    set_session_cookie(response, session_id)
+
+
 @router.post("/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def signup(student_data: StudentCreate, db: AsyncSession = Depends(get_db)):
+async def signup(student_data: StudentCreate, db: AsyncSession = Depends(get_db), redis=Depends(get_redis)):
     """Register a new student."""
     # Check if email already exists
     result = await db.execute(select(User).where(User.email == student_data.email))
@@ -39,8 +60,8 @@ async def signup(student_data: StudentCreate, db: AsyncSession = Depends(get_db)
     db.add(user)
     await db.flush()
     
-    # Generate student ID
-    student_id = f"FT{datetime.now().year}{secrets.token_hex(3).upper()}"
+    # Allocate student ID
+    student_id = format_student_id((await student_numbers.allocate(db))[0])
     
     # Create student profile
     student = Student(
@@ -60,12 +81,19 @@ async def signup(student_data: StudentCreate, db: AsyncSession = Depends(get_db)
     db.add(student)
     await db.commit()
     await db.refresh(user)
+    await cache.invalidate(redis, "students")
     
     return user
 
 
 @router.post("/login", response_model=Token)
-async def login(credentials: UserLogin, db: AsyncSession = Depends(get_db)):
+async def login(
+    credentials: UserLogin,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    redis=Depends(get_redis),
+    session_redis=Depends(get_session_redis)
+):
     """Authenticate user and return JWT tokens."""
     # Find user by email
     result = await db.execute(select(User).where(User.email == credentials.email))
@@ -84,20 +112,60 @@ async def login(credentials: UserLogin, db: AsyncSession = Depends(get_db)):
             detail="Account is inactive"
         )
     
-    # Update last login
-    user.last_login = datetime.utcnow()
-    await db.commit()
+    # Update last login (batched off the request path)
+    write_behind.record_login(user.id)
+    write_behind.record_event("login", actor_id=user.id, entity_type="user", entity_id=user.id)
     
-    # Create tokens
+    # Server-side session transported in an HttpOnly cookie
+    if settings.session_enabled:
+        await _start_session(db, session_redis, response, user)
+    
+    # Create tokens (starts a new refresh-token family)
     token_data = {"sub": str(user.id), "role": user.role.value}
-    access_token = create_access_token(token_data)
-    refresh_token = create_refresh_token(token_data)
+    return await issue_token_pair(redis, token_data)
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh(refresh_data: TokenRefresh, redis=Depends(get_redis)):
+    """Rotate a refresh token into a new token pair."""
+    try:
+        return await rotate_refresh_token(redis, refresh_data.refresh_token)
+    except RefreshTokenError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(exc),
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@router.post("/logout")
+async def logout(
+    request: Request,
+    response: Response,
+    logout_data: Optional[LogoutRequest] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    current_user: User = Depends(get_current_user),
+    redis=Depends(get_redis),
+    session_redis=Depends(get_session_redis)
+):
+    """End the session and revoke the presented tokens."""
+    session_id = request.cookies.get(settings.session_cookie_name)
+    if session_id:
+        await delete_session(session_redis, session_id, str(current_user.id))
+        clear_session_cookie(response)
+    
+    if credentials:
+        payload = decode_token(credentials.credentials)
+        if payload:
+            await revoke_token(redis, payload)
+    
+    if logout_data and logout_data.refresh_token:
+        payload = decode_token(logout_data.refresh_token)
+        if payload and validate_token_type(payload, "refresh") and payload.get("sub") == str(current_user.id):
+            await revoke_token(redis, payload)
+            await revoke_refresh_family(redis, payload)
     
-    return {
-        "access_token": access_token,
-        "refresh_token": refresh_token,
-        "token_type": "bearer"
-    }
+    return {"message": "Logged out successfully"}
 
 
 @router.get("/me", response_model=UserResponse)
@@ -109,19 +177,29 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
 @router.post("/change-password")
 async def change_password(
     password_data: PasswordChange,
+    response: Response,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    session_redis=Depends(get_session_redis)
 ):
     """Change user password."""
+    # Session users are detached; identity map makes this free for JWT users
+    user = await db.get(User, current_user.id)
+    
     # Verify old password
-    if not verify_password(password_data.old_password, current_user.hashed_password):
+    if not verify_password(password_data.old_password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect current password"
         )
     
     # Update password
-    current_user.hashed_password = get_password_hash(password_data.new_password)
+    user.hashed_password = get_password_hash(password_data.new_password)
     await db.commit()
     
+    # Sign out every other session, keeping this browser signed in
+    await invalidate_user_sessions(session_redis, user.id)
+    if settings.session_enabled:
+        await _start_session(db, session_redis, response, user)
+    
     return {"message": "Password changed successfully"}
\ No newline at end of file
@@ -1,69 +1,136 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import HTMLResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import JSON, String, and_, cast, literal, literal_column, or_, select, func
+from sqlalchemy import Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from typing import List
 from decimal import Decimal
 
-from app.database import get_db
+from app.database import get_db, get_redis, get_session_redis, shared_session_maker
 from app.models import (
     Student, Unit, UnitRegistration, Result, 
-    FeeStructure, Payment, StudentRequest, RequestStatus
+    FeeStructure, Payment, StudentRequest, RequestStatus, RequestType, RegistrationStatus
 )
 from app.schemas import (
-    StudentResponse, StudentUpdate, StudentDashboard,
+    StudentResponse, StudentUpdate, StudentDashboard, StudentBootstrap,
     UnitResponse, UnitRegistrationCreate, UnitRegistrationResponse,
     ResultWithUnit, FeeStatement,
     StudentRequestCreate, StudentRequestResponse
 )
+from app.cache import cache
+from app.config import settings
 from app.dependencies import get_current_student
+from app.documents import documents
+from app.graduation import evaluate_graduation_requests
+from app.partitions import current_academic_year
+from app.prerequisites import prerequisite_graph
+from app.sessions import forget_session_students
 
 router = APIRouter(prefix="/student", tags=["Student"])
 
 
-@router.get("/dashboard", response_model=StudentDashboard)
-async def get_dashboard(
-    student: Student = Depends(get_current_student),
-    db: AsyncSession = Depends(get_db)
-):
-    """Get student dashboard data."""
-    # Get registered units count (current semester)
-    registered_result = await db.execute(
-        select(func.count(UnitRegistration.id))
-        .where(UnitRegistration.student_id == student.id)
-        .where(UnitRegistration.status == "registered")
+def _current_units(student: Student) -> tuple:
+    # REGISTERED this academic year; the year and archived filters keep it to one hot partition
+    return (
+        UnitRegistration.student_id == student.id,
+        UnitRegistration.status == RegistrationStatus.REGISTERED,
+        UnitRegistration.academic_year == current_academic_year(),
+        UnitRegistration.archived.is_(False),
     )
-    registered_count = registered_result.scalar()
-    
-    # Get attempted units count (all time)
-    attempted_result = await db.execute(
+
+
+def _summary(student: Student) -> list:
+    return [
+        select(func.count(UnitRegistration.id))
+        .where(*_current_units(student))
+        .scalar_subquery().label("registered"),
         select(func.count(UnitRegistration.id))
         .where(UnitRegistration.student_id == student.id)
-    )
-    attempted_count = attempted_result.scalar()
-    
-    # Get fee information
-    fees_result = await db.execute(
+        .scalar_subquery().label("attempted"),
         select(func.sum(FeeStructure.amount))
         .where(FeeStructure.student_id == student.id)
-    )
-    total_billed = fees_result.scalar() or Decimal(0)
-    
-    payments_result = await db.execute(
+        .scalar_subquery().label("billed"),
         select(func.sum(Payment.amount))
         .where(Payment.student_id == student.id)
-    )
-    total_paid = payments_result.scalar() or Decimal(0)
+        .scalar_subquery().label("paid"),
+    ]
+
+
+def _dashboard(row, student: Student) -> dict:
+    total_billed = row.billed or Decimal(0)
+    total_paid = row.paid or Decimal(0)
     
     return {
         "student_info": student,
-        "registered_units_count": registered_count,
-        "attempted_units_count": attempted_count,
+        "registered_units_count": row.registered,
+        "attempted_units_count": row.attempted,
         "total_billed": float(total_billed),
         "total_paid": float(total_paid),
         "fee_balance": float(total_billed - total_paid)
     }
 
 
+def _json_object(model, schema, **nested):
+    """A JSON object of ``model``'s columns named by ``schema``'s fields, plus ``nested`` objects."""
+    pairs = []
+    for name in schema.model_fields:
+        if name in nested:
+            value = nested[name]
+        elif isinstance(getattr(model, name).type, SQLEnum):
+            # Stored by member name; the API speaks values, which are the lower-cased names
+            value = func.lower(cast(getattr(model, name), String))
+        else:
+            value = getattr(model, name)
+        pairs += [literal(name), value]
+    return func.json_build_object(*pairs)
+
+
+def _json_list(element, *order_by):
+    """``element`` aggregated into a JSON array, ``[]`` when there are no rows."""
+    return func.coalesce(
+        func.json_agg(aggregate_order_by(element, *order_by)), literal_column("'[]'::json"), type_=JSON
+    )
+
+
+@router.get("/dashboard", response_model=StudentDashboard)
+async def get_dashboard(
+    student: Student = Depends(get_current_student),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get student dashboard data."""
+    # Four independent aggregates in one round trip
+    row = (await db.execute(select(*_summary(student)))).one()
+    return _dashboard(row, student)
+
+
+@router.get("/bootstrap", response_model=StudentBootstrap)
+async def get_bootstrap(
+    student: Student = Depends(get_current_student),
+    db: AsyncSession = Depends(get_db)
+):
+    """Dashboard, current units and requests in one response, for the home page's first paint."""
+    # The aggregates and both lists are one statement: one round trip on the request's connection
+    current_units = (
+        select(_json_list(
+            _json_object(UnitRegistration, UnitRegistrationResponse, unit=_json_object(Unit, UnitResponse)),
+            UnitRegistration.registration_date.desc(),
+        ))
+        .join(Unit, Unit.id == UnitRegistration.unit_id)
+        .where(*_current_units(student))
+    )
+    requests = (
+        select(_json_list(_json_object(StudentRequest, StudentRequestResponse), StudentRequest.request_date.desc()))
+        .where(StudentRequest.student_id == student.id)
+    )
+    row = (await db.execute(select(
+        *_summary(student),
+        current_units.scalar_subquery().label("current_units"),
+        requests.scalar_subquery().label("requests"),
+    ))).one()
+    return {"dashboard": _dashboard(row, student), "current_units": row.current_units, "requests": row.requests}
+
+
 @router.get("/profile", response_model=StudentResponse)
 async def get_profile(student: Student = Depends(get_current_student)):
     """Get student personal information."""
@@ -74,7 +141,8 @@ async def get_profile(student: Student = Depends(get_current_student)):
 async def update_profile(
     update_data: StudentUpdate,
     student: Student = Depends(get_current_student),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    session_redis=Depends(get_session_redis)
 ):
     """Update student personal information."""
     update_dict = update_data.dict(exclude_unset=True)
@@ -84,17 +152,24 @@ async def update_profile(
     
     await db.commit()
     await db.refresh(student)
+    if settings.session_enabled:
+        await forget_session_students(session_redis, student.user_id)
     return student
 
 
 @router.get("/units/available", response_model=List[UnitResponse])
-async def get_available_units(db: AsyncSession = Depends(get_db)):
+async def get_available_units(redis=Depends(get_redis)):
     """Get all available units for registration."""
-    result = await db.execute(
-        select(Unit).where(Unit.is_active == "active")
+    async def load():
+        async with shared_session_maker() as session:
+            result = await session.execute(
+                select(Unit).where(Unit.is_active.is_(True))
+            )
+            return result.scalars().all()
+
+    return await cache.get_or_load(
+        redis, "units:available", load, List[UnitResponse], tags=("units",), coalesce=True
     )
-    units = result.scalars().all()
-    return units
 
 
 @router.get("/units/registered", response_model=List[UnitRegistrationResponse])
@@ -116,9 +191,13 @@ async def get_registered_units(
 async def register_unit(
     registration_data: UnitRegistrationCreate,
     student: Student = Depends(get_current_student),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    redis=Depends(get_redis)
 ):
     """Register for a unit."""
+    # Needs only the unit id, so the (cached) lookup runs before this handler's queries
+    required = await prerequisite_graph.required_for(redis, registration_data.unit_id)
+
     # Check if unit exists
     unit_result = await db.execute(
         select(Unit).where(Unit.id == registration_data.unit_id)
@@ -130,18 +209,37 @@ async def register_unit(
             detail="Unit not found"
         )
     
-    # Check if already registered
-    existing = await db.execute(
-        select(UnitRegistration)
+    # One query finds both a duplicate registration and the completed prerequisites
+    taken = await db.execute(
+        select(UnitRegistration.unit_id, Result.marks)
+        .outerjoin(Result, and_(Result.registration_id == UnitRegistration.id,
+                                Result.academic_year == UnitRegistration.academic_year,
+                                Result.is_published == "published"))
         .where(UnitRegistration.student_id == student.id)
-        .where(UnitRegistration.unit_id == registration_data.unit_id)
-        .where(UnitRegistration.academic_year == registration_data.academic_year)
-        .where(UnitRegistration.semester == registration_data.semester)
+        .where(or_(
+            and_(UnitRegistration.unit_id == registration_data.unit_id,
+                 UnitRegistration.academic_year == registration_data.academic_year,
+                 UnitRegistration.semester == registration_data.semester,
+                 UnitRegistration.archived.is_(False)),
+            and_(UnitRegistration.unit_id.in_(list(required)),
+                 UnitRegistration.status == RegistrationStatus.COMPLETED),
+        ))
     )
-    if existing.scalar_one_or_none():
+    completed = set()
+    for unit_id, marks in taken:
+        if unit_id == registration_data.unit_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Already registered for this unit"
+            )
+        if marks is not None and marks >= settings.result_pass_mark:
+            completed.add(unit_id)
+    
+    missing = required - completed
+    if missing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Already registered for this unit"
+            detail=f"Prerequisites not completed: {', '.join(prerequisite_graph.codes(missing))}"
         )
     
     # Create registration
@@ -208,11 +306,34 @@ async def get_fee_statement(
     }
 
 
+@router.get("/documents/fee-statement", response_class=HTMLResponse)
+async def get_fee_statement_document(
+    request: Request,
+    student: Student = Depends(get_current_student),
+    db: AsyncSession = Depends(get_db),
+    redis=Depends(get_redis)
+):
+    """Printable fee statement."""
+    return await documents.respond(request, db, redis, "fee-statement", student)
+
+
+@router.get("/documents/result-slip", response_class=HTMLResponse)
+async def get_result_slip_document(
+    request: Request,
+    student: Student = Depends(get_current_student),
+    db: AsyncSession = Depends(get_db),
+    redis=Depends(get_redis)
+):
+    """Printable provisional result slip."""
+    return await documents.respond(request, db, redis, "result-slip", student)
+
+
 @router.post("/requests", response_model=StudentRequestResponse, status_code=status.HTTP_201_CREATED)
 async def create_request(
     request_data: StudentRequestCreate,
     student: Student = Depends(get_current_student),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    redis=Depends(get_redis)
 ):
     """Create graduation or clearance request."""
     # Check for pending request of same type
@@ -235,7 +356,11 @@ async def create_request(
     )
     db.add(request)
     await db.commit()
+    if request.request_type == RequestType.GRADUATION:
+        # Arrives with its verdict; the admin's bulk evaluation refreshes it later
+        await evaluate_graduation_requests(db, [request.id])
     await db.refresh(request)
+    await cache.invalidate(redis, "requests")
     return request
 
 
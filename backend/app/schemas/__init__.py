@@ -1,13 +1,14 @@
 from app.schemas.auth import (
-    UserCreate, UserLogin, UserResponse, Token, TokenPayload, PasswordChange
+    UserCreate, UserLogin, UserResponse, Token, TokenPayload, PasswordChange,
+    TokenRefresh, LogoutRequest
 )
 from app.schemas.student import (
-    StudentCreate, StudentUpdate, StudentResponse, StudentDashboard
+    StudentCreate, StudentAdmission, StudentUpdate, StudentResponse, StudentDashboard, StudentBootstrap
 )
 from app.schemas.unit import (
-    UnitCreate, UnitUpdate, UnitResponse,
+    UnitCreate, UnitUpdate, UnitResponse, UnitPrerequisitesUpdate, UnitPrerequisitesResponse,
     UnitRegistrationCreate, UnitRegistrationResponse,
-    ResultCreate, ResultUpdate, ResultResponse, ResultWithUnit
+    ResultCreate, ResultUpdate, ResultPublish, ResultResponse, ResultWithUnit
 )
 from app.schemas.fee import (
     FeeStructureCreate, FeeStructureResponse,
@@ -16,14 +17,23 @@ from app.schemas.fee import (
 from app.schemas.request import (
     StudentRequestCreate, StudentRequestUpdate, StudentRequestResponse
 )
+from app.schemas.grading import (
+    GradeBandBase, GradingSchemeCreate, GradingSchemeUpdate, GradingSchemeResponse, RegradeRequest
+)
+from app.schemas.program import (
+    ProgramRequirementCreate, ProgramRequirementUpdate, ProgramRequirementResponse
+)
 
 __all__ = [
     "UserCreate", "UserLogin", "UserResponse", "Token", "TokenPayload", "PasswordChange",
-    "StudentCreate", "StudentUpdate", "StudentResponse", "StudentDashboard",
-    "UnitCreate", "UnitUpdate", "UnitResponse",
+    "TokenRefresh", "LogoutRequest",
+    "StudentCreate", "StudentAdmission", "StudentUpdate", "StudentResponse", "StudentDashboard", "StudentBootstrap",
+    "UnitCreate", "UnitUpdate", "UnitResponse", "UnitPrerequisitesUpdate", "UnitPrerequisitesResponse",
     "UnitRegistrationCreate", "UnitRegistrationResponse",
-    "ResultCreate", "ResultUpdate", "ResultResponse", "ResultWithUnit",
+    "ResultCreate", "ResultUpdate", "ResultPublish", "ResultResponse", "ResultWithUnit",
     "FeeStructureCreate", "FeeStructureResponse",
     "PaymentCreate", "PaymentResponse", "FeeStatement",
     "StudentRequestCreate", "StudentRequestUpdate", "StudentRequestResponse",
+    "GradeBandBase", "GradingSchemeCreate", "GradingSchemeUpdate", "GradingSchemeResponse", "RegradeRequest",
+    "ProgramRequirementCreate", "ProgramRequirementUpdate", "ProgramRequirementResponse",
 ]
\ No newline at end of file
@@ -50,6 +50,15 @@ class TokenPayload(BaseModel):
     role: str
     exp: int
     type: str  # access or refresh
+    jti: Optional[str] = None
+
+
+class TokenRefresh(BaseModel):
+    refresh_token: str
+
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
 
 
 class PasswordChange(BaseModel):
@@ -0,0 +1,62 @@
+from pydantic import BaseModel, Field, validator
+from typing import List, Optional
+from uuid import UUID
+from datetime import datetime
+from decimal import Decimal
+from app.models.unit import Semester
+
+
+class GradeBandBase(BaseModel):
+    grade: str = Field(..., min_length=1, max_length=2)
+    min_marks: Decimal = Field(..., ge=0, le=100)
+
+
+def _check_bands(bands: List[GradeBandBase]) -> List[GradeBandBase]:
+    if len({band.grade for band in bands}) != len(bands):
+        raise ValueError("Each grade may appear only once")
+    if len({band.min_marks for band in bands}) != len(bands):
+        raise ValueError("Each band needs a distinct minimum mark")
+    if min(band.min_marks for band in bands) != 0:
+        raise ValueError("The lowest band must start at 0 so every mark gets a grade")
+    return sorted(bands, key=lambda band: band.min_marks, reverse=True)
+
+
+class GradingSchemeCreate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100)
+    program: Optional[str] = Field(None, max_length=100)  # omit for the default scheme
+    bands: List[GradeBandBase] = Field(..., min_length=1)
+
+    @validator('bands')
+    def validate_bands(cls, v):
+        return _check_bands(v)
+
+
+class GradingSchemeUpdate(BaseModel):
+    name: Optional[str] = Field(None, min_length=1, max_length=100)
+    bands: Optional[List[GradeBandBase]] = Field(None, min_length=1)
+
+    @validator('bands')
+    def validate_bands(cls, v):
+        return _check_bands(v) if v is not None else v
+
+
+class GradeBandResponse(GradeBandBase):
+    class Config:
+        from_attributes = True
+
+
+class GradingSchemeResponse(BaseModel):
+    id: UUID
+    name: str
+    program: Optional[str]
+    bands: List[GradeBandResponse]
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class RegradeRequest(BaseModel):
+    academic_year: str = Field(..., pattern=r"^\d{4}-\d{4}$")
+    semester: Semester
+    program: Optional[str] = Field(None, max_length=100)  # all programs when omitted
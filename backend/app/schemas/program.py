@@ -0,0 +1,42 @@
+from pydantic import BaseModel, Field, validator
+from typing import List, Optional
+from uuid import UUID
+from datetime import datetime
+from app.schemas.unit import UnitResponse
+
+
+def _check_unit_codes(codes: List[str]) -> List[str]:
+    codes = [code.strip() for code in codes]
+    if len(set(codes)) != len(codes):
+        raise ValueError("Each required unit may appear only once")
+    return codes
+
+
+class ProgramRequirementCreate(BaseModel):
+    program: str = Field(..., min_length=1, max_length=100)
+    min_credits: int = Field(..., ge=0)
+    required_units: List[str] = Field(default_factory=list)  # unit codes
+
+    @validator('required_units')
+    def validate_required_units(cls, v):
+        return _check_unit_codes(v)
+
+
+class ProgramRequirementUpdate(BaseModel):
+    min_credits: Optional[int] = Field(None, ge=0)
+    required_units: Optional[List[str]] = None
+
+    @validator('required_units')
+    def validate_required_units(cls, v):
+        return _check_unit_codes(v) if v is not None else v
+
+
+class ProgramRequirementResponse(BaseModel):
+    id: UUID
+    program: str
+    min_credits: int
+    required_units: List[UnitResponse]
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
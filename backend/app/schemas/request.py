@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
 from app.models.request import RequestType, RequestStatus
@@ -26,6 +26,9 @@ class StudentRequestResponse(StudentRequestBase):
     request_date: datetime
     processed_at: Optional[datetime]
     admin_remarks: Optional[str]
+    eligibility: Optional[str] = None  # graduation requests: eligible, ineligible or review
+    eligibility_reasons: Optional[List[str]] = None
+    evaluated_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
\ No newline at end of file
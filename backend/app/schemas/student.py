@@ -1,8 +1,10 @@
 from pydantic import BaseModel, Field, EmailStr
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 from datetime import date, datetime
 from app.models.student import Gender
+from app.schemas.request import StudentRequestResponse
+from app.schemas.unit import UnitRegistrationResponse
 
 
 class StudentBase(BaseModel):
@@ -22,6 +24,12 @@ class StudentCreate(StudentBase):
     password: str = Field(..., min_length=8)
 
 
+class StudentAdmission(StudentBase):
+    """One row of a bulk admission CSV; a password is generated when left blank."""
+    email: EmailStr
+    password: Optional[str] = Field(None, min_length=8)
+
+
 class StudentUpdate(BaseModel):
     first_name: Optional[str] = Field(None, min_length=1, max_length=100)
     middle_name: Optional[str] = Field(None, max_length=100)
@@ -52,4 +60,11 @@ class StudentDashboard(BaseModel):
     fee_balance: float
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class StudentBootstrap(BaseModel):
+    """Everything the student home page needs for first paint."""
+    dashboard: StudentDashboard
+    current_units: List[UnitRegistrationResponse]
+    requests: List[StudentRequestResponse]
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
 from app.models.unit import Semester, RegistrationStatus
@@ -21,18 +21,28 @@ class UnitUpdate(BaseModel):
     unit_name: Optional[str] = Field(None, min_length=1, max_length=200)
     credits: Optional[int] = Field(None, ge=1, le=6)
     description: Optional[str] = Field(None, max_length=500)
-    is_active: Optional[str] = None
+    is_active: Optional[bool] = None
 
 
 class UnitResponse(UnitBase):
     id: UUID
-    is_active: str
+    is_active: bool
     created_at: datetime
     
     class Config:
         from_attributes = True
 
 
+class UnitPrerequisitesUpdate(BaseModel):
+    prerequisites: List[UUID]  # direct prerequisites; replaces the current ones
+
+
+class UnitPrerequisitesResponse(BaseModel):
+    unit_id: UUID
+    prerequisites: List[UnitResponse]  # direct
+    required: List[UnitResponse]  # direct and indirect, all needed to register
+
+
 class UnitRegistrationCreate(BaseModel):
     unit_id: UUID
     semester: Semester
@@ -67,6 +77,12 @@ class ResultUpdate(ResultBase):
     is_published: Optional[str] = None
 
 
+class ResultPublish(BaseModel):
+    academic_year: str = Field(..., pattern=r"^\d{4}-\d{4}$")
+    semester: Semester
+    unit_id: Optional[UUID] = None  # all units when omitted
+
+
 class ResultResponse(ResultBase):
     id: UUID
     registration_id: UUID
@@ -1,9 +1,18 @@
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Set, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.config import settings
+import asyncio
+import hashlib
+import heapq
 import re
+import time
+import uuid
+import structlog
+
+logger = structlog.get_logger()
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -19,6 +28,11 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def hash_passwords(passwords: List[str]) -> List[str]:
+    """Hash a batch of passwords; runs in a worker process for bulk admissions."""
+    return [pwd_context.hash(password) for password in passwords]
+
+
 def validate_password_strength(password: str) -> tuple[bool, Optional[str]]:
     """
     Validate password against security policy.
@@ -49,6 +63,7 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
         expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
     
     to_encode.update({"exp": expire, "type": "access"})
+    to_encode.setdefault("jti", uuid.uuid4().hex)
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
@@ -58,6 +73,7 @@ def create_refresh_token(data: Dict[str, Any]) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days)
     to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.setdefault("jti", uuid.uuid4().hex)
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
@@ -73,4 +89,264 @@ def decode_token(token: str) -> Optional[Dict[str, Any]]:
 
 def validate_token_type(payload: Dict[str, Any], expected_type: str) -> bool:
     """Validate that token is of expected type (access or refresh)."""
-    return payload.get("type") == expected_type
\ No newline at end of file
+    return payload.get("type") == expected_type
+
+
+# ============ Verified Token Cache ============
+class TokenCache:
+    """Bounded LRU of verified token digests to payloads.
+
+    Entries expire with the token's own ``exp`` claim. Revoked ``jti``s
+    are remembered until they expire so a revoked token is never
+    re-admitted from a stale lookup. Entries are indexed by ``jti``, so a
+    revocation only touches the tokens it names.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[bytes, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._by_jti: Dict[str, Set[bytes]] = {}
+        self._revoked: Dict[str, float] = {}
+        # (expires_at, jti) min-heap so expired revocations are dropped oldest first
+        self._revoked_expiry: List[Tuple[float, str]] = []
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def _forget(self, key: bytes):
+        payload, _ = self._entries.pop(key)
+        keys = self._by_jti.get(payload.get("jti"))
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_jti[payload.get("jti")]
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        key = self.digest(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        payload, expires_at = entry
+        if expires_at <= time.time():
+            self._forget(key)
+            return None
+        self._entries.move_to_end(key)
+        return payload
+
+    def put(self, token: str, payload: Dict[str, Any]):
+        jti = payload.get("jti")
+        if self.maxsize <= 0 or jti in self._revoked:
+            return
+        key = self.digest(token)
+        if key in self._entries:
+            self._forget(key)
+        self._entries[key] = (payload, float(payload.get("exp", 0)))
+        if jti is not None:
+            self._by_jti.setdefault(jti, set()).add(key)
+        if len(self._entries) > self.maxsize:
+            self._forget(next(iter(self._entries)))
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        return jti is not None and jti in self._revoked
+
+    def revoke(self, jti: str, expires_at: float):
+        """Forget every cached token carrying ``jti`` and remember the revocation."""
+        now = time.time()
+        while self._revoked_expiry and self._revoked_expiry[0][0] <= now:
+            expired, expired_jti = heapq.heappop(self._revoked_expiry)
+            # Skip heap entries superseded by a later revocation of the same jti
+            if self._revoked.get(expired_jti) == expired:
+                del self._revoked[expired_jti]
+        self._revoked[jti] = expires_at
+        heapq.heappush(self._revoked_expiry, (expires_at, jti))
+        for key in self._by_jti.pop(jti, ()):
+            del self._entries[key]
+
+    def clear(self):
+        self._entries.clear()
+        self._by_jti.clear()
+        self._revoked.clear()
+        self._revoked_expiry.clear()
+
+
+token_cache = TokenCache(settings.token_cache_size)
+
+REVOKED_TOKENS_KEY = "auth:revoked_tokens"
+REVOCATION_CHANNEL = "auth:revocations"
+
+
+async def is_token_revoked(redis, payload: Dict[str, Any]) -> bool:
+    """Check the shared revocation set; tokens issued without a jti cannot be revoked."""
+    jti = payload.get("jti")
+    if jti is None:
+        return False
+    if token_cache.is_revoked(jti):
+        return True
+    return await redis.zscore(REVOKED_TOKENS_KEY, jti) is not None
+
+
+async def verify_token(token: str, redis) -> Optional[Dict[str, Any]]:
+    """Decode a token, serving repeat presentations from the verified cache.
+
+    Redis is only consulted on a cache miss; revocations reach cached
+    entries through the pub/sub listener instead.
+    """
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+
+    payload = decode_token(token)
+    if payload is None or await is_token_revoked(redis, payload):
+        return None
+
+    token_cache.put(token, payload)
+    return payload
+
+
+async def revoke_token(redis, payload: Dict[str, Any]):
+    """Revoke a token until it expires and tell every worker to drop it."""
+    jti = payload.get("jti")
+    if jti is None:
+        return
+    expires_at = float(payload.get("exp", time.time()))
+    token_cache.revoke(jti, expires_at)
+
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.zadd(REVOKED_TOKENS_KEY, {jti: expires_at})
+        pipe.zremrangebyscore(REVOKED_TOKENS_KEY, "-inf", time.time())
+        pipe.publish(REVOCATION_CHANNEL, f"{jti}:{expires_at}")
+        await pipe.execute()
+
+
+async def listen_for_revocations(redis):
+    """Apply revocations published by other workers to the local cache."""
+    while True:
+        try:
+            async with redis.pubsub() as pubsub:
+                await pubsub.subscribe(REVOCATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    jti, _, expires_at = message["data"].partition(":")
+                    token_cache.revoke(jti, float(expires_at or 0))
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            # Revocations may have been missed while disconnected
+            logger.warning("Token revocation listener disconnected", error=str(exc))
+            token_cache.clear()
+            await asyncio.sleep(1)
+
+
+# ============ Refresh Token Rotation ============
+REFRESH_FAMILY_KEY = "auth:refresh_family:{}"
+
+# Compare-and-swap of a family's current refresh jti. The jti it replaced
+# stays acceptable for refresh_reuse_grace_seconds and gets back the pair
+# already issued for it, so tabs sharing one stored refresh token can
+# refresh at the same moment. Presenting any other jti of the family means
+# a rotated token was replayed: the family is deleted and its latest
+# access token returned so it can be revoked.
+ROTATE_REFRESH_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], 'refresh')
+if not current then
+    return {'missing'}
+end
+if current ~= ARGV[1] then
+    local previous = redis.call('HMGET', KEYS[1], 'previous', 'previous_until')
+    if previous[1] == ARGV[1] and tonumber(previous[2]) >= tonumber(ARGV[6]) then
+        local issued = redis.call('HMGET', KEYS[1], 'access', 'access_exp', 'refresh', 'refresh_exp')
+        return {'raced', issued[1], issued[2], issued[3], issued[4]}
+    end
+    local access = redis.call('HMGET', KEYS[1], 'access', 'access_exp')
+    redis.call('DEL', KEYS[1])
+    return {'reused', access[1] or '', access[2] or ''}
+end
+redis.call('HSET', KEYS[1], 'refresh', ARGV[2], 'refresh_exp', ARGV[7], 'access', ARGV[3], 'access_exp', ARGV[4],
+           'previous', ARGV[1], 'previous_until', tonumber(ARGV[6]) + tonumber(ARGV[8]))
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+return {'rotated'}
+"""
+
+
+class RefreshTokenError(Exception):
+    """Raised when a refresh token cannot be rotated."""
+
+
+def _encode_pair(access_claims: Dict[str, Any], refresh_claims: Dict[str, Any]) -> Dict[str, str]:
+    return {
+        "access_token": jwt.encode({**access_claims, "type": "access"}, settings.secret_key,
+                                   algorithm=settings.algorithm),
+        "refresh_token": jwt.encode({**refresh_claims, "type": "refresh"}, settings.secret_key,
+                                    algorithm=settings.algorithm),
+        "token_type": "bearer",
+    }
+
+
+def _token_pair(subject: Dict[str, Any], family: str) -> Tuple[Dict[str, str], Dict[str, Any], Dict[str, Any]]:
+    now = int(time.time())
+    access_claims = {**subject, "jti": uuid.uuid4().hex, "exp": now + settings.access_token_expire_minutes * 60}
+    refresh_claims = {
+        **subject, "jti": uuid.uuid4().hex, "fam": family, "exp": now + settings.refresh_token_expire_days * 86400
+    }
+    return _encode_pair(access_claims, refresh_claims), access_claims, refresh_claims
+
+
+async def issue_token_pair(redis, subject: Dict[str, Any]) -> Dict[str, str]:
+    """Create tokens for a new login, starting a new refresh-token family."""
+    family = uuid.uuid4().hex
+    tokens, access_claims, refresh_claims = _token_pair(subject, family)
+    key = REFRESH_FAMILY_KEY.format(family)
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.hset(key, mapping={
+            "refresh": refresh_claims["jti"],
+            "refresh_exp": refresh_claims["exp"],
+            "access": access_claims["jti"],
+            "access_exp": access_claims["exp"],
+        })
+        pipe.expire(key, settings.refresh_token_expire_days * 86400)
+        await pipe.execute()
+    return tokens
+
+
+async def rotate_refresh_token(redis, refresh_token: str) -> Dict[str, str]:
+    """Exchange a refresh token for a new pair without touching the database."""
+    payload = decode_token(refresh_token)
+    if payload is None or not validate_token_type(payload, "refresh") or "fam" not in payload:
+        raise RefreshTokenError("Invalid refresh token")
+    if await is_token_revoked(redis, payload):
+        raise RefreshTokenError("Refresh token has been revoked")
+
+    subject = {"sub": payload["sub"], "role": payload.get("role")}
+    tokens, access_claims, refresh_claims = _token_pair(subject, payload["fam"])
+    outcome = await redis.eval(
+        ROTATE_REFRESH_SCRIPT, 1, REFRESH_FAMILY_KEY.format(payload["fam"]),
+        payload["jti"], refresh_claims["jti"], access_claims["jti"], access_claims["exp"],
+        settings.refresh_token_expire_days * 86400,
+        time.time(), refresh_claims["exp"], settings.refresh_reuse_grace_seconds,
+    )
+
+    if outcome[0] == "raced":
+        # Another tab refreshed with this token a moment ago; hand back the same pair
+        _, access_jti, access_exp, refresh_jti, refresh_exp = outcome
+        return _encode_pair(
+            {**subject, "jti": access_jti, "exp": int(float(access_exp))},
+            {**subject, "jti": refresh_jti, "fam": payload["fam"], "exp": int(float(refresh_exp))},
+        )
+    if outcome[0] == "reused":
+        _, access_jti, access_exp = outcome
+        logger.warning("Refresh token reuse detected", user_id=payload["sub"], family=payload["fam"])
+        if access_jti:
+            await revoke_token(redis, {"jti": access_jti, "exp": float(access_exp or 0)})
+        raise RefreshTokenError("Refresh token reuse detected; session revoked")
+    if outcome[0] != "rotated":
+        raise RefreshTokenError("Session has expired or was revoked")
+    return tokens
+
+
+async def revoke_refresh_family(redis, payload: Dict[str, Any]):
+    """End a session: later refreshes of any token in the family fail."""
+    family = payload.get("fam")
+    if family:
+        await redis.delete(REFRESH_FAMILY_KEY.format(family))
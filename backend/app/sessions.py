@@ -0,0 +1,208 @@
+"""
+Server-side sessions stored in the Redis session DB.
+
+A session is a compact JSON record under ``session:<sha256(id)>`` with a
+sliding TTL of ``session_max_age``, and is refused once it is older than
+``session_absolute_max_age`` however active it has been. Each user also
+has a ``user_sessions:<user_id>`` set so every session of a user can be
+invalidated at once: on password change, and when rollover suspends or
+graduates a student. Anything else that deactivates a user must call
+``invalidate_user_sessions`` too, since records carry the ``active`` flag
+from login.
+
+A student's session also keeps a copy of their ``students`` row under
+``session:<sha256(id)>:student``, read in the same round trip as the
+record, so student pages need no database lookup to authenticate. The
+copy is written on the first request that misses it and lives for
+``cache_default_ttl``. ``forget_session_students`` drops a user's copies
+when their row changes.
+"""
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Tuple
+import hashlib
+import json
+import secrets
+import time
+import uuid
+
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.config import settings
+from app.models import Gender, Student, User, UserRole
+
+SESSION_KEY = "session:{}"
+SESSION_STUDENT_KEY = "{}:student"
+USER_SESSIONS_KEY = "user_sessions:{}"
+
+
+def _session_key(session_id: str) -> str:
+    # Only a digest is stored, so a Redis dump does not leak live cookies
+    return SESSION_KEY.format(hashlib.sha256(session_id.encode()).hexdigest())
+
+
+def _student_key(key: str) -> str:
+    return SESSION_STUDENT_KEY.format(key)
+
+
+def _dump(user: User, student_id: Optional[str]) -> str:
+    return json.dumps({
+        "id": str(user.id),
+        "email": user.email,
+        "role": user.role.value,
+        "active": user.is_active,
+        "verified": user.is_verified,
+        "created": user.created_at.isoformat(),
+        "login": user.last_login.isoformat() if user.last_login else None,
+        "student": student_id,
+        "issued": int(time.time()),
+    }, separators=(",", ":"))
+
+
+async def create_session(redis, user: User, student_id: Optional[str] = None) -> str:
+    """Store a session for ``user`` and return the opaque cookie value."""
+    session_id = secrets.token_urlsafe(32)
+    key = _session_key(session_id)
+    index = USER_SESSIONS_KEY.format(user.id)
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.set(key, _dump(user, student_id), ex=settings.session_max_age)
+        pipe.sadd(index, key)
+        # The index only needs to outlive the newest session
+        pipe.expire(index, settings.session_max_age, gt=True)
+        pipe.expire(index, settings.session_max_age, nx=True)
+        await pipe.execute()
+    return session_id
+
+
+def _dump_student(student: Student) -> str:
+    return json.dumps({
+        "id": str(student.id),
+        "user_id": str(student.user_id),
+        "student_id": student.student_id,
+        "first_name": student.first_name,
+        "middle_name": student.middle_name,
+        "last_name": student.last_name,
+        "gender": student.gender.value,
+        "date_of_birth": student.date_of_birth.isoformat(),
+        "phone_number": student.phone_number,
+        "city": student.city,
+        "address": student.address,
+        "enrollment_date": student.enrollment_date.isoformat(),
+        "program": student.program,
+        "is_graduated": student.is_graduated,
+        "created_at": student.created_at.isoformat(),
+        "updated_at": student.updated_at.isoformat(),
+    }, separators=(",", ":"))
+
+
+async def load_session(
+    redis,
+    session_id: str,
+) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """Read a session, slide its expiry, and read its copy of the student row, in one round trip."""
+    key = _session_key(session_id)
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.getex(key, ex=settings.session_max_age)
+        pipe.get(_student_key(key))
+        raw, student = await pipe.execute()
+    if not raw:
+        return None, None
+    record = json.loads(raw)
+    # Sliding keeps an active session alive, but never past its absolute age
+    if record.get("issued", 0) + settings.session_absolute_max_age <= time.time():
+        await redis.delete(key, _student_key(key))
+        return None, None
+    return record, json.loads(student) if student else None
+
+
+async def cache_session_student(redis, session_id: str, student: Student):
+    """Keep a copy of ``student`` with the session for ``load_session`` to return."""
+    key = _student_key(_session_key(session_id))
+    await redis.set(key, _dump_student(student), ex=int(settings.cache_default_ttl))
+
+
+async def forget_session_students(redis, user_id) -> int:
+    """Drop the student row copies of every session of ``user_id``, after that row changed."""
+    keys = await redis.smembers(USER_SESSIONS_KEY.format(user_id))
+    if not keys:
+        return 0
+    return await redis.delete(*(_student_key(key) for key in keys))
+
+
+async def delete_session(redis, session_id: str, user_id: Optional[str] = None):
+    key = _session_key(session_id)
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.delete(key, _student_key(key))
+        if user_id:
+            pipe.srem(USER_SESSIONS_KEY.format(user_id), key)
+        await pipe.execute()
+
+
+async def invalidate_user_sessions(redis, *user_ids) -> int:
+    """Delete every session belonging to ``user_ids``; returns how many existed."""
+    indexes = [USER_SESSIONS_KEY.format(user_id) for user_id in user_ids]
+    if not indexes:
+        return 0
+    async with redis.pipeline(transaction=False) as pipe:
+        for index in indexes:
+            pipe.smembers(index)
+        members = await pipe.execute()
+    keys = [key for found in members for key in found]
+    if not keys:
+        return 0
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.delete(*keys)
+        pipe.delete(*indexes, *(_student_key(key) for key in keys))
+        deleted, _ = await pipe.execute()
+    return deleted
+
+
+def session_user(record: Dict[str, Any]) -> User:
+    """A detached User built from the session record (no database round trip)."""
+    return User(
+        id=uuid.UUID(record["id"]),
+        email=record["email"],
+        role=UserRole(record["role"]),
+        is_active=record["active"],
+        is_verified=record["verified"],
+        created_at=datetime.fromisoformat(record["created"]),
+        last_login=datetime.fromisoformat(record["login"]) if record["login"] else None,
+    )
+
+
+def session_student(row: Dict[str, Any]) -> Student:
+    """A detached Student built from a session's copy; ``session.add`` it to use it like a loaded row."""
+    student = Student(
+        id=uuid.UUID(row["id"]),
+        user_id=uuid.UUID(row["user_id"]),
+        student_id=row["student_id"],
+        first_name=row["first_name"],
+        middle_name=row["middle_name"],
+        last_name=row["last_name"],
+        gender=Gender(row["gender"]),
+        date_of_birth=date.fromisoformat(row["date_of_birth"]),
+        phone_number=row["phone_number"],
+        city=row["city"],
+        address=row["address"],
+        enrollment_date=date.fromisoformat(row["enrollment_date"]),
+        program=row["program"],
+        is_graduated=row["is_graduated"],
+        created_at=datetime.fromisoformat(row["created_at"]),
+        updated_at=datetime.fromisoformat(row["updated_at"]),
+    )
+    make_transient_to_detached(student)
+    return student
+
+
+def set_session_cookie(response, session_id: str):
+    # No Max-Age: the server-side TTL slides, the browser keeps it for the visit
+    response.set_cookie(
+        settings.session_cookie_name,
+        session_id,
+        httponly=True,
+        secure=not settings.debug,
+        samesite="lax",
+    )
+
+
+def clear_session_cookie(response):
+    response.delete_cookie(settings.session_cookie_name)
@@ -0,0 +1,265 @@
+"""
+Slow-query log.
+
+Every statement on ``engine`` and ``shared_engine`` is timed with cursor-execute hooks. One that
+takes ``slow_query_ms`` or longer is logged with its parameter types (not
+values) and the route that issued it, and folded into a per-worker
+buffer keyed by its normalized text. A background task merges the
+buffer into Redis, where ``top_slow_queries()`` ranks statements by
+total time across all workers.
+
+A statement that keeps coming back slow (``slow_query_explain_after``
+times) gets one ``EXPLAIN (ANALYZE, BUFFERS)`` run in the background
+with the parameters of its slowest execution, and the plan is kept next
+to its stats. Only SELECTs are explained, inside a transaction that is
+rolled back; a SELECT that calls a function with side effects rollback
+cannot undo (``nextval``, advisory locks) gets a plain ``EXPLAIN``
+without ANALYZE instead. Parameter values stay in worker memory and are
+never stored.
+"""
+from contextlib import suppress
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import re
+import time
+
+import structlog
+from sqlalchemy import event, text
+
+from app.config import settings
+from app.database import engine, shared_engine
+from app.logs import route_template
+
+logger = structlog.get_logger()
+
+QUERY_KEY = "slowq:q:{}"
+PLAN_KEY = "slowq:plan:{}"
+EXPLAIN_LOCK_KEY = "slowq:explaining:{}"
+INDEX_KEY = "slowq:index"
+STATS_TTL = 7 * 86400
+MAX_STATEMENT_LENGTH = 4000
+
+# KEYS: stats hash, index zset. ARGV: fingerprint, count, total ms, max ms,
+# statement, parameter shape, route, now, ttl, entries kept in the index.
+MERGE_SCRIPT = """
+redis.call('HINCRBY', KEYS[1], 'count', ARGV[2])
+local total = redis.call('HINCRBYFLOAT', KEYS[1], 'total_ms', ARGV[3])
+if tonumber(redis.call('HGET', KEYS[1], 'max_ms') or '0') < tonumber(ARGV[4]) then
+    redis.call('HSET', KEYS[1], 'max_ms', ARGV[4])
+end
+redis.call('HINCRBY', KEYS[1], 'route:' .. ARGV[7], ARGV[2])
+redis.call('HSET', KEYS[1], 'statement', ARGV[5], 'params', ARGV[6], 'last_seen', ARGV[8])
+redis.call('EXPIRE', KEYS[1], ARGV[9])
+redis.call('ZADD', KEYS[2], total, ARGV[1])
+redis.call('ZREMRANGEBYRANK', KEYS[2], 0, -tonumber(ARGV[10]) - 1)
+return tonumber(redis.call('HGET', KEYS[1], 'count'))
+"""
+
+_PLACEHOLDER_LIST = re.compile(r"\$\d+(?:\s*,\s*\$\d+)+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$.])\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+# Functions whose effects survive a rollback (sequences, session-level locks)
+_VOLATILE_CALL = re.compile(r"\b(?:nextval|setval|pg_(?:try_)?advisory_\w*)\s*\(", re.I)
+
+# The ASGI scope of the request being served, for attributing statements to routes
+request_scope: ContextVar[Optional[Dict[str, Any]]] = ContextVar("request_scope", default=None)
+
+
+class RequestScopeMiddleware:
+    """Makes the current request's scope visible to the engine hooks."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        token = request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_scope.reset(token)
+
+
+def normalize(statement: str) -> str:
+    """Statement text with literals and IN-list lengths folded away."""
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    statement = _PLACEHOLDER_LIST.sub("$n...", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def is_select(statement: str) -> bool:
+    # EXPLAIN ANALYZE runs the statement, so only plain reads are explained
+    head = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return head in ("SELECT", "WITH") and not re.search(r"\b(INSERT|UPDATE|DELETE)\b", statement, re.I)
+
+
+def explain_options(statement: str) -> str:
+    # Without ANALYZE the statement is only planned, never run
+    if _VOLATILE_CALL.search(statement):
+        return "FORMAT JSON"
+    return "ANALYZE, BUFFERS, FORMAT JSON"
+
+
+def parameter_shape(parameters, executemany: bool) -> str:
+    if executemany:
+        rows = list(parameters or ())
+        first = parameter_shape(rows[0], False) if rows else "()"
+        return f"{len(rows)} x {first}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    return "(" + ", ".join(type(value).__name__ for value in parameters or ()) + ")"
+
+
+class SlowQueryLog:
+    def __init__(self, threshold_ms: float, explain_after: int, flush_interval: float, keep: int):
+        self.threshold_ms = threshold_ms
+        self.explain_after = explain_after
+        self.flush_interval = flush_interval
+        self.keep = keep
+        # (fingerprint, route) -> [count, total ms, max ms, statement, shape, slowest parameters, executemany]
+        self._pending: Dict[Tuple[str, str], List[Any]] = {}
+        self._explained = set()
+        self._explains = set()
+
+    def install(self):
+        if self.threshold_ms > 0:
+            for target in (engine, shared_engine):
+                event.listen(target.sync_engine, "before_cursor_execute", self._before_cursor_execute)
+                event.listen(target.sync_engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_query_started", None)
+        if started is None:
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms < self.threshold_ms or conn.info.get("explaining"):
+            return
+        scope = request_scope.get()
+        route = f"{scope['method']} {route_template(scope)}" if scope else "background"
+        shape = parameter_shape(parameters, executemany)
+        logger.warning(
+            "Slow query", duration_ms=round(elapsed_ms, 2), route=route,
+            statement=statement[:MAX_STATEMENT_LENGTH], params=shape,
+        )
+        fingerprint = hashlib.sha1(normalize(statement).encode()).hexdigest()[:16]
+        entry = self._pending.get((fingerprint, route))
+        if entry is None:
+            self._pending[(fingerprint, route)] = [
+                1, elapsed_ms, elapsed_ms, statement, shape, parameters, executemany
+            ]
+            return
+        entry[0] += 1
+        entry[1] += elapsed_ms
+        if elapsed_ms > entry[2]:
+            entry[2], entry[5] = elapsed_ms, parameters
+
+    async def flush(self, redis):
+        pending, self._pending = self._pending, {}
+        for (fingerprint, route), (count, total, worst, statement, shape, parameters, executemany) in pending.items():
+            seen = await redis.eval(
+                MERGE_SCRIPT, 2, QUERY_KEY.format(fingerprint), INDEX_KEY,
+                fingerprint, count, f"{total:.3f}", f"{worst:.3f}",
+                normalize(statement)[:MAX_STATEMENT_LENGTH], shape, route, int(time.time()), STATS_TTL, self.keep,
+            )
+            if (
+                0 < self.explain_after <= seen
+                and fingerprint not in self._explained
+                and not executemany
+                and is_select(statement)
+            ):
+                self._explained.add(fingerprint)
+                # One worker explains each statement (until the plan expires)
+                if await redis.set(EXPLAIN_LOCK_KEY.format(fingerprint), "1", nx=True, ex=STATS_TTL):
+                    task = asyncio.create_task(self._explain(redis, fingerprint, statement, parameters))
+                    self._explains.add(task)
+                    task.add_done_callback(self._explains.discard)
+
+    async def _explain(self, redis, fingerprint: str, statement: str, parameters):
+        try:
+            async with engine.connect() as conn:
+                conn.sync_connection.info["explaining"] = True
+                try:
+                    async with conn.begin() as transaction:
+                        await conn.execute(text(
+                            f"SET LOCAL statement_timeout = {int(settings.slow_query_explain_timeout_ms)}"
+                        ))
+                        result = await conn.exec_driver_sql(
+                            f"EXPLAIN ({explain_options(statement)}) {statement}", tuple(parameters or ())
+                        )
+                        plan = result.scalar()
+                        await transaction.rollback()
+                finally:
+                    conn.sync_connection.info.pop("explaining", None)
+            await redis.set(PLAN_KEY.format(fingerprint), json.dumps(plan), ex=STATS_TTL)
+        except Exception as exc:
+            logger.warning("Could not explain slow query", fingerprint=fingerprint, error=str(exc))
+
+    async def run(self, redis):
+        """Merge buffered slow queries into Redis every ``flush_interval`` seconds."""
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                try:
+                    await self.flush(redis)
+                except Exception as exc:
+                    logger.warning("Slow query flush failed", error=str(exc))
+        finally:
+            with suppress(Exception):
+                await self.flush(redis)
+
+
+slow_query_log = SlowQueryLog(
+    settings.slow_query_ms, settings.slow_query_explain_after,
+    settings.slow_query_flush_seconds, settings.slow_query_keep,
+)
+slow_query_log.install()
+
+
+async def top_slow_queries(redis, limit: int, order: str = "total") -> List[Dict[str, Any]]:
+    """The ``limit`` worst statements by total, mean or max time, or by count."""
+    # The index ranks by total time; re-rank a wider slice for the other orders
+    fingerprints = await redis.zrevrange(INDEX_KEY, 0, (limit if order == "total" else settings.slow_query_keep) - 1)
+    if not fingerprints:
+        return []
+    async with redis.pipeline(transaction=False) as pipe:
+        for fingerprint in fingerprints:
+            pipe.hgetall(QUERY_KEY.format(fingerprint))
+            pipe.exists(PLAN_KEY.format(fingerprint))
+        replies = await pipe.execute()
+
+    report = []
+    for fingerprint, stats, has_plan in zip(fingerprints, replies[::2], replies[1::2]):
+        if not stats:
+            continue
+        count, total = int(stats["count"]), float(stats["total_ms"])
+        routes = {key[6:]: int(value) for key, value in stats.items() if key.startswith("route:")}
+        report.append({
+            "fingerprint": fingerprint,
+            "statement": stats["statement"],
+            "params": stats["params"],
+            "count": count,
+            "total_ms": round(total, 2),
+            "mean_ms": round(total / count, 2),
+            "max_ms": round(float(stats["max_ms"]), 2),
+            "routes": dict(sorted(routes.items(), key=lambda item: -item[1])),
+            "last_seen": int(stats["last_seen"]),
+            "has_plan": bool(has_plan),
+        })
+    sort_key = {"total": "total_ms", "mean": "mean_ms", "max": "max_ms", "count": "count"}[order]
+    report.sort(key=lambda entry: -entry[sort_key])
+    return report[:limit]
+
+
+async def get_plan(redis, fingerprint: str) -> Optional[Any]:
+    raw = await redis.get(PLAN_KEY.format(fingerprint))
+    return json.loads(raw) if raw is not None else None
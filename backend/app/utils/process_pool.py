@@ -0,0 +1,32 @@
+"""
+Process pools for CPU-bound work (bcrypt, template rendering) that would
+otherwise stall a worker's event loop.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Callable, Optional
+import asyncio
+
+
+class WorkerProcessPool:
+    """A spawn-context ``ProcessPoolExecutor`` started on first use.
+
+    The app is imported in gunicorn's master before the workers fork, so a
+    pool created at import would belong to the master and be unusable in
+    the workers. Starting it lazily gives each worker its own, and spawned
+    children don't inherit the worker's event loop or open sockets.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=get_context("spawn"))
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,121 @@
+"""
+Write-behind buffer for non-critical writes.
+
+``last_login`` stamps and audit events are collected in memory and
+flushed by a background task every ``write_behind_flush_seconds`` with
+one ``UPDATE ... FROM (VALUES ...)`` and one multi-row ``INSERT``, so
+login and admin handlers never wait on these writes. A crash loses at
+most one flush interval of entries; on shutdown ``stop`` lets the flush
+in progress finish and drains what is left.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+import asyncio
+
+import structlog
+from sqlalchemy import DateTime, column, update, values, insert
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+
+from app.config import settings
+from app.database import async_session_maker
+from app.models import User, AuditEvent
+
+logger = structlog.get_logger()
+
+
+class WriteBehindBuffer:
+    def __init__(self, flush_interval: float, max_events: int):
+        self.flush_interval = flush_interval
+        self.max_events = max_events
+        self._logins: Dict[UUID, datetime] = {}
+        self._events: List[Dict[str, Any]] = []
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._stopping = False
+        self.dropped_events = 0
+
+    def record_login(self, user_id: UUID, at: Optional[datetime] = None):
+        # Repeated logins between flushes collapse into one row update
+        at = at or datetime.utcnow()
+        previous = self._logins.get(user_id)
+        if previous is None or at > previous:
+            self._logins[user_id] = at
+
+    def record_event(
+        self,
+        action: str,
+        actor_id: Optional[UUID] = None,
+        entity_type: Optional[str] = None,
+        entity_id: Optional[UUID] = None,
+        details: Optional[Dict[str, Any]] = None,
+    ):
+        if len(self._events) >= self.max_events * 2:
+            # The database is not keeping up; shed load rather than grow unbounded
+            self.dropped_events += 1
+            return
+        self._events.append({
+            "action": action,
+            "actor_id": actor_id,
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "details": details,
+            "created_at": datetime.utcnow(),
+        })
+        if len(self._events) >= self.max_events:
+            self._wakeup.set()
+
+    async def flush(self):
+        async with self._lock:
+            logins, self._logins = self._logins, {}
+            events, self._events = self._events, []
+            if not logins and not events:
+                return
+
+            try:
+                async with async_session_maker() as session:
+                    if logins:
+                        rows = values(
+                            column("id", PG_UUID(as_uuid=True)),
+                            column("last_login", DateTime()),
+                            name="logins",
+                        ).data(list(logins.items()))
+                        await session.execute(
+                            update(User)
+                            .where(User.id == rows.c.id)
+                            .where((User.last_login.is_(None)) | (User.last_login < rows.c.last_login))
+                            .values(last_login=rows.c.last_login)
+                        )
+                    if events:
+                        await session.execute(insert(AuditEvent), events)
+                    await session.commit()
+            except BaseException as exc:
+                # Put the batch back, cancelled or not; newer login stamps win on merge
+                for user_id, at in logins.items():
+                    self.record_login(user_id, at)
+                self._events[:0] = events[: max(0, self.max_events * 2 - len(self._events))]
+                if not isinstance(exc, Exception):
+                    raise
+                logger.warning("Write-behind flush failed", error=str(exc), logins=len(logins), events=len(events))
+
+    def stop(self):
+        """Make ``run`` return after the current flush and a final drain."""
+        self._stopping = True
+        self._wakeup.set()
+
+    async def run(self):
+        """Flush periodically, or early when the event buffer fills up, until ``stop``."""
+        self._stopping = False
+        try:
+            while not self._stopping:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                await self.flush()
+        finally:
+            await self.flush()
+
+
+write_behind = WriteBehindBuffer(settings.write_behind_flush_seconds, settings.write_behind_max_events)
@@ -0,0 +1,101 @@
+"""
+Per-request CPU costs on the authentication, serialization and analytics hot paths.
+"""
+from typing import List
+import random
+import uuid
+
+import pytest
+from pydantic import TypeAdapter
+
+from app.analytics import describe_groups
+from app.prerequisites import transitive_closure
+from app.schemas import StudentCreate, PaymentCreate, StudentResponse
+from app.security import (
+    create_access_token, decode_token, validate_password_strength
+)
+
+
+# ============ Authentication ============
+@pytest.fixture(scope="module")
+def access_token() -> str:
+    return create_access_token({"sub": "8f14e45f-ceea-467f-a5f5-2b6f1e3b9a10", "role": "student"})
+
+
+def bench_decode_token(benchmark, access_token):
+    payload = benchmark(decode_token, access_token)
+    assert payload["type"] == "access"
+
+
+def bench_decode_token_invalid_signature(benchmark, access_token):
+    tampered = access_token[:-2] + ("AA" if not access_token.endswith("AA") else "BB")
+    assert benchmark(decode_token, tampered) is None
+
+
+def bench_create_access_token(benchmark):
+    benchmark(create_access_token, {"sub": "8f14e45f-ceea-467f-a5f5-2b6f1e3b9a10", "role": "admin"})
+
+
+@pytest.mark.parametrize("password", ["Chef@2024!", "weakpassword"], ids=["valid", "rejected"])
+def bench_validate_password_strength(benchmark, password):
+    benchmark(validate_password_strength, password)
+
+
+# ============ Request Validation ============
+def bench_student_create(benchmark, student_payload):
+    student = benchmark(StudentCreate.model_validate, student_payload)
+    assert student.email == student_payload["email"]
+
+
+def bench_payment_create(benchmark, payment_payload):
+    payment = benchmark(PaymentCreate.model_validate, payment_payload)
+    assert payment.reference_number == payment_payload["reference_number"]
+
+
+# ============ Response Serialization ============
+STUDENT_LIST = TypeAdapter(List[StudentResponse])
+
+
+def bench_student_response_list(benchmark, student_rows):
+    """ORM rows to JSON, the way FastAPI renders /api/admin/students."""
+    def serialize():
+        return STUDENT_LIST.dump_json(STUDENT_LIST.validate_python(student_rows, from_attributes=True))
+
+    assert benchmark(serialize).startswith(b"[")
+
+
+
+# ============ Result Analytics ============
+@pytest.fixture(scope="module")
+def semester_marks():
+    """A semester of marks as the statistics query returns them: 400 units, sorted per unit."""
+    rng = random.Random(7)
+    marks = [sorted(round(rng.gauss(62, 14), 2) for _ in range(rng.randint(20, 130))) for _ in range(400)]
+    grades = [["A" if m >= 70 else "B" if m >= 60 else "C" if m >= 50 else "D" if m >= 40 else "F" for m in unit]
+              for unit in marks]
+    return marks, grades
+
+
+def bench_describe_groups(benchmark, semester_marks):
+    marks, grades = semester_marks
+    stats = benchmark(describe_groups, marks, grades, 40.0)
+    assert len(stats["groups"]) == len(marks)
+
+
+# ============ Unit Prerequisites ============
+@pytest.fixture(scope="module")
+def prerequisite_edges():
+    """A 400-unit catalogue in eight levels; each unit needs up to three units from lower levels."""
+    rng = random.Random(11)
+    levels = [[uuid.uuid4() for _ in range(50)] for _ in range(8)]
+    return [
+        (unit, prerequisite)
+        for depth in range(1, len(levels))
+        for unit in levels[depth]
+        for prerequisite in rng.sample([u for level in levels[:depth] for u in level], rng.randint(0, 3))
+    ]
+
+
+def bench_prerequisite_closure(benchmark, prerequisite_edges):
+    closure = benchmark(transitive_closure, prerequisite_edges)
+    assert all(unit not in required for unit, required in closure.items())
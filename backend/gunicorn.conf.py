@@ -0,0 +1,64 @@
+"""
+Production launcher configuration for gunicorn + uvicorn workers.
+
+Usage (from the repository root or the backend directory):
+    gunicorn -c backend/gunicorn.conf.py
+"""
+import os
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent
+
+
+def _default_workers() -> int:
+    # Respect CPU affinity / container limits where available
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    return cpus * 2 + 1
+
+
+# Application
+chdir = str(BACKEND_DIR)
+wsgi_app = "app.main:app"
+preload_app = True
+
+# Server socket
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8000')}"
+backlog = 2048
+
+# Worker processes
+worker_class = "uvicorn_worker.UvicornWorker"
+workers = int(os.getenv("WEB_CONCURRENCY", 0)) or _default_workers()
+# Read back by app.config so DATABASE_MAX_CONNECTIONS can be split per worker
+os.environ["WEB_CONCURRENCY"] = str(workers)
+keepalive = 5
+timeout = 30
+graceful_timeout = 20
+max_requests = int(os.getenv("MAX_REQUESTS", 10000))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", 1000))
+
+# Keep worker heartbeat files off disk-backed /tmp inside containers
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# Logging
+# The app logs each request itself (LOG_ACCESS); set ACCESS_LOG=- for gunicorn's format too
+accesslog = os.getenv("ACCESS_LOG") or None
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info")
+
+
+def pre_fork(server, worker):
+    """Resolve the Alembic head once in the master so every worker inherits it."""
+    from app.database import expected_schema_heads
+
+    expected_schema_heads()
+
+
+def post_fork(server, worker):
+    """Drop any pooled connections inherited from the master process."""
+    from app.database import engine, shared_engine
+
+    engine.sync_engine.dispose(close=False)
+    shared_engine.sync_engine.dispose(close=False)
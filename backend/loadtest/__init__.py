@@ -0,0 +1,7 @@
+"""
+Load-testing harness for Fiesta TMS.
+
+Seeds a realistic synthetic institution and replays mixed workloads
+against a running (or harness-booted) instance of the app. See
+``python -m loadtest --help``.
+"""
@@ -0,0 +1,101 @@
+"""
+Command line entry point.
+
+    python -m loadtest seed --profile institution --jobs 8
+    python -m loadtest run --scenario registration_surge --users 300 --boot
+    python -m loadtest compare loadtest/results/<base>.json loadtest/results/<head>.json
+"""
+from pathlib import Path
+import argparse
+import asyncio
+import json
+
+from loadtest.dataset import PROFILES, get_profile
+from loadtest.scenarios import SCENARIOS
+
+
+def _add_dataset_args(parser: argparse.ArgumentParser):
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="institution")
+    parser.add_argument("--students", type=int, help="Override the profile's student count")
+    parser.add_argument("--units", type=int, help="Override the profile's unit count")
+    parser.add_argument("--seed", type=int, help="Override the dataset seed")
+
+
+def _spec(args):
+    return get_profile(args.profile, students=args.students, units=args.units, seed=args.seed)
+
+
+def cmd_seed(args):
+    from loadtest.seed import seed
+
+    spec = _spec(args)
+    print(f"Seeding {spec.students} students and {spec.units} units ({args.profile})")
+    counts = asyncio.run(seed(
+        spec, reset=not args.no_reset, batch_size=args.batch_size,
+        method=args.method, jobs=args.jobs,
+    ))
+    print()
+    for table, count in counts.items():
+        print(f"  {table:<20} {count}")
+
+
+def cmd_run(args):
+    from contextlib import nullcontext
+    from loadtest.runner import boot_app, run_scenario, save_report, format_report
+
+    spec = _spec(args)
+    launcher = boot_app(args.base_url, args.workers) if args.boot else nullcontext()
+    with launcher:
+        report = asyncio.run(run_scenario(
+            SCENARIOS[args.scenario], spec, args.base_url,
+            users=args.users, duration=args.duration, warmup=args.warmup,
+        ))
+    print(format_report(report))
+    if not args.no_save:
+        print(f"\nSaved to {save_report(report)}")
+
+
+def cmd_compare(args):
+    from loadtest.runner import compare_reports
+
+    base = json.loads(Path(args.base).read_text())
+    head = json.loads(Path(args.head).read_text())
+    print(compare_reports(base, head))
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m loadtest", description="Fiesta TMS load tests")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed = commands.add_parser("seed", help="Load a synthetic institution into DATABASE_URL")
+    _add_dataset_args(seed)
+    seed.add_argument("--batch-size", type=int, default=500, help="Students per transaction")
+    seed.add_argument("--no-reset", action="store_true", help="Do not truncate existing data first")
+    seed.add_argument("--method", choices=["copy", "insert"], default="copy",
+                      help="Binary COPY through asyncpg (default) or batched INSERTs")
+    seed.add_argument("--jobs", type=int, default=0, help="COPY worker processes (default: CPU count)")
+    seed.set_defaults(func=cmd_seed)
+
+    run = commands.add_parser("run", help="Replay a workload and report latency per route")
+    _add_dataset_args(run)
+    run.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    run.add_argument("--base-url", default="http://127.0.0.1:8000")
+    run.add_argument("--users", type=int, default=200, help="Concurrent virtual users")
+    run.add_argument("--duration", type=float, default=60.0, help="Measured seconds")
+    run.add_argument("--warmup", type=float, default=10.0, help="Unmeasured seconds before measuring")
+    run.add_argument("--boot", action="store_true", help="Start the app with gunicorn.conf.py first")
+    run.add_argument("--workers", type=int, default=4, help="Workers when using --boot")
+    run.add_argument("--no-save", action="store_true", help="Do not write the JSON report")
+    run.set_defaults(func=cmd_run)
+
+    compare = commands.add_parser("compare", help="Compare two saved reports")
+    compare.add_argument("base")
+    compare.add_argument("head")
+    compare.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+"""
+Deterministic synthetic institution used by the load tests.
+
+Every student is generated from its own seeded RNG, so the same spec
+always produces the same rows (and the same primary keys) and the
+generator never has to hold more than one batch of students in memory.
+"""
+from dataclasses import dataclass, replace
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Iterator, List, Optional
+import random
+import uuid
+
+from app.models import (
+    UserRole, Gender, Semester, RegistrationStatus,
+    FeeType, PaymentMethod, RequestType, RequestStatus
+)
+
+EMAIL_DOMAIN = "loadtest.fiesta.edu"
+ADMIN_EMAIL = f"admin@{EMAIL_DOMAIN}"
+DEFAULT_PASSWORD = "Loadtest@123"
+
+PROGRAMS = {
+    "Professional Chef Training": ("CUL", 0.35, Decimal("62000")),
+    "Catering Management": ("CAT", 0.2, Decimal("54000")),
+    "Pastry and Baking Arts": ("PAS", 0.18, Decimal("58000")),
+    "Food and Beverage Service": ("FBS", 0.15, Decimal("46000")),
+    "Hospitality Management": ("HOS", 0.12, Decimal("50000")),
+}
+
+UNIT_TOPICS = [
+    "Kitchen Safety", "Knife Skills", "Stocks and Sauces", "Food Costing",
+    "Menu Planning", "Nutrition", "Garde Manger", "Butchery", "Baking Science",
+    "Plated Desserts", "Beverage Operations", "Front Office", "Food Hygiene",
+    "Event Catering", "Purchasing", "Regional Cuisine", "Entrepreneurship",
+    "Communication Skills", "Supervision", "Industrial Attachment",
+]
+
+FIRST_NAMES = [
+    "Amina", "Brian", "Caroline", "David", "Esther", "Faith", "George", "Grace",
+    "Hassan", "Irene", "James", "Joy", "Kevin", "Lucy", "Mercy", "Moses",
+    "Naomi", "Peter", "Purity", "Samuel", "Sharon", "Tabitha", "Victor", "Wanjiru",
+]
+LAST_NAMES = [
+    "Achieng", "Barasa", "Chebet", "Kamau", "Kariuki", "Kiprop", "Mutua",
+    "Mwangi", "Njoroge", "Ochieng", "Odhiambo", "Omondi", "Otieno", "Wafula",
+    "Wambui", "Wanjiku", "Were", "Yego",
+]
+CITIES = ["Nairobi", "Mombasa", "Kisumu", "Nakuru", "Eldoret", "Thika", "Nyeri", "Machakos"]
+
+PAYMENT_METHODS = [PaymentMethod.MPESA, PaymentMethod.BANK_TRANSFER, PaymentMethod.CASH, PaymentMethod.CARD]
+PAYMENT_METHOD_WEIGHTS = [0.6, 0.25, 0.1, 0.05]
+
+GRADE_BANDS = [
+    (70, "A"), (65, "B+"), (60, "B"), (55, "C+"), (50, "C"),
+    (45, "D+"), (40, "D"), (35, "E"), (0, "F"),
+]
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    students: int = 40000
+    units: int = 400
+    first_year: int = 2019
+    current_year: int = 2025
+    units_per_term: int = 7
+    program_years: int = 4
+    seed: int = 1776
+
+    @property
+    def current_academic_year(self) -> str:
+        return academic_year(self.current_year)
+
+
+PROFILES = {
+    "smoke": DatasetSpec(students=500, units=40, units_per_term=5),
+    "campus": DatasetSpec(students=8000, units=200, units_per_term=6),
+    "institution": DatasetSpec(),
+    "large": DatasetSpec(students=100000, units=800),
+}
+
+
+def get_profile(name: str, **overrides) -> DatasetSpec:
+    spec = PROFILES[name]
+    overrides = {key: value for key, value in overrides.items() if value is not None}
+    return replace(spec, **overrides) if overrides else spec
+
+
+def academic_year(start_year: int) -> str:
+    return f"{start_year}-{start_year + 1}"
+
+
+def student_email(index: int) -> str:
+    return f"student{index:06d}@{EMAIL_DOMAIN}"
+
+
+def grade_for(marks: Decimal) -> str:
+    for lower, grade in GRADE_BANDS:
+        if marks >= lower:
+            return grade
+    return "F"
+
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _program_for(rng: random.Random) -> str:
+    names = list(PROGRAMS)
+    return rng.choices(names, weights=[PROGRAMS[name][1] for name in names])[0]
+
+
+# ============ Reference Data ============
+def admin_user(spec: DatasetSpec, password_hash: str) -> dict:
+    rng = random.Random(f"{spec.seed}:admin")
+    created = datetime(spec.first_year, 8, 1)
+    return {
+        "id": _uuid(rng),
+        "email": ADMIN_EMAIL,
+        "hashed_password": password_hash,
+        "role": UserRole.ADMIN,
+        "is_active": True,
+        "is_verified": True,
+        "created_at": created,
+        "updated_at": created,
+        "last_login": None,
+    }
+
+
+def iter_units(spec: DatasetSpec) -> Iterator[dict]:
+    """Units are spread across programs; every tenth unit is common to all."""
+    rng = random.Random(f"{spec.seed}:units")
+    prefixes = [prefix for prefix, _, _ in PROGRAMS.values()]
+    created = datetime(spec.first_year, 7, 1)
+    for index in range(spec.units):
+        prefix = "GEN" if index % 10 == 0 else prefixes[index % len(prefixes)]
+        topic = UNIT_TOPICS[index % len(UNIT_TOPICS)]
+        level = 100 * (1 + (index // len(UNIT_TOPICS)) % 4)
+        yield {
+            "id": _uuid(rng),
+            "unit_code": f"{prefix}{level + index % 100:03d}-{index:04d}",
+            "unit_name": f"{topic} {level // 100}",
+            "credits": rng.choices([2, 3, 4, 5, 6], weights=[1, 6, 3, 1, 1])[0],
+            "description": f"{topic} for level {level // 100} trainees",
+            "is_active": rng.random() > 0.05,
+            "created_at": created,
+            "updated_at": created,
+        }
+
+
+def unit_catalogue(spec: DatasetSpec) -> Dict[str, List[uuid.UUID]]:
+    """Map each unit-code prefix to its unit ids (small: one entry per unit)."""
+    catalogue: Dict[str, List[uuid.UUID]] = {}
+    for unit in iter_units(spec):
+        if unit["is_active"]:
+            catalogue.setdefault(unit["unit_code"][:3], []).append(unit["id"])
+    return catalogue
+
+
+# ============ Per-Student Data ============
+def _terms(spec: DatasetSpec, enrolled: int, rng: random.Random):
+    last_year = min(enrolled + spec.program_years - 1, spec.current_year)
+    for year in range(enrolled, last_year + 1):
+        yield year, Semester.FALL
+        if (year, Semester.FALL) == (spec.current_year, Semester.FALL):
+            return
+        yield year, Semester.SPRING
+        if rng.random() < 0.15:
+            yield year, Semester.SUMMER
+
+
+def _term_start(year: int, semester: Semester) -> datetime:
+    if semester == Semester.FALL:
+        return datetime(year, 9, 1)
+    if semester == Semester.SPRING:
+        return datetime(year + 1, 1, 10)
+    return datetime(year + 1, 5, 15)
+
+
+def student_bundle(
+    spec: DatasetSpec,
+    index: int,
+    password_hash: str,
+    catalogue: Dict[str, List[uuid.UUID]],
+    admin_id: uuid.UUID,
+) -> Dict[str, List[dict]]:
+    """Generate every row belonging to one student."""
+    rng = random.Random(f"{spec.seed}:student:{index}")
+    user_id, student_pk = _uuid(rng), _uuid(rng)
+    program = _program_for(rng)
+    prefix, _, tuition = PROGRAMS[program]
+    enrolled = spec.first_year + rng.randrange(spec.current_year - spec.first_year + 1)
+    enrolled_at = datetime(enrolled, 8, 20) + timedelta(days=rng.randrange(20))
+    finished = enrolled + spec.program_years <= spec.current_year
+
+    if rng.random() < 0.02:
+        standing = "suspended"
+    elif finished and rng.random() < 0.85:
+        standing = "graduated"
+    else:
+        standing = "active"
+
+    gender = rng.choices([Gender.FEMALE, Gender.MALE, Gender.OTHER], weights=[52, 47, 1])[0]
+    bundle: Dict[str, List[dict]] = {
+        "users": [{
+            "id": user_id,
+            "email": student_email(index),
+            "hashed_password": password_hash,
+            "role": UserRole.STUDENT,
+            "is_active": standing != "suspended",
+            "is_verified": True,
+            "created_at": enrolled_at,
+            "updated_at": enrolled_at,
+            "last_login": None,
+        }],
+        "students": [{
+            "id": student_pk,
+            "user_id": user_id,
+            "student_id": f"FT{enrolled}{index:06d}",
+            "first_name": rng.choice(FIRST_NAMES),
+            "middle_name": rng.choice(FIRST_NAMES) if rng.random() < 0.4 else None,
+            "last_name": rng.choice(LAST_NAMES),
+            "gender": gender,
+            "date_of_birth": date(enrolled - 18 - rng.randrange(8), 1 + rng.randrange(12), 1 + rng.randrange(28)),
+            "phone_number": f"07{rng.randrange(10 ** 8):08d}",
+            "city": rng.choice(CITIES),
+            "address": f"P.O. Box {rng.randrange(100, 99999)}",
+            "enrollment_date": enrolled_at.date(),
+            "program": program,
+            "is_graduated": standing,
+            "created_at": enrolled_at,
+            "updated_at": enrolled_at,
+        }],
+        "unit_registrations": [],
+        "results": [],
+        "fee_structures": [],
+        "payments": [],
+        "student_requests": [],
+    }
+
+    program_units = catalogue.get(prefix, [])
+    common_units = catalogue.get("GEN", [])
+    ability = rng.gauss(64, 9)
+
+    for term_index, (year, semester) in enumerate(_terms(spec, enrolled, rng)):
+        ay = academic_year(year)
+        start = _term_start(year, semester)
+        current = (year, semester) == (spec.current_year, Semester.FALL)
+
+        # Registrations and results
+        pool = program_units + common_units
+        chosen = rng.sample(pool, min(spec.units_per_term, len(pool))) if pool else []
+        for unit_id in chosen:
+            registration_id = _uuid(rng)
+            if current:
+                status = RegistrationStatus.REGISTERED
+            elif rng.random() < 0.05:
+                status = RegistrationStatus.DROPPED
+            else:
+                status = RegistrationStatus.COMPLETED
+            bundle["unit_registrations"].append({
+                "id": registration_id,
+                "student_id": student_pk,
+                "unit_id": unit_id,
+                "semester": semester,
+                "academic_year": ay,
+                "status": status,
+                "registration_date": start + timedelta(days=rng.randrange(14)),
+            })
+            if status == RegistrationStatus.COMPLETED:
+                marks = Decimal(str(round(min(100.0, max(0.0, rng.gauss(ability, 10))), 2)))
+                bundle["results"].append({
+                    "id": _uuid(rng),
+                    "registration_id": registration_id,
+                    "academic_year": ay,
+                    "marks": marks,
+                    "grade": grade_for(marks),
+                    "remarks": None,
+                    "is_published": "published",
+                    "entered_by": admin_id,
+                    "entered_at": start + timedelta(days=100 + rng.randrange(20)),
+                })
+
+        # Fees billed for the term
+        charges = [(FeeType.TUITION, tuition), (FeeType.EXAM, Decimal("3000"))]
+        if term_index == 0:
+            charges.append((FeeType.REGISTRATION, Decimal("2000")))
+        if semester == Semester.FALL:
+            charges.append((FeeType.LIBRARY, Decimal("1500")))
+        billed = Decimal(0)
+        for fee_type, amount in charges:
+            billed += amount
+            bundle["fee_structures"].append({
+                "id": _uuid(rng),
+                "student_id": student_pk,
+                "fee_type": fee_type,
+                "amount": amount,
+                "academic_year": ay,
+                "semester": semester.value,
+                "description": f"{fee_type.value.title()} fee {ay} {semester.value}",
+                "created_at": start - timedelta(days=7),
+                "created_by": admin_id,
+            })
+
+        # Payments: older terms are usually settled, the current one is partial
+        if current:
+            paid_share = rng.choice([Decimal("0"), Decimal("0.25"), Decimal("0.5"), Decimal("1")])
+        else:
+            paid_share = Decimal("1") if rng.random() < 0.92 else Decimal("0.6")
+        to_pay = (billed * paid_share).quantize(Decimal("0.01"))
+        instalments = rng.randint(1, 3)
+        for k in range(instalments):
+            if to_pay <= 0:
+                break
+            amount = to_pay if k == instalments - 1 else (to_pay / (instalments - k)).quantize(Decimal("0.01"))
+            to_pay -= amount
+            paid_at = start + timedelta(days=rng.randrange(90))
+            bundle["payments"].append({
+                "id": _uuid(rng),
+                "student_id": student_pk,
+                "amount": amount,
+                "payment_method": rng.choices(PAYMENT_METHODS, weights=PAYMENT_METHOD_WEIGHTS)[0],
+                "reference_number": f"LT{index:07d}{term_index:02d}{k}",
+                "payment_date": paid_at,
+                "academic_year": ay,
+                "semester": semester.value,
+                "remarks": None,
+                "recorded_by": admin_id,
+                "recorded_at": paid_at,
+            })
+
+    # Requests from final-year and finished students
+    if standing == "active" and enrolled + spec.program_years - 1 <= spec.current_year:
+        for request_type, probability in ((RequestType.GRADUATION, 0.2), (RequestType.CLEARANCE, 0.05)):
+            if rng.random() < probability:
+                bundle["student_requests"].append({
+                    "id": _uuid(rng),
+                    "student_id": student_pk,
+                    "request_type": request_type,
+                    "status": RequestStatus.PENDING,
+                    "request_date": datetime(spec.current_year, 10, 1) + timedelta(days=rng.randrange(30)),
+                    "student_remarks": None,
+                    "processed_by": None,
+                    "processed_at": None,
+                    "admin_remarks": None,
+                })
+
+    return bundle
+
+
+STUDENT_TABLES = (
+    "users", "students", "unit_registrations", "results",
+    "fee_structures", "payments", "student_requests",
+)
+
+
+def iter_student_batches(
+    spec: DatasetSpec,
+    password_hash: str,
+    batch_size: int = 500,
+    start: int = 0,
+    stop: Optional[int] = None,
+) -> Iterator[Dict[str, List[dict]]]:
+    """Yield rows for ``batch_size`` students at a time, grouped by table.
+
+    ``start``/``stop`` select a slice of student indexes so that several
+    processes can generate disjoint parts of the same dataset.
+    """
+    catalogue = unit_catalogue(spec)
+    admin_id = admin_user(spec, password_hash)["id"]
+    stop = spec.students if stop is None else min(stop, spec.students)
+    for first in range(start, stop, batch_size):
+        batch: Dict[str, List[dict]] = {table: [] for table in STUDENT_TABLES}
+        for index in range(first, min(first + batch_size, stop)):
+            for table, rows in student_bundle(spec, index, password_hash, catalogue, admin_id).items():
+                batch[table].extend(rows)
+        yield batch
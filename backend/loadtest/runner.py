@@ -0,0 +1,277 @@
+"""
+Drive a scenario against a running app and summarise latency per route.
+"""
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+
+import httpx
+
+from loadtest.dataset import (
+    DatasetSpec, DEFAULT_PASSWORD, ADMIN_EMAIL,
+    student_email, iter_units, student_bundle, unit_catalogue
+)
+from loadtest.scenarios import Scenario, VirtualUser
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+# ============ Measurement ============
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values), math.ceil(q / 100 * len(sorted_values))) - 1)
+    return sorted_values[rank]
+
+
+class Recorder:
+    def __init__(self):
+        self.clock = time.perf_counter
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.errors: Counter = Counter()
+        self.enabled = False
+
+    def record(self, route: str, seconds: float, status_code: int, ok: bool):
+        if not self.enabled:
+            return
+        self.latencies[route].append(seconds)
+        self.statuses[route][status_code] += 1
+        if not ok:
+            self.errors[route] += 1
+
+    def summary(self, duration: float) -> dict:
+        routes = {}
+        total = 0
+        for route, values in sorted(self.latencies.items()):
+            values.sort()
+            total += len(values)
+            routes[route] = {
+                "requests": len(values),
+                "errors": self.errors[route],
+                "throughput_rps": round(len(values) / duration, 2),
+                "mean_ms": round(sum(values) / len(values) * 1000, 2),
+                "p50_ms": round(percentile(values, 50) * 1000, 2),
+                "p95_ms": round(percentile(values, 95) * 1000, 2),
+                "p99_ms": round(percentile(values, 99) * 1000, 2),
+                "max_ms": round(values[-1] * 1000, 2),
+                "statuses": {str(code): count for code, count in self.statuses[route].items()},
+            }
+        return {
+            "duration_seconds": round(duration, 2),
+            "total_requests": total,
+            "total_errors": sum(self.errors.values()),
+            "throughput_rps": round(total / duration, 2) if duration else 0.0,
+            "routes": routes,
+        }
+
+
+# ============ App Lifecycle ============
+@contextmanager
+def boot_app(base_url: str, workers: int, timeout: float = 30.0):
+    """Start the production launcher and wait for /health."""
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), ACCESS_LOG="")
+    port = httpx.URL(base_url).port or 8000
+    env["PORT"] = str(port)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", str(BACKEND_DIR / "gunicorn.conf.py")],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if httpx.get(f"{base_url}/health", timeout=1.0).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if process.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError("App failed to start; check the gunicorn output above")
+            time.sleep(0.2)
+        yield process
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+# ============ Virtual Users ============
+async def _login(client: httpx.AsyncClient, email: str, password: str) -> Optional[str]:
+    response = await client.post("/api/auth/login", json={"email": email, "password": password})
+    if response.status_code != 200:
+        return None
+    return response.json()["access_token"]
+
+
+async def _login_all(client, emails: List[str], password: str, concurrency: int = 8) -> List[str]:
+    # Logins are bcrypt-bound on the server, so keep them off the measured window
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(email):
+        async with semaphore:
+            return await _login(client, email, password)
+
+    tokens = await asyncio.gather(*(one(email) for email in emails))
+    return [token for token in tokens if token]
+
+
+def build_fixtures(spec: DatasetSpec, rng: random.Random, sample: int = 500) -> dict:
+    """Ids the actions need, re-derived from the deterministic dataset."""
+    catalogue = unit_catalogue(spec)
+    indexes = rng.sample(range(spec.students), min(sample, spec.students))
+    student_ids = [
+        student_bundle(spec, index, "", catalogue, None)["students"][0]["id"]
+        for index in indexes
+    ]
+    return {
+        "unit_ids": [unit["id"] for unit in iter_units(spec) if unit["is_active"]],
+        "student_ids": student_ids,
+    }
+
+
+async def _run_user(vu: VirtualUser, scenario: Scenario, stop_at: float):
+    actions = scenario.actions[vu.role]
+    weights = [weight for weight, _ in actions]
+    while time.monotonic() < stop_at:
+        action = vu.rng.choices(actions, weights=weights)[0][1]
+        try:
+            await action(vu)
+        except httpx.HTTPError:
+            if vu.recorder.enabled:
+                vu.recorder.errors["transport"] += 1
+        if scenario.think_time:
+            await asyncio.sleep(vu.rng.expovariate(1 / scenario.think_time))
+
+
+async def run_scenario(
+    scenario: Scenario,
+    spec: DatasetSpec,
+    base_url: str,
+    users: int = 200,
+    duration: float = 60.0,
+    warmup: float = 10.0,
+    password: str = DEFAULT_PASSWORD,
+    seed: int = 0,
+) -> dict:
+    rng = random.Random(seed)
+    recorder = Recorder()
+    fixtures = build_fixtures(spec, rng)
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        role_counts = {role: max(1, round(users * share)) for role, share in scenario.roles.items()}
+        tokens = {}
+        if "student" in role_counts:
+            emails = [student_email(i) for i in rng.sample(range(spec.students), min(role_counts["student"], spec.students))]
+            tokens["student"] = await _login_all(client, emails, password)
+        if "admin" in role_counts:
+            tokens["admin"] = await _login_all(client, [ADMIN_EMAIL], password)
+        for role in role_counts:
+            if not tokens.get(role):
+                raise RuntimeError(f"Could not log in any {role} users; is the dataset seeded?")
+
+        vus = [
+            VirtualUser(
+                role=role,
+                client=client,
+                token=tokens[role][i % len(tokens[role])],
+                spec=spec,
+                rng=random.Random(f"{seed}:{role}:{i}"),
+                recorder=recorder,
+                fixtures=fixtures,
+            )
+            for role, count in role_counts.items()
+            for i in range(count)
+        ]
+
+        loop_start = time.monotonic()
+        stop_at = loop_start + warmup + duration
+        tasks = [asyncio.create_task(_run_user(vu, scenario, stop_at)) for vu in vus]
+        await asyncio.sleep(warmup)
+        recorder.enabled = True
+        measured_from = time.monotonic()
+        await asyncio.gather(*tasks)
+        measured = time.monotonic() - measured_from
+
+    report = recorder.summary(measured)
+    report.update({
+        "scenario": scenario.name,
+        "users": len(vus),
+        "warmup_seconds": warmup,
+        "dataset": spec.__dict__,
+    })
+    return report
+
+
+# ============ Reporting ============
+def _git_revision() -> str:
+    try:
+        sha = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=BACKEND_DIR, capture_output=True, text=True
+        ).stdout.strip()
+        return f"{sha}-dirty" if dirty else sha
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save_report(report: dict, directory: Path = RESULTS_DIR) -> Path:
+    report = dict(report, revision=_git_revision(), recorded_at=datetime.utcnow().isoformat())
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+    path = directory / f"{stamp}-{report['revision']}-{report['scenario']}.json"
+    path.write_text(json.dumps(report, indent=2, default=str))
+    return path
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        f"{'route':<36} {'reqs':>7} {'err':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}",
+    ]
+    for route, stats in report["routes"].items():
+        lines.append(
+            f"{route:<36} {stats['requests']:>7} {stats['errors']:>5} {stats['throughput_rps']:>8.1f} "
+            f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f}"
+        )
+    lines.append(
+        f"{'TOTAL':<36} {report['total_requests']:>7} {report['total_errors']:>5} "
+        f"{report['throughput_rps']:>8.1f}   (latencies in ms)"
+    )
+    return "\n".join(lines)
+
+
+def compare_reports(base: dict, head: dict) -> str:
+    def delta(old, new):
+        return f"{(new - old) / old * 100:+6.1f}%" if old else "    n/a"
+
+    lines = [
+        f"{base.get('revision', '?')} -> {head.get('revision', '?')} ({head['scenario']})",
+        f"{'route':<36} {'p50 ms':>16} {'p95 ms':>16} {'p99 ms':>16} {'rps':>16}",
+    ]
+    for route in sorted(set(base["routes"]) | set(head["routes"])):
+        old, new = base["routes"].get(route), head["routes"].get(route)
+        if not old or not new:
+            lines.append(f"{route:<36} only in {'head' if new else 'base'}")
+            continue
+        cells = [
+            f"{new[key]:>8.1f} {delta(old[key], new[key])}"
+            for key in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")
+        ]
+        lines.append(f"{route:<36} " + " ".join(cells))
+    return "\n".join(lines)
@@ -0,0 +1,184 @@
+"""
+Workload definitions replayed by the load-test runner.
+
+A scenario is a mix of virtual-user roles; each role repeatedly picks a
+weighted action. Actions receive a ``VirtualUser`` and issue requests
+through ``vu.call`` so latency is recorded under a stable route name.
+"""
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+from loadtest.dataset import FIRST_NAMES, LAST_NAMES, DatasetSpec
+from app.models import Semester
+
+Action = Callable[["VirtualUser"], Awaitable[None]]
+
+
+@dataclass
+class Scenario:
+    name: str
+    description: str
+    roles: Dict[str, float]
+    actions: Dict[str, List[Tuple[float, Action]]]
+    think_time: float = 0.5
+
+
+@dataclass
+class VirtualUser:
+    role: str
+    client: object
+    token: str
+    spec: DatasetSpec
+    rng: object
+    recorder: object
+    fixtures: dict = field(default_factory=dict)
+
+    async def call(self, method: str, url: str, route: str, expected=(200,), **kwargs):
+        headers = {"Authorization": f"Bearer {self.token}"}
+        start = self.recorder.clock()
+        status_code = 0
+        try:
+            response = await self.client.request(method, url, headers=headers, **kwargs)
+            status_code = response.status_code
+        finally:
+            self.recorder.record(route, self.recorder.clock() - start, status_code, status_code in expected)
+        return response
+
+
+# ============ Student Actions ============
+async def view_home(vu: VirtualUser):
+    # The home page's single first-paint request
+    await vu.call("GET", "/api/student/bootstrap", "GET /student/bootstrap")
+
+
+async def view_profile(vu: VirtualUser):
+    await vu.call("GET", "/api/student/profile", "GET /student/profile")
+
+
+async def view_available_units(vu: VirtualUser):
+    await vu.call("GET", "/api/student/units/available", "GET /student/units/available")
+
+
+async def view_registered_units(vu: VirtualUser):
+    await vu.call("GET", "/api/student/units/registered", "GET /student/units/registered")
+
+
+async def register_unit(vu: VirtualUser):
+    # Registration opens for the spring term of the current academic year
+    await vu.call(
+        "POST", "/api/student/units/register", "POST /student/units/register",
+        expected=(201, 400),
+        json={
+            "unit_id": str(vu.rng.choice(vu.fixtures["unit_ids"])),
+            "semester": Semester.SPRING.value,
+            "academic_year": vu.spec.current_academic_year,
+        },
+    )
+
+
+async def view_results(vu: VirtualUser):
+    await vu.call("GET", "/api/student/results", "GET /student/results")
+
+
+async def view_fees(vu: VirtualUser):
+    await vu.call("GET", "/api/student/fees", "GET /student/fees")
+
+
+async def view_requests(vu: VirtualUser):
+    await vu.call("GET", "/api/student/requests", "GET /student/requests")
+
+
+# ============ Admin Actions ============
+async def search_students(vu: VirtualUser):
+    term = vu.rng.choice(FIRST_NAMES + LAST_NAMES)[:4]
+    await vu.call(
+        "GET", "/api/admin/students", "GET /admin/students?search",
+        params={"search": term, "skip": vu.rng.randrange(0, 200, 50), "limit": 50},
+    )
+
+
+async def browse_students(vu: VirtualUser):
+    await vu.call(
+        "GET", "/api/admin/students", "GET /admin/students",
+        params={"skip": vu.rng.randrange(0, vu.spec.students, 50), "limit": 50},
+    )
+
+
+async def view_student(vu: VirtualUser):
+    student_id = vu.rng.choice(vu.fixtures["student_ids"])
+    await vu.call("GET", f"/api/admin/students/{student_id}", "GET /admin/students/{id}")
+
+
+async def list_units(vu: VirtualUser):
+    await vu.call("GET", "/api/admin/units", "GET /admin/units")
+
+
+async def list_pending_requests(vu: VirtualUser):
+    await vu.call(
+        "GET", "/api/admin/requests", "GET /admin/requests",
+        params={"status_filter": "pending"},
+    )
+
+
+async def summary_report(vu: VirtualUser):
+    await vu.call("GET", "/api/admin/reports/summary", "GET /admin/reports/summary")
+
+
+ADMIN_BROWSING = [
+    (3, search_students),
+    (2, browse_students),
+    (2, view_student),
+    (1, list_units),
+    (2, list_pending_requests),
+    (1, summary_report),
+]
+
+SCENARIOS = {
+    "registration_surge": Scenario(
+        name="registration_surge",
+        description="Registration day: students browse units and register in bursts",
+        roles={"student": 1.0},
+        actions={"student": [
+            (5, register_unit),
+            (3, view_available_units),
+            (2, view_registered_units),
+            (1, view_home),
+        ]},
+        think_time=0.2,
+    ),
+    "results_release": Scenario(
+        name="results_release",
+        description="Results release: students refresh their provisional results",
+        roles={"student": 1.0},
+        actions={"student": [
+            (8, view_results),
+            (2, view_home),
+        ]},
+        think_time=0.3,
+    ),
+    "admin_browsing": Scenario(
+        name="admin_browsing",
+        description="Office hours: admins search students and review requests",
+        roles={"admin": 1.0},
+        actions={"admin": ADMIN_BROWSING},
+        think_time=1.0,
+    ),
+    "mixed": Scenario(
+        name="mixed",
+        description="Normal term traffic across the student and admin portals",
+        roles={"student": 0.9, "admin": 0.1},
+        actions={
+            "student": [
+                (3, view_home),
+                (1, view_profile),
+                (2, view_available_units),
+                (2, view_registered_units),
+                (1, register_unit),
+                (2, view_results),
+                (2, view_fees),
+                (1, view_requests),
+            ],
+            "admin": ADMIN_BROWSING,
+        },
+    ),
+}
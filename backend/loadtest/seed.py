@@ -0,0 +1,173 @@
+"""
+Load a synthetic dataset into the configured database.
+
+Two loaders share the same generator:
+
+* ``copy`` (default) streams rows with binary ``COPY`` over raw asyncpg
+  connections, split across worker processes by student index range.
+* ``insert`` goes through SQLAlchemy batched multi-row INSERTs and is
+  kept as a reference for comparison.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Dict, Iterable, List
+import asyncio
+import enum
+import os
+import time
+
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.config import settings
+from app.database import Base
+from app.models import User, Unit
+from app.partitions import create_partitions
+from app.security import get_password_hash
+from loadtest.dataset import (
+    DatasetSpec, DEFAULT_PASSWORD, STUDENT_TABLES,
+    academic_year, admin_user, iter_units, iter_student_batches
+)
+
+# Truncated in one statement; CASCADE takes care of ordering
+SEEDED_TABLES = ("users", "units") + STUDENT_TABLES[1:]
+
+
+async def reset_tables(engine: AsyncEngine):
+    async with engine.begin() as conn:
+        await conn.execute(text(f"TRUNCATE {', '.join(SEEDED_TABLES)} CASCADE"))
+
+
+async def create_year_partitions(engine: AsyncEngine, spec: DatasetSpec):
+    # Without them every row would land in the default partitions
+    years = [academic_year(year) for year in range(spec.first_year, spec.current_year + 2)]
+    async with engine.begin() as conn:
+        await conn.run_sync(create_partitions, years)
+
+
+async def analyze_tables(engine: AsyncEngine):
+    # Fresh statistics so the planner sees production-like row counts
+    async with engine.begin() as conn:
+        await conn.execute(text(f"ANALYZE {', '.join(SEEDED_TABLES)}"))
+
+
+# ============ COPY Loader ============
+def asyncpg_dsn() -> str:
+    """The configured SQLAlchemy URL as a plain asyncpg/libpq DSN."""
+    url = make_url(settings.database_url).set(drivername="postgresql")
+    return url.render_as_string(hide_password=False)
+
+
+def _records(rows: List[dict]) -> Iterable[tuple]:
+    # SQLAlchemy stores Python enums by member name, so COPY must too
+    for row in rows:
+        yield tuple(value.name if isinstance(value, enum.Enum) else value for value in row.values())
+
+
+async def copy_rows(conn: asyncpg.Connection, table: str, rows: List[dict]) -> int:
+    if not rows:
+        return 0
+    await conn.copy_records_to_table(table, columns=list(rows[0]), records=_records(rows))
+    return len(rows)
+
+
+async def _copy_students(spec: DatasetSpec, password_hash: str, start: int, stop: int, batch_size: int) -> Dict[str, int]:
+    counts = {table: 0 for table in STUDENT_TABLES}
+    conn = await asyncpg.connect(asyncpg_dsn())
+    try:
+        # Seeded data can be regenerated, so skip waiting for WAL flushes
+        await conn.execute("SET synchronous_commit = off")
+        for batch in iter_student_batches(spec, password_hash, batch_size, start, stop):
+            async with conn.transaction():
+                for table in STUDENT_TABLES:
+                    counts[table] += await copy_rows(conn, table, batch[table])
+    finally:
+        await conn.close()
+    return counts
+
+
+def _copy_students_worker(spec: DatasetSpec, password_hash: str, start: int, stop: int, batch_size: int) -> Dict[str, int]:
+    """Process-pool entry point: one event loop and connection per slice."""
+    return asyncio.run(_copy_students(spec, password_hash, start, stop, batch_size))
+
+
+async def seed_copy(spec: DatasetSpec, password_hash: str, batch_size: int, jobs: int) -> Dict[str, int]:
+    counts = {table: 0 for table in SEEDED_TABLES}
+
+    conn = await asyncpg.connect(asyncpg_dsn())
+    try:
+        async with conn.transaction():
+            counts["users"] += await copy_rows(conn, "users", [admin_user(spec, password_hash)])
+            counts["units"] += await copy_rows(conn, "units", list(iter_units(spec)))
+    finally:
+        await conn.close()
+
+    # Generation is CPU-bound Python, so slices run in separate processes
+    step = max(1, -(-spec.students // jobs))
+    slices = [(start, min(start + step, spec.students)) for start in range(0, spec.students, step)]
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=max(1, len(slices)), mp_context=get_context("spawn")) as pool:
+        futures = [
+            loop.run_in_executor(pool, _copy_students_worker, spec, password_hash, start, stop, batch_size)
+            for start, stop in slices
+        ]
+        for done in asyncio.as_completed(futures):
+            for table, count in (await done).items():
+                counts[table] += count
+            print(f"  {counts['students']:>8} students seeded", end="\r", flush=True)
+    return counts
+
+
+# ============ INSERT Loader ============
+async def seed_insert(spec: DatasetSpec, engine: AsyncEngine, password_hash: str, batch_size: int) -> Dict[str, int]:
+    tables = Base.metadata.tables
+    counts = {table: 0 for table in SEEDED_TABLES}
+
+    async with engine.begin() as conn:
+        await conn.execute(User.__table__.insert(), [admin_user(spec, password_hash)])
+        units = list(iter_units(spec))
+        await conn.execute(Unit.__table__.insert(), units)
+        counts["users"] += 1
+        counts["units"] += len(units)
+
+    for batch in iter_student_batches(spec, password_hash, batch_size):
+        async with engine.begin() as conn:
+            for table in STUDENT_TABLES:
+                rows = batch[table]
+                if rows:
+                    await conn.execute(tables[table].insert(), rows)
+                    counts[table] += len(rows)
+        print(f"  {counts['students']:>8} students seeded", end="\r", flush=True)
+    return counts
+
+
+async def seed(
+    spec: DatasetSpec,
+    reset: bool = True,
+    batch_size: int = 500,
+    password: str = DEFAULT_PASSWORD,
+    method: str = "copy",
+    jobs: int = 0,
+) -> dict:
+    """Load the dataset and return row counts per table."""
+    engine = create_async_engine(settings.database_url)
+    # One bcrypt hash shared by every seeded account
+    password_hash = get_password_hash(password)
+    started = time.perf_counter()
+
+    try:
+        if reset:
+            await reset_tables(engine)
+        await create_year_partitions(engine, spec)
+        if method == "copy":
+            counts = await seed_copy(spec, password_hash, batch_size, jobs or os.cpu_count() or 1)
+        else:
+            counts = await seed_insert(spec, engine, password_hash, batch_size)
+        await analyze_tables(engine)
+    finally:
+        await engine.dispose()
+
+    counts["elapsed_seconds"] = round(time.perf_counter() - started, 2)
+    return counts
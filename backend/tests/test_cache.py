@@ -0,0 +1,134 @@
+"""
+Two-tier cache (``app.cache``): epoch-guarded stores and tag invalidation.
+"""
+from typing import List
+import asyncio
+
+import pytest
+
+from app.cache import EPOCH_KEY, INVALIDATION_CHANNEL, TAG_KEY, VALUE_KEY, TwoTierCache
+
+
+@pytest.fixture
+def cache():
+    return TwoTierCache(local_size=100, local_ttl=60, default_ttl=300)
+
+
+class Loader:
+    """Counts calls and returns the next value; can be held open mid-load."""
+
+    def __init__(self, *values):
+        self.values = list(values)
+        self.calls = 0
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self):
+        self.calls += 1
+        self.started.set()
+        await self.release.wait()
+        return self.values.pop(0)
+
+
+async def test_hits_are_served_locally_then_from_redis(cache, redis):
+    loader = Loader([1, 2])
+    assert await cache.get_or_load(redis, "units:all", loader, List[int], tags=("units",)) == [1, 2]
+    assert await cache.get_or_load(redis, "units:all", loader, List[int], tags=("units",)) == [1, 2]
+
+    # Another worker: empty local tier, same Redis
+    other = TwoTierCache(local_size=100, local_ttl=60, default_ttl=300)
+    assert await other.get_or_load(redis, "units:all", loader, List[int], tags=("units",)) == [1, 2]
+    assert loader.calls == 1
+    assert await redis.sismember(TAG_KEY.format("units"), VALUE_KEY.format("units:all"))
+
+
+async def test_concurrent_misses_share_one_load(cache, redis):
+    loader = Loader([1])
+    loader.release.clear()
+    calls = [
+        asyncio.create_task(cache.get_or_load(redis, "units:all", loader, List[int], tags=("units",)))
+        for _ in range(5)
+    ]
+    await loader.started.wait()
+    loader.release.set()
+
+    assert await asyncio.gather(*calls) == [[1]] * 5
+    assert loader.calls == 1
+
+
+async def test_invalidation_racing_a_load_is_not_written_back(cache, redis):
+    loader = Loader(["stale"], ["fresh"])
+    loader.release.clear()
+    load = asyncio.create_task(cache.get_or_load(redis, "units:all", loader, List[str], tags=("units",)))
+    await loader.started.wait()
+
+    # A unit changes while the old rows are still on their way back
+    await cache.invalidate(redis, "units")
+    loader.release.set()
+
+    assert await load == ["stale"]  # the caller that started first still gets its answer
+    assert await redis.get(VALUE_KEY.format("units:all")) is None
+    assert await cache.get_or_load(redis, "units:all", loader, List[str], tags=("units",)) == ["fresh"]
+    assert loader.calls == 2
+
+
+async def test_invalidation_from_another_worker_blocks_the_store(cache, redis):
+    loader = Loader(["stale"], ["fresh"])
+    loader.release.clear()
+    load = asyncio.create_task(cache.get_or_load(redis, "units:all", loader, List[str], tags=("units",)))
+    await loader.started.wait()
+
+    # Only the Redis epoch moves; this worker's listener hasn't heard yet
+    other = TwoTierCache(local_size=100, local_ttl=60, default_ttl=300)
+    await other.invalidate(redis, "units")
+    loader.release.set()
+    await load
+
+    assert await redis.get(EPOCH_KEY.format("units")) == "1"
+    assert await redis.get(VALUE_KEY.format("units:all")) is None
+
+
+async def test_drop_tags_clears_only_local_entries_with_those_tags(cache, redis):
+    units, grading = Loader(["u1"], ["u2"]), Loader(["g1"])
+    await cache.get_or_load(redis, "units:all", units, List[str], tags=("units",))
+    await cache.get_or_load(redis, "grading:bands", grading, List[str], tags=("grading",))
+    await redis.flushall()
+
+    cache.drop_tags(["units"])
+
+    assert await cache.get_or_load(redis, "units:all", units, List[str], tags=("units",)) == ["u2"]
+    assert await cache.get_or_load(redis, "grading:bands", grading, List[str], tags=("grading",)) == ["g1"]
+    assert (units.calls, grading.calls) == (2, 1)
+
+
+async def test_drop_tags_during_a_load_keeps_it_out_of_the_local_tier(cache, redis):
+    loader = Loader(["stale"], ["fresh"])
+    loader.release.clear()
+    load = asyncio.create_task(cache.get_or_load(redis, "units:all", loader, List[str], tags=("units",)))
+    await loader.started.wait()
+
+    cache.drop_tags(["units"])  # as the invalidation listener does
+    loader.release.set()
+    await load
+    await redis.flushall()
+
+    assert await cache.get_or_load(redis, "units:all", loader, List[str], tags=("units",)) == ["fresh"]
+
+
+async def test_invalidate_deletes_tagged_keys_and_publishes(cache, redis):
+    await cache.get_or_load(redis, "units:all", Loader(["u"]), List[str], tags=("units",))
+    await cache.get_or_load(redis, "units:prerequisites", Loader(["p"]), List[str], tags=("units",))
+    await cache.get_or_load(redis, "grading:bands", Loader(["g"]), List[str], tags=("grading",))
+
+    async with redis.pubsub() as pubsub:
+        await pubsub.subscribe(INVALIDATION_CHANNEL)
+        await pubsub.get_message(timeout=1)  # subscribe confirmation
+        await cache.invalidate(redis, "units")
+        message = await pubsub.get_message(timeout=1)
+
+    assert message["data"] == "units"
+    assert await redis.get(VALUE_KEY.format("units:all")) is None
+    assert await redis.get(VALUE_KEY.format("units:prerequisites")) is None
+    assert await redis.get(VALUE_KEY.format("grading:bands")) is not None
+    assert not await redis.exists(TAG_KEY.format("units"))
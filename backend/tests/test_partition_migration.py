@@ -0,0 +1,161 @@
+"""
+Round trip of the partitioning migration (``8c2e5d1f4a63``) on a scratch database.
+
+Needs PostgreSQL: set ``TEST_DATABASE_URL`` to a server the tests may
+create databases on, e.g. ``postgresql://postgres@localhost/postgres``.
+Skipped otherwise.
+"""
+from pathlib import Path
+from typing import Dict
+from urllib.parse import urlsplit, urlunsplit
+import asyncio
+import os
+import subprocess
+import sys
+import uuid
+
+import pytest
+
+asyncpg = pytest.importorskip("asyncpg")
+
+ADMIN_URL = os.environ.get("TEST_DATABASE_URL")
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+BEFORE_PARTITIONING = "01d34b7c1e1f"
+YEARS = ("2023-2024", "2024-2025")
+TABLES = ("unit_registrations", "results", "payments", "fee_structures")
+
+pytestmark = pytest.mark.skipif(not ADMIN_URL, reason="TEST_DATABASE_URL is not set")
+
+
+def _query(url: str, sql: str, *args):
+    async def run():
+        conn = await asyncpg.connect(url)
+        try:
+            return await conn.fetch(sql, *args)
+        finally:
+            await conn.close()
+    return asyncio.run(run())
+
+
+def _backend(url: str, *args: str):
+    """Run a backend command (alembic, or app code) against ``url``."""
+    app_url = urlunsplit(urlsplit(url)._replace(scheme="postgresql+asyncpg"))
+    subprocess.run(
+        [sys.executable, *args], cwd=BACKEND_DIR, check=True, capture_output=True,
+        env={**os.environ, "DATABASE_URL": app_url, "DEBUG": "False"},
+    )
+
+
+def _alembic(url: str, *args: str):
+    _backend(url, "-m", "alembic", *args)
+
+
+@pytest.fixture(scope="module")
+def database():
+    """A scratch database at the Alembic head, dropped afterwards."""
+    name = f"fiesta_test_{uuid.uuid4().hex[:12]}"
+    _query(ADMIN_URL, f"CREATE DATABASE {name}")
+    url = urlunsplit(urlsplit(ADMIN_URL)._replace(path=f"/{name}"))
+    try:
+        _backend(url, "-c", "import asyncio\nfrom app.database import engine, init_db\n"
+                            "async def main():\n    await init_db()\n    await engine.dispose()\n"
+                            "asyncio.run(main())")
+        _alembic(url, "stamp", "head")
+        yield url
+    finally:
+        _query(ADMIN_URL, f"DROP DATABASE IF EXISTS {name} WITH (FORCE)")
+
+
+def _seed(url: str):
+    """One student with a registration, result, payment and fee in each of ``YEARS``."""
+    user, student, unit = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    statements = [
+        ("INSERT INTO users (id, email, hashed_password, role, is_active, is_verified, created_at, updated_at) "
+         "VALUES ($1, 'migration@example.com', 'x', 'STUDENT', true, true, now(), now())", user),
+        ("INSERT INTO students (id, user_id, student_id, first_name, last_name, gender, date_of_birth, "
+         "phone_number, city, enrollment_date, program, created_at, updated_at) VALUES ($1, $2, 'FT2023000001', "
+         "'Wanjiru', 'Kamau', 'FEMALE', '2001-04-17', '0712345678', 'Nairobi', '2023-09-01', 'Pastry', now(), now())",
+         student, user),
+        ("INSERT INTO units (id, unit_code, unit_name, credits, is_active, created_at, updated_at) "
+         "VALUES ($1, 'PAS101', 'Pastry Basics', 3, true, now(), now())", unit),
+    ]
+    for index, year in enumerate(YEARS):
+        registration = uuid.uuid4()
+        statements += [
+            ("INSERT INTO unit_registrations (id, student_id, unit_id, semester, academic_year, status, "
+             "registration_date) VALUES ($1, $2, $3, 'FALL', $4, 'COMPLETED', now())",
+             registration, student, unit, year),
+            ("INSERT INTO results (id, registration_id, marks) VALUES ($1, $2, 70)", uuid.uuid4(), registration),
+            ("INSERT INTO payments (id, student_id, amount, payment_method, reference_number, payment_date, "
+             "academic_year, semester, recorded_at) VALUES ($1, $2, 15500, 'MPESA', $3, now(), $4, 'fall', now())",
+             uuid.uuid4(), student, f"QJK4H7L2P{index}", year),
+            ("INSERT INTO fee_structures (id, student_id, fee_type, amount, academic_year, semester, created_at) "
+             "VALUES ($1, $2, 'TUITION', 15500, $3, 'fall', now())", uuid.uuid4(), student, year),
+        ]
+
+    async def run():
+        conn = await asyncpg.connect(url)
+        try:
+            async with conn.transaction():
+                for sql, *args in statements:
+                    await conn.execute(sql, *args)
+        finally:
+            await conn.close()
+    asyncio.run(run())
+
+
+def _layout(url: str, table: str) -> Dict[str, int]:
+    """Rows per leaf table (the table itself when it isn't partitioned)."""
+    rows = _query(url, f"SELECT tableoid::regclass::text AS leaf, count(*) FROM {table} GROUP BY 1")
+    return {row["leaf"]: row["count"] for row in rows}
+
+
+def _relkind(url: str, table: str) -> str:
+    return _query(url, "SELECT relkind::text FROM pg_class WHERE oid = CAST($1 AS regclass)", table)[0]["relkind"]
+
+
+def _foreign_keys(url: str):
+    # conparentid = 0 leaves out the copies Postgres keeps per partition
+    rows = _query(url, "SELECT conrelid::regclass::text, conname FROM pg_constraint "
+                       "WHERE contype = 'f' AND conparentid = 0 AND conrelid::regclass::text = ANY($1)", TABLES)
+    return sorted(tuple(row) for row in rows)
+
+
+def test_upgrade_routes_existing_rows_into_year_partitions(database):
+    _alembic(database, "downgrade", BEFORE_PARTITIONING)
+    assert _relkind(database, "payments") == "r"
+    _seed(database)
+
+    _alembic(database, "upgrade", "head")
+
+    for table in TABLES:
+        assert _relkind(database, table) == "p"
+        assert _layout(database, table) == {f"{table}_y2023_2024_hot": 1, f"{table}_y2024_2025_hot": 1}
+    # Results take their academic year from their registration
+    (joined,) = _query(database, "SELECT count(*) FROM results r JOIN unit_registrations u "
+                                 "ON u.id = r.registration_id AND u.academic_year = r.academic_year")
+    assert joined[0] == 2
+
+
+def test_archiving_a_registration_moves_its_result_to_the_cold_partition(database):
+    _query(database, "UPDATE unit_registrations SET archived = true WHERE academic_year = '2023-2024'")
+
+    assert _layout(database, "results") == {"results_y2023_2024_cold": 1, "results_y2024_2025_hot": 1}
+    _query(database, "UPDATE unit_registrations SET archived = false")
+
+
+def test_downgrade_restores_plain_tables_and_keeps_every_row(database):
+    foreign_keys = _foreign_keys(database)
+    _alembic(database, "downgrade", BEFORE_PARTITIONING)
+
+    for table in TABLES:
+        assert _relkind(database, table) == "r"
+        assert _layout(database, table) == {table: 2}
+    (index,) = _query(database, "SELECT indisunique FROM pg_index "
+                                "WHERE indexrelid = CAST('ix_payments_reference_number' AS regclass)")
+    assert index["indisunique"]
+    assert _foreign_keys(database) == foreign_keys
+
+    _alembic(database, "upgrade", "head")
+    assert _layout(database, "payments") == {"payments_y2023_2024_hot": 1, "payments_y2024_2025_hot": 1}
+    assert _foreign_keys(database) == foreign_keys
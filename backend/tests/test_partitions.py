@@ -0,0 +1,16 @@
+"""Academic year of a date (``app.partitions``), with the default start month."""
+from datetime import date
+
+import pytest
+
+from app.partitions import academic_year_of
+
+
+@pytest.mark.parametrize("day, year", [
+    (date(2025, 9, 1), "2025-2026"),
+    (date(2025, 12, 31), "2025-2026"),
+    (date(2026, 8, 31), "2025-2026"),
+    (date(2026, 9, 1), "2026-2027"),
+])
+def test_academic_year_of_a_day(day, year):
+    assert academic_year_of(day) == year
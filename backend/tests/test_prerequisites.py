@@ -0,0 +1,76 @@
+"""
+Unit prerequisites (``app.prerequisites``): the transitive closure and cycle checks.
+"""
+from uuid import uuid4
+
+import pytest
+
+from app import prerequisites
+from app.cache import TwoTierCache
+from app.prerequisites import PrerequisiteGraph, creates_cycle, transitive_closure
+
+# Bread 301 needs Bread 201, which needs Bread 101 and Hygiene 101
+HYGIENE, BREAD_101, BREAD_201, BREAD_301, PASTRY = (uuid4() for _ in range(5))
+EDGES = [
+    (BREAD_201, BREAD_101, "BRD101"),
+    (BREAD_201, HYGIENE, "HYG101"),
+    (BREAD_301, BREAD_201, "BRD201"),
+]
+
+
+def test_closure_follows_indirect_prerequisites():
+    closure = transitive_closure((unit, prerequisite) for unit, prerequisite, _ in EDGES)
+
+    assert closure[BREAD_301] == {BREAD_201, BREAD_101, HYGIENE}
+    assert closure[BREAD_201] == {BREAD_101, HYGIENE}
+    assert closure.get(BREAD_101, frozenset()) == frozenset()
+
+
+def test_closure_shares_a_prerequisite_reached_by_two_paths():
+    # Pastry needs Hygiene directly and through Bread 201
+    closure = transitive_closure([(PASTRY, HYGIENE), (PASTRY, BREAD_201), (BREAD_201, HYGIENE)])
+
+    assert closure[PASTRY] == {HYGIENE, BREAD_201}
+
+
+def test_closure_terminates_on_a_cycle_already_in_the_table():
+    closure = transitive_closure([(BREAD_101, BREAD_201), (BREAD_201, BREAD_101)])
+
+    assert BREAD_201 in closure[BREAD_101]
+    assert BREAD_101 in closure[BREAD_201]
+
+
+@pytest.mark.parametrize("unit_id, prerequisite_ids, expected", [
+    (BREAD_101, [BREAD_301], True),   # Bread 301 already depends on Bread 101
+    (BREAD_101, [BREAD_101], True),   # its own prerequisite
+    (HYGIENE, [BREAD_201], True),
+    (PASTRY, [BREAD_301, HYGIENE], False),
+    (BREAD_101, [HYGIENE], False),
+])
+def test_creates_cycle(unit_id, prerequisite_ids, expected):
+    assert creates_cycle(EDGES, unit_id, prerequisite_ids) is expected
+
+
+def test_replacing_a_units_prerequisites_ignores_the_edges_being_replaced():
+    # Bread 201's current edges are set aside, so only the new list is judged
+    assert creates_cycle(EDGES, BREAD_201, [BREAD_301]) is True
+    assert creates_cycle(EDGES, BREAD_201, [PASTRY]) is False
+
+
+async def test_required_for_recompiles_when_the_cached_edges_change(redis, monkeypatch):
+    edges = [list(EDGES)]
+
+    async def load():
+        return edges[0]
+
+    monkeypatch.setattr(prerequisites, "cache", TwoTierCache(local_size=100, local_ttl=60, default_ttl=300))
+    monkeypatch.setattr(prerequisites, "_load_cached_edges", load)
+    graph = PrerequisiteGraph()
+
+    assert await graph.required_for(redis, BREAD_301) == {BREAD_201, BREAD_101, HYGIENE}
+    assert graph.codes([HYGIENE, BREAD_101]) == ["BRD101", "HYG101"]
+
+    edges[0] = [(BREAD_301, PASTRY, "PAS101")]
+    await prerequisites.cache.invalidate(redis, "units")
+
+    assert await graph.required_for(redis, BREAD_301) == {PASTRY}
@@ -0,0 +1,73 @@
+"""
+Refresh-token rotation (``ROTATE_REFRESH_SCRIPT``).
+"""
+import pytest
+
+from app.config import settings
+from app.security import (
+    REFRESH_FAMILY_KEY, RefreshTokenError, decode_token, issue_token_pair, rotate_refresh_token, token_cache,
+    verify_token,
+)
+
+SUBJECT = {"sub": "8f14e45f-ceea-467f-a5f5-2b6f1e3b9a10", "role": "student"}
+
+
+@pytest.fixture(autouse=True)
+def clean_token_cache():
+    token_cache.clear()
+    yield
+    token_cache.clear()
+
+
+async def test_rotation_issues_a_new_pair(redis):
+    login = await issue_token_pair(redis, SUBJECT)
+    rotated = await rotate_refresh_token(redis, login["refresh_token"])
+
+    assert rotated["refresh_token"] != login["refresh_token"]
+    assert decode_token(rotated["refresh_token"])["fam"] == decode_token(login["refresh_token"])["fam"]
+    assert decode_token(rotated["access_token"])["sub"] == SUBJECT["sub"]
+
+
+async def test_concurrent_refresh_within_grace_gets_the_same_pair(redis):
+    login = await issue_token_pair(redis, SUBJECT)
+    first = await rotate_refresh_token(redis, login["refresh_token"])
+    # A second tab sends the refresh token the first tab just rotated
+    second = await rotate_refresh_token(redis, login["refresh_token"])
+
+    assert second == first
+    assert await verify_token(first["access_token"], redis) is not None
+    # The family lives on: the new refresh token still rotates
+    await rotate_refresh_token(redis, second["refresh_token"])
+
+
+async def test_reuse_after_grace_revokes_the_family(redis, monkeypatch):
+    monkeypatch.setattr(settings, "refresh_reuse_grace_seconds", -1)
+    login = await issue_token_pair(redis, SUBJECT)
+    rotated = await rotate_refresh_token(redis, login["refresh_token"])
+
+    with pytest.raises(RefreshTokenError, match="reuse"):
+        await rotate_refresh_token(redis, login["refresh_token"])
+
+    family = decode_token(login["refresh_token"])["fam"]
+    assert not await redis.exists(REFRESH_FAMILY_KEY.format(family))
+    assert await verify_token(rotated["access_token"], redis) is None
+    with pytest.raises(RefreshTokenError):
+        await rotate_refresh_token(redis, rotated["refresh_token"])
+
+
+async def test_replaying_an_older_generation_is_reuse(redis):
+    login = await issue_token_pair(redis, SUBJECT)
+    second = await rotate_refresh_token(redis, login["refresh_token"])
+    await rotate_refresh_token(redis, second["refresh_token"])
+
+    # Only the token replaced last is covered by the grace window
+    with pytest.raises(RefreshTokenError, match="reuse"):
+        await rotate_refresh_token(redis, login["refresh_token"])
+
+
+async def test_unknown_family_is_rejected(redis):
+    login = await issue_token_pair(redis, SUBJECT)
+    await redis.flushall()
+
+    with pytest.raises(RefreshTokenError, match="expired or was revoked"):
+        await rotate_refresh_token(redis, login["refresh_token"])
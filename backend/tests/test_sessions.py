@@ -0,0 +1,109 @@
+"""
+Server-side sessions (``app.sessions``).
+"""
+from datetime import date, datetime
+import uuid
+
+from sqlalchemy import inspect
+
+from app.config import settings
+from app.models import Gender, Student, User, UserRole
+from app.sessions import (
+    cache_session_student, create_session, forget_session_students, invalidate_user_sessions, load_session,
+    session_student,
+)
+
+
+def _user(**overrides) -> User:
+    return User(**{
+        "id": uuid.uuid4(),
+        "email": "wanjiru.kamau@example.com",
+        "role": UserRole.STUDENT,
+        "is_active": True,
+        "is_verified": True,
+        "created_at": datetime(2024, 8, 20),
+        "last_login": None,
+        **overrides,
+    })
+
+
+def _student(user: User) -> Student:
+    return Student(
+        id=uuid.uuid4(), user_id=user.id, student_id="FT2024000417",
+        first_name="Wanjiru", middle_name=None, last_name="Kamau", gender=Gender.FEMALE,
+        date_of_birth=date(2003, 2, 11), phone_number="0712345678", city="Nakuru", address=None,
+        enrollment_date=date(2024, 9, 2), program="Pastry and Baking", is_graduated="active",
+        created_at=datetime(2024, 8, 20, 9, 30), updated_at=datetime(2024, 8, 20, 9, 30),
+    )
+
+
+async def test_load_session_slides_the_ttl(redis):
+    session_id = await create_session(redis, _user())
+    key = next(iter(await redis.keys("session:*")))
+    await redis.expire(key, 5)
+
+    record, _ = await load_session(redis, session_id)
+
+    assert record["email"] == "wanjiru.kamau@example.com"
+    assert await redis.ttl(key) > 5
+
+
+async def test_sessions_end_at_the_absolute_max_age(redis, monkeypatch):
+    session_id = await create_session(redis, _user())
+    monkeypatch.setattr(settings, "session_absolute_max_age", 0)
+
+    record, _ = await load_session(redis, session_id)
+
+    assert record is None
+    assert not await redis.keys("session:*")
+
+
+async def test_invalidate_user_sessions_signs_out_every_listed_user(redis):
+    alice, bob, carol = _user(), _user(), _user()
+    alice_sessions = [await create_session(redis, alice) for _ in range(2)]
+    bob_session = await create_session(redis, bob)
+    carol_session = await create_session(redis, carol)
+
+    assert await invalidate_user_sessions(redis, alice.id, bob.id) == 3
+
+    for session_id in alice_sessions + [bob_session]:
+        assert (await load_session(redis, session_id))[0] is None
+    assert (await load_session(redis, carol_session))[0] is not None
+    assert await invalidate_user_sessions(redis) == 0
+
+
+async def test_student_row_is_read_with_the_session(redis):
+    user = _user()
+    session_id = await create_session(redis, user)
+    assert (await load_session(redis, session_id))[1] is None
+
+    await cache_session_student(redis, session_id, _student(user))
+    record, row = await load_session(redis, session_id)
+
+    student = session_student(row)
+    assert (student.student_id, student.gender, student.date_of_birth) == ("FT2024000417", Gender.FEMALE, date(2003, 2, 11))
+    # Ready to be added to a session as an already-persisted row
+    assert inspect(student).detached and inspect(student).identity == (student.id,)
+
+
+async def test_changed_student_rows_are_dropped_from_every_session(redis):
+    user = _user()
+    sessions = [await create_session(redis, user) for _ in range(2)]
+    for session_id in sessions:
+        await cache_session_student(redis, session_id, _student(user))
+
+    assert await forget_session_students(redis, user.id) == 2
+
+    for session_id in sessions:
+        record, row = await load_session(redis, session_id)
+        assert record is not None and row is None
+
+
+async def test_signing_out_removes_the_student_rows_too(redis):
+    user = _user()
+    session_id = await create_session(redis, user)
+    await cache_session_student(redis, session_id, _student(user))
+
+    await invalidate_user_sessions(redis, user.id)
+
+    assert not await redis.keys("session:*")
@@ -0,0 +1,29 @@
+"""Which slow statements get explained, and whether EXPLAIN may run them."""
+import pytest
+
+from app.slow_queries import explain_options, is_select
+
+
+@pytest.mark.parametrize("statement, expected", [
+    ("SELECT * FROM units WHERE id = $1", True),
+    ("  with recent AS (SELECT 1) SELECT * FROM recent", True),
+    ("WITH moved AS (DELETE FROM payments RETURNING *) SELECT * FROM moved", False),
+    ("UPDATE users SET last_login = now()", False),
+    ("", False),
+])
+def test_only_plain_reads_are_explained(statement, expected):
+    assert is_select(statement) is expected
+
+
+def test_plain_reads_are_analyzed():
+    assert "ANALYZE" in explain_options("SELECT * FROM units WHERE id = $1")
+
+
+@pytest.mark.parametrize("statement", [
+    "SELECT nextval('receipt_numbers')",
+    "SELECT setval('receipt_numbers', $1)",
+    "SELECT pg_advisory_lock($1)",
+    "SELECT PG_TRY_ADVISORY_XACT_LOCK (hashtext($1))",
+])
+def test_reads_with_lasting_side_effects_are_only_planned(statement):
+    assert "ANALYZE" not in explain_options(statement)
@@ -0,0 +1,72 @@
+"""
+Write-behind buffer (``app.write_behind``) shutdown behaviour.
+"""
+import asyncio
+import uuid
+
+import pytest
+
+from app import write_behind as write_behind_module
+from app.write_behind import WriteBehindBuffer
+
+
+class RecordingSession:
+    """Stands in for an AsyncSession; the first commit can be held open."""
+
+    def __init__(self, store):
+        self.store = store
+        self.pending = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, params=None):
+        self.pending.append(params)
+
+    async def commit(self):
+        await self.store.gate.wait()
+        self.store.committed.extend(self.pending)
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = type("Store", (), {})()
+    store.gate = asyncio.Event()
+    store.committed = []
+    monkeypatch.setattr(write_behind_module, "async_session_maker", lambda: RecordingSession(store))
+    return store
+
+
+def _events(store):
+    return [event["action"] for params in store.committed if params for event in params]
+
+
+async def test_cancelling_mid_flush_requeues_and_drains_the_batch(store):
+    buffer = WriteBehindBuffer(flush_interval=60, max_events=1)
+    task = asyncio.create_task(buffer.run())
+    buffer.record_event("login", actor_id=uuid.uuid4())
+    await asyncio.sleep(0.01)  # the flush is now waiting on its commit
+
+    task.cancel()
+    store.gate.set()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert _events(store) == ["login"]
+
+
+async def test_stop_finishes_the_flush_in_progress_and_drains(store):
+    buffer = WriteBehindBuffer(flush_interval=60, max_events=1)
+    task = asyncio.create_task(buffer.run())
+    buffer.record_event("first")
+    await asyncio.sleep(0.01)
+    buffer.record_event("second")
+
+    buffer.stop()
+    store.gate.set()
+    await asyncio.wait_for(task, 1)
+
+    assert _events(store) == ["first", "second"]
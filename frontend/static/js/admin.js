@@ -88,7 +88,7 @@ async function loadUnits() {
                 <td>${unit.unit_code}</td>
                 <td>${unit.unit_name}</td>
                 <td>${unit.credits}</td>
-                <td><span class="badge bg-${unit.is_active === 'active' ? 'success' : 'secondary'}">${unit.is_active}</span></td>
+                <td><span class="badge bg-${unit.is_active ? 'success' : 'secondary'}">${unit.is_active ? 'active' : 'inactive'}</span></td>
                 <td><button class="btn btn-sm btn-primary" onclick="editUnit('${unit.id}')">Edit</button></td>
             </tr>
         `).join('');
@@ -135,7 +135,10 @@ async function loadPendingRequests() {
                 <tr>
                     <td>${req.student.student_id}</td>
                     <td>${req.student.first_name} ${req.student.last_name}</td>
-                    <td><span class="badge bg-info">${req.request_type}</span></td>
+                    <td>
+                        <span class="badge bg-info">${req.request_type}</span>
+                        ${eligibilityBadge(req)}
+                    </td>
                     <td>${utils.formatDate(req.request_date)}</td>
                     <td>${req.student_remarks || '-'}</td>
                     <td>
@@ -150,6 +153,28 @@ async function loadPendingRequests() {
     }
 }
 
+const ELIGIBILITY_BADGES = { eligible: 'bg-success', ineligible: 'bg-danger', review: 'bg-warning text-dark' };
+
+function eligibilityBadge(req) {
+    if (!req.eligibility) return '';
+    // Built through the DOM so the reasons (program names included) are escaped
+    const badge = document.createElement('span');
+    badge.className = `badge ${ELIGIBILITY_BADGES[req.eligibility]}`;
+    badge.title = (req.eligibility_reasons || []).join('\n');
+    badge.textContent = req.eligibility;
+    return badge.outerHTML;
+}
+
+async function evaluateGraduation() {
+    try {
+        const summary = await utils.apiRequest('/admin/requests/graduation/evaluate', { method: 'POST' });
+        utils.showAlert(`Checked ${summary.evaluated} graduation requests`, 'success');
+        loadPendingRequests();
+    } catch (error) {
+        utils.showAlert('Failed to check eligibility: ' + error.message, 'error');
+    }
+}
+
 async function processRequest(requestId, status) {
     const remarks = prompt(`Enter ${status} remarks (optional):`);
     try {
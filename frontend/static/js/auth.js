@@ -25,8 +25,8 @@ async function handleLogin(event) {
             throw new Error(data.detail || 'Login failed');
         }
         
-        // 1. Store token
-        utils.setToken(data.access_token);
+        // 1. Store tokens
+        utils.setTokens(data);
         
         // 2. Extract role from JWT Payload instead of a second API call
         // JWT is [header].[payload].[signature]. We want index 1.
@@ -16,9 +16,57 @@ const utils = {
     // Remove token from localStorage
     removeToken() {
         localStorage.removeItem('access_token');
+        localStorage.removeItem('refresh_token');
         localStorage.removeItem('user_role');
     },
 
+    // Get refresh token from localStorage
+    getRefreshToken() {
+        return localStorage.getItem('refresh_token');
+    },
+
+    // Store both tokens returned by login or refresh
+    setTokens(data) {
+        this.setToken(data.access_token);
+        localStorage.setItem('refresh_token', data.refresh_token);
+    },
+
+    // Seconds until the access token expires (0 if unknown)
+    tokenSecondsLeft() {
+        const token = this.getToken();
+        if (!token) return 0;
+        try {
+            const base64 = token.split('.')[1].replace(/-/g, '+').replace(/_/g, '/');
+            return JSON.parse(window.atob(base64)).exp - Date.now() / 1000;
+        } catch (error) {
+            return 0;
+        }
+    },
+
+    // Renew the session with the refresh token; concurrent callers share one request
+    refreshSession() {
+        if (this._refreshing) return this._refreshing;
+
+        const refreshToken = this.getRefreshToken();
+        if (!refreshToken) return Promise.resolve(false);
+
+        this._refreshing = fetch(`${API_BASE_URL}/auth/refresh`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ refresh_token: refreshToken })
+        }).then(async (response) => {
+            if (response.ok) {
+                this.setTokens(await response.json());
+                return true;
+            }
+            // Another tab may have rotated the token first
+            return this.getRefreshToken() !== refreshToken;
+        }).catch(() => false).finally(() => {
+            this._refreshing = null;
+        });
+        return this._refreshing;
+    },
+
     // Get user role
     getUserRole() {
         return localStorage.getItem('user_role');
@@ -35,7 +83,12 @@ const utils = {
     },
 
     // Make authenticated API request
-    async apiRequest(endpoint, options = {}) {
+    async apiRequest(endpoint, options = {}, retried = false) {
+        // Renew shortly before expiry instead of sending the user back to login
+        if (this.getRefreshToken() && this.tokenSecondsLeft() < 60) {
+            await this.refreshSession();
+        }
+
         const token = this.getToken();
         const headers = {
             'Content-Type': 'application/json',
@@ -49,6 +102,10 @@ const utils = {
                 headers
             });
 
+            if (response.status === 401 && !retried && await this.refreshSession()) {
+                return this.apiRequest(endpoint, options, true);
+            }
+
             if (response.status === 401) {
                 this.removeToken();
                 window.location.href = '/login';
@@ -175,8 +232,20 @@ function setupSidebar() {
 function setupLogout() {
     const logoutBtn = document.getElementById('logout-btn');
     if (logoutBtn) {
-        logoutBtn.addEventListener('click', (e) => {
+        logoutBtn.addEventListener('click', async (e) => {
             e.preventDefault();
+            // Revoke the token server-side; logging out locally must not depend on it
+            const token = utils.getToken();
+            if (token) {
+                await fetch(`${API_BASE_URL}/auth/logout`, {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json',
+                        'Authorization': `Bearer ${token}`
+                    },
+                    body: JSON.stringify({ refresh_token: utils.getRefreshToken() })
+                }).catch(() => {});
+            }
             utils.removeToken();
             utils.showAlert('Logged out successfully', 'success');
             setTimeout(() => {
@@ -3,8 +3,11 @@ async function loadDashboard() {
     if (!container) return;
     utils.showLoading(container);
     try {
-        const data = await utils.apiRequest('/student/dashboard');
-        updateDashboardTiles(data);
+        // One request for the whole first paint instead of one per tile
+        const data = await utils.apiRequest('/student/bootstrap');
+        updateDashboardTiles(data.dashboard);
+        updateCurrentUnits(data.current_units);
+        updateHomeRequests(data.requests);
         utils.hideLoading();
     } catch (error) {
         utils.hideLoading();
@@ -12,19 +15,44 @@ async function loadDashboard() {
     }
 }
 
+function setText(id, value) {
+    const element = document.getElementById(id);
+    if (element) element.textContent = value ?? '-';
+}
+
 function updateDashboardTiles(data) {
-    const registeredUnits = document.getElementById('registered-units');
-    if (registeredUnits) registeredUnits.textContent = data.registered_units_count;
-    const attemptedUnits = document.getElementById('attempted-units');
-    if (attemptedUnits) attemptedUnits.textContent = data.attempted_units_count;
+    setText('registered-units', data.registered_units_count);
+    setText('attempted-units', data.attempted_units_count);
+    setText('total-billed', utils.formatCurrency(data.total_billed));
+    setText('total-paid', utils.formatCurrency(data.total_paid));
     const feeBalance = document.getElementById('fee-balance');
     if (feeBalance) {
         feeBalance.textContent = utils.formatCurrency(data.fee_balance);
         feeBalance.style.color = data.fee_balance > 0 ? '#e74c3c' : '#27ae60';
     }
     const studentInfo = data.student_info;
-    const studentName = document.getElementById('student-name');
-    if (studentName) studentName.textContent = `${studentInfo.first_name} ${studentInfo.last_name}`;
+    setText('student-name', `${studentInfo.first_name} ${studentInfo.last_name}`);
+    setText('student-id', studentInfo.student_id);
+    setText('gender', studentInfo.gender);
+    setText('dob', utils.formatDate(studentInfo.date_of_birth));
+    setText('phone-number', studentInfo.phone_number);
+    setText('city', studentInfo.city);
+}
+
+function updateCurrentUnits(registrations) {
+    const container = document.getElementById('current-units');
+    if (!container) return;
+    container.innerHTML = registrations.length === 0 ? 'No units registered' : registrations.map(r => `
+        <p class="mb-1"><strong>${r.unit.unit_code}</strong> ${r.unit.unit_name}</p>
+    `).join('');
+}
+
+function updateHomeRequests(requests) {
+    const container = document.getElementById('home-requests');
+    if (!container) return;
+    container.innerHTML = requests.length === 0 ? 'No requests yet' : requests.map(req => `
+        <p class="mb-1">${req.request_type.toUpperCase()} <span class="badge bg-secondary">${req.status}</span></p>
+    `).join('');
 }
 
 async function loadPersonalInfo() {